@@ -0,0 +1,201 @@
+
+
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from dashboard.analytics import rebuild_sales_day
+from favorites.models import FavoriteProduct
+from home.models import Store
+from orders.models import ItemOrder, Order, PaymentMethod, ShipmentMethod, ShipmentOrder, StatusOrder
+from products.models import PBrand, PCategory, PSubcategory, Product, ProductImage
+
+# Every generated row is prefixed so clear_catalog() never touches real data
+BENCH_PREFIX = 'bench'
+BENCH_PASSWORD = 'bench1234'
+BATCH_SIZE = 5000
+
+STATUSES = {1: 'Cancelado', 2: 'Pendiente', 3: 'Pago a Confirmar', 4: 'Pago Confirmado',
+            5: 'Enviado', 6: 'Completado', 7: 'Devolución'}
+
+
+def _chunks(total, size=BATCH_SIZE):
+    for start in range(0, total, size):
+        yield range(start, min(total, start + size))
+
+
+def bench_email(i) -> str:
+    return f'{BENCH_PREFIX}-user-{i}@example.com'
+
+
+def ensure_base_data() -> None:
+    """ Rows the views expect to exist (store 1, order statuses, payment/shipment methods). """
+    Store.objects.get_or_create(id=1, defaults={'name': 'Benchmark Store'})
+    for status_id, name in STATUSES.items():
+        StatusOrder.objects.get_or_create(id=status_id, defaults={'name': name})
+    ShipmentMethod.objects.get_or_create(id=1, defaults={'name': 'Retiro en local', 'price': 0})
+    ShipmentMethod.objects.get_or_create(id=2, defaults={'name': 'Envío a domicilio', 'price': 500})
+    PaymentMethod.objects.get_or_create(id=1, defaults={'name': 'Efectivo', 'time': 2})
+    PaymentMethod.objects.get_or_create(id=3, defaults={'name': 'Mercado Pago', 'time': 2})
+
+
+def generate_catalog(
+    products=10_000, categories=20, subcategories=5, brands=50, images=3,
+    users=200, favorites=10, cart_items=5, orders=1000, seed=1, log=print
+) -> dict:
+    """
+    Generates a synthetic catalog with bulk inserts, deterministic for the same seed so
+    runs on different commits measure the same data.
+
+    Args:
+        products (int): Products to create (10k - 1M).
+        categories (int): Categories, each one with `subcategories` subcategories.
+        brands (int): Brands.
+        images (int): Max images per product (1..images).
+        users (int): Buyers, each one with a cart and favorites. An admin is also created.
+        favorites (int): Max favorites per user.
+        cart_items (int): Max items in the cart of each user.
+        orders (int): Orders with 1 to 4 items of random buyers.
+        seed (int): Seed of the random generator.
+        log (callable): Progress output.
+
+    Returns:
+        dict: Number of rows created per model.
+    """
+    rng = random.Random(seed)
+    ensure_base_data()
+    counts = {}
+
+    with transaction.atomic():
+        category_objs = PCategory.objects.bulk_create([
+            PCategory(name=f'{BENCH_PREFIX} cat {i}', slug=f'{BENCH_PREFIX}-cat-{i}') for i in range(categories)
+        ])
+        subcategory_objs = PSubcategory.objects.bulk_create([
+            PSubcategory(name=f'{BENCH_PREFIX} sub {c.id}-{j}', slug=f'{BENCH_PREFIX}-sub-{c.id}-{j}', category=c)
+            for c in category_objs for j in range(subcategories)
+        ])
+        brand_objs = PBrand.objects.bulk_create([
+            PBrand(name=f'{BENCH_PREFIX} brand {i}', slug=f'{BENCH_PREFIX}-brand-{i}') for i in range(brands)
+        ])
+    counts.update(categories=len(category_objs), subcategories=len(subcategory_objs), brands=len(brand_objs))
+    subcats_by_cat = {}
+    for sub in subcategory_objs:
+        subcats_by_cat.setdefault(sub.category_id, []).append(sub.id)
+    category_ids = [c.id for c in category_objs]
+    brand_ids = [b.id for b in brand_objs]
+
+    # productos e imagenes en lotes, solo se guardan los ids en memoria
+    product_ids = []
+    image_count = 0
+    for chunk in _chunks(products):
+        batch, image_counts = [], []
+        for i in chunk:
+            category_id = rng.choice(category_ids)
+            image_counts.append(rng.randint(1, images))
+            price = Decimal(rng.randint(1_000, 500_000)) / 100
+            batch.append(Product(
+                name=f'{BENCH_PREFIX} product {i:07d}',
+                slug=f'{BENCH_PREFIX}-product-{i}',
+                normalized_name=f'{BENCH_PREFIX} product {i:07d}',
+                price=price,
+                price_list=price,
+                discount=rng.choice((0, 0, 0, 10, 20)),
+                stock=rng.randint(0, 1000) if rng.random() > 0.05 else 0,
+                available=True,
+                category_id=category_id,
+                subcategory_id=rng.choice(subcats_by_cat[category_id]),
+                brand_id=rng.choice(brand_ids),
+                main_image=f'https://picsum.photos/seed/{BENCH_PREFIX}{i}-0/600',
+            ))
+        with transaction.atomic():
+            created = Product.objects.bulk_create(batch)
+            ProductImage.objects.bulk_create([
+                ProductImage(
+                    product_id=product.id, main_image=k == 0,
+                    image_url=f'https://picsum.photos/seed/{BENCH_PREFIX}{i}-{k}/600'
+                )
+                for i, product, n in zip(chunk, created, image_counts) for k in range(n)
+            ], batch_size=BATCH_SIZE)
+        product_ids.extend(p.id for p in created)
+        image_count += sum(image_counts)
+        log(f'productos: {len(product_ids)}/{products}')
+    counts.update(products=len(product_ids), images=image_count)
+
+    # usuarios (un solo hash, make_password es lento a proposito)
+    User = get_user_model()
+    password = make_password(BENCH_PASSWORD)
+    with transaction.atomic():
+        user_objs = User.objects.bulk_create(
+            [User(email=bench_email(i), password=password, role='buyer') for i in range(users)]
+            + [User(email=bench_email('admin'), password=password, role='admin', is_staff=True)],
+            batch_size=BATCH_SIZE
+        )
+        buyers = user_objs[:-1]
+        carts = Cart.objects.bulk_create([Cart(user=user) for user in buyers], batch_size=BATCH_SIZE)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product_id=product_id, quantity=rng.randint(1, 3))
+            for cart in carts for product_id in rng.sample(product_ids, rng.randint(0, cart_items))
+        ], batch_size=BATCH_SIZE)
+        favorite_objs = FavoriteProduct.objects.bulk_create([
+            FavoriteProduct(user=user, product_id=product_id)
+            for user in buyers for product_id in rng.sample(product_ids, rng.randint(0, favorites))
+        ], batch_size=BATCH_SIZE)
+    counts.update(users=len(user_objs), carts=len(carts), favorites=len(favorite_objs))
+
+    order_count = 0
+    for chunk in _chunks(orders):
+        with transaction.atomic():
+            shipments = ShipmentOrder.objects.bulk_create([
+                ShipmentOrder(method_id=2, address='Av. Benchmark 123', province='Córdoba', city='Córdoba')
+                for _ in chunk
+            ])
+            order_objs = Order.objects.bulk_create([
+                Order(
+                    user=rng.choice(buyers), status_id=rng.choice((2, 3, 4, 5, 6)), payment_id=rng.choice((1, 3)),
+                    shipment=shipment, shipment_cost=500, name='Bench Mark', email='bench@example.com',
+                )
+                for shipment in shipments
+            ])
+            items = []
+            totals = {}
+            for order in order_objs:
+                for product_id in rng.sample(product_ids, rng.randint(1, 4)):
+                    quantity = rng.randint(1, 3)
+                    price = Decimal(rng.randint(1_000, 500_000)) / 100
+                    items.append(ItemOrder(
+                        order=order, product_id=product_id, quantity=quantity,
+                        original_price=price, final_price=price,
+                    ))
+                    totals[order.id] = totals.get(order.id, 0) + price * quantity
+            ItemOrder.objects.bulk_create(items, batch_size=BATCH_SIZE)
+            for order in order_objs:
+                order.total = totals[order.id] + order.shipment_cost
+            Order.objects.bulk_update(order_objs, ['total'], batch_size=BATCH_SIZE)
+        order_count += len(order_objs)
+        log(f'ordenes: {order_count}/{orders}')
+    counts['orders'] = order_count
+
+    # bulk_create no dispara las señales de ventas, se reconstruye el dia para el dashboard
+    rebuild_sales_day(timezone.localdate())
+    return counts
+
+
+def clear_catalog(log=print) -> None:
+    """ Deletes every row created by generate_catalog (prefixed with BENCH_PREFIX). """
+    User = get_user_model()
+    users = User.objects.filter(email__startswith=f'{BENCH_PREFIX}-user-')
+    with transaction.atomic():
+        ItemOrder.objects.filter(order__user__in=users).delete()
+        ShipmentOrder.objects.filter(order__user__in=users).delete()
+        Order.objects.filter(user__in=users).delete()
+        users.delete()
+        Product.objects.filter(slug__startswith=f'{BENCH_PREFIX}-product-').delete()
+        PSubcategory.objects.filter(slug__startswith=f'{BENCH_PREFIX}-sub-').delete()
+        PCategory.objects.filter(slug__startswith=f'{BENCH_PREFIX}-cat-').delete()
+        PBrand.objects.filter(slug__startswith=f'{BENCH_PREFIX}-brand-').delete()
+    log('catalogo de benchmark eliminado')
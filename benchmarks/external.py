@@ -0,0 +1,135 @@
+
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from benchmarks.fakes import start_fake_server_process
+from benchmarks.runner import percentile
+from ecommerce.http import close_async_session
+from payments import gateway
+from products import utils
+
+# PNG de 1x1, alcanza para pasar validate_and_prepare_image
+PNG = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89'
+    b'\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+def _images(count):
+    return [SimpleUploadedFile(f'bench-{i}.png', PNG, content_type='image/png') for i in range(count)]
+
+
+# ======================================================================
+#     Each operation is the external work of one request of the view
+# ======================================================================
+def upload_sync(i, images=3):
+    # ProductImagesView: una subida despues de la otra
+    return [utils.get_url_from_imgbb(img) for img in _images(images)]
+
+
+async def upload_async(i, images=3):
+    # views_async.product_images: todas las imagenes a la vez
+    return await asyncio.gather(*(utils.aget_url_from_imgbb(img) for img in _images(images)))
+
+
+def payment_sync(i):
+    return gateway.get_payment(i + 1)
+
+
+async def payment_async(i):
+    return await gateway.aget_payment(i + 1)
+
+
+def preference_sync(i):
+    return gateway.create_preference({'external_reference': str(i)})
+
+
+async def preference_async(i):
+    return await gateway.acreate_preference({'external_reference': str(i)})
+
+
+# name: (sync op, async op)
+OPERATIONS = {
+    'upload': (upload_sync, upload_async),
+    'payment': (payment_sync, payment_async),
+    'preference': (preference_sync, preference_async),
+}
+
+
+def _summary(latencies, wall) -> dict:
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / wall, 1) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def run_sync(op, requests, workers) -> dict:
+    """ WSGI model: `workers` threads, each request blocks its thread until the external service answers. """
+    def timed(i):
+        start = time.perf_counter()
+        op(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(timed, range(requests)))
+    return _summary(latencies, time.perf_counter() - start)
+
+
+async def _run_async(op, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await op(i)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        latencies = await asyncio.gather(*(timed(i) for i in range(requests)))
+    finally:
+        await close_async_session()
+    return _summary(list(latencies), time.perf_counter() - start)
+
+
+def run_async(op, requests, concurrency) -> dict:
+    """ ASGI model: one event loop (one uvicorn worker) with up to `concurrency` requests in flight. """
+    return asyncio.run(_run_async(op, requests, concurrency))
+
+
+def run(operations=None, requests=200, workers=4, concurrency=100, delay=0.1, log=print) -> dict:
+    """
+    Runs each operation against a local fake server with `delay` seconds of latency,
+    first with `workers` threads (sync views) and then in one event loop (async views).
+
+    Returns:
+        dict: {operation: {'sync': {...}, 'async': {...}}} with requests, rps, p50 and p95.
+    """
+    process, base_url = start_fake_server_process(delay)
+    report = {}
+    try:
+        with override_settings(
+            IMGBB_API_URL=f'{base_url}/upload', MERCADO_PAGO_API_URL=base_url, MP_MAX_RETRIES=0,
+            ASYNC_HTTP_MAX_CONNECTIONS=concurrency, MP_POOL_SIZE=workers,
+        ):
+            gateway.reset_client()
+            for name in operations or OPERATIONS:
+                sync_op, async_op = OPERATIONS[name]
+                report[name] = {
+                    'sync': run_sync(sync_op, requests, workers),
+                    'async': run_async(async_op, requests, concurrency),
+                }
+                log(name, report[name])
+    finally:
+        gateway.reset_client()
+        process.terminate()
+    return report
@@ -0,0 +1,92 @@
+
+
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeExternalHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in of ImgBB and Mercado Pago with a fixed latency, used by benchmark_async_io
+    and the tests of the async views. Each server gets its own subclass (see start_fake_server).
+        - POST /upload                  -> ImgBB upload
+        - POST /checkout/preferences    -> Mercado Pago preference
+        - GET  /v1/payments/<id>        -> Mercado Pago payment (approved)
+    """
+    protocol_version = 'HTTP/1.1'    # keep-alive como los servicios reales
+    delay = 0.0
+    requests = 0
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        type(self).requests += 1
+        time.sleep(self.delay)
+
+        path = self.path.split('?', 1)[0]
+        if method == 'POST' and path.endswith('/upload'):
+            n = type(self).requests
+            return self._reply(200, {'success': True, 'data': {'url': f'https://i.ibb.co/fake/{n}.png'}})
+        if method == 'POST' and path == '/checkout/preferences':
+            reference = json.loads(body or b'{}').get('external_reference', '0')
+            return self._reply(201, {'id': f'pref-{reference}'})
+        if method == 'GET' and path.startswith('/v1/payments/'):
+            return self._reply(200, {'id': int(path.rsplit('/', 1)[-1]), 'status': 'approved'})
+        return self._reply(404, {'message': 'not found'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024    # el default (5) rechaza conexiones con muchos requests simultaneos
+
+
+def start_fake_server(delay=0.0):
+    """
+    Starts a FakeExternalHandler server in a daemon thread on a free port.
+
+    Returns:
+        tuple: (server, base_url), call server.shutdown() and server.server_close() at the end.
+    """
+    handler = type('FakeExternal', (FakeExternalHandler,), {'delay': delay, 'requests': 0})
+    server = _Server(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def _serve(server):
+    server.serve_forever()
+
+
+def start_fake_server_process(delay=0.0):
+    """
+    Same server in another process, so its threads do not compete for the GIL with the
+    client being measured (benchmarks with hundreds of simultaneous requests).
+
+    Returns:
+        tuple: (process, base_url), call process.terminate() at the end.
+    """
+    handler = type('FakeExternal', (FakeExternalHandler,), {'delay': delay, 'requests': 0})
+    server = _Server(('127.0.0.1', 0), handler)
+    process = multiprocessing.get_context('fork').Process(target=_serve, args=(server,), daemon=True)
+    process.start()
+    server.server_close()    # el socket queda abierto en el proceso hijo
+    return process, f'http://127.0.0.1:{server.server_port}'
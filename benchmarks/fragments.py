@@ -0,0 +1,80 @@
+
+
+import time
+from contextlib import contextmanager
+
+from django.template.backends.django import Template
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.runner import percentile
+from products.models import Product
+
+
+def default_pages() -> dict:
+    """ Pages that extend home/base.html, {name: url}. """
+    pages = {'product_list': reverse('product_list')}
+    product = Product.objects.filter(available=True, slug__isnull=False).only('id', 'slug').first()
+    if product:
+        pages['product_detail'] = reverse('product_detail', args=[product.id, product.slug])
+    return pages
+
+
+@contextmanager
+def render_timer():
+    """ Accumulates in timer['seconds'] the time spent rendering templates (render() of the views). """
+    timer = {'seconds': 0.0}
+    original = Template.render
+
+    def render(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            timer['seconds'] += time.perf_counter() - start
+
+    Template.render = render
+    try:
+        yield timer
+    finally:
+        Template.render = original
+
+
+def _summary(latencies) -> dict:
+    latencies.sort()
+    return {
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def run(pages=None, requests=200, warmup=10, log=print) -> dict:
+    """
+    Requests each page with the {% cache %} fragments of base.html disabled (FRAGMENT_CACHE_TIMEOUT=0)
+    and enabled, alternating per request so both modes see the same data and cache state.
+    The time is the template render of the response, the queries of the view are not included.
+
+    Returns:
+        dict: {page: {'rendered': {...}, 'cached': {...}, 'saved_ms': float}} with mean, p50 and p95.
+    """
+    client = Client(raise_request_exception=False)
+    modes = {
+        # con timeout 0 el set borra la clave, otra release para no pisar los fragmentos del modo cached
+        'rendered': override_settings(FRAGMENT_CACHE_TIMEOUT=0, RELEASE_VERSION='benchmark-rendered'),
+        'cached': override_settings(),
+    }
+    report = {}
+    for name, url in (pages or default_pages()).items():
+        latencies = {mode: [] for mode in modes}
+        for i in range(warmup + requests * 2):
+            mode = 'rendered' if i % 2 else 'cached'
+            with modes[mode], render_timer() as timer:
+                client.get(url)
+            if i >= warmup:
+                latencies[mode].append(timer['seconds'])
+
+        report[name] = {mode: _summary(values) for mode, values in latencies.items()}
+        report[name]['saved_ms'] = round(report[name]['rendered']['mean_ms'] - report[name]['cached']['mean_ms'], 2)
+        log(name, report[name])
+    return report
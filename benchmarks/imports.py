@@ -0,0 +1,138 @@
+
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+
+from benchmarks.runner import percentile
+
+# Se importan recien al usarlos (subida de imagenes, Mercado Pago, excel, vistas async),
+# ningun worker ni comando deberia pagarlos al arrancar
+LAZY_IMPORTS = ('aiohttp', 'PIL', 'mercadopago', 'openpyxl')
+# ademas de los anteriores, django.setup() (todos los management commands) no carga los serializers de DRF
+LAZY_SETUP_IMPORTS = LAZY_IMPORTS + ('rest_framework.serializers',)
+
+# Lo que hace un worker antes del primer request: setup de las apps + import del URLconf (todas las vistas)
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+modules_setup = sorted(sys.modules)
+from django.urls import get_resolver
+get_resolver().url_patterns
+total = time.perf_counter() - start
+print(json.dumps({'setup': setup, 'total': total, 'modules_setup': modules_setup, 'modules': sorted(sys.modules)}))
+"""
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| (?P<indent> *)(?P<module>\S+)$')
+
+
+def cold_start(importtime=False) -> tuple[dict, str]:
+    """
+    Runs django.setup() and the URLconf import in a new interpreter with the current settings.
+
+    Returns:
+        tuple: ({'setup', 'total' (seconds), 'modules_setup', 'modules'}, stderr with the
+        -X importtime lines if importtime=True).
+    """
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', COLD_START_SCRIPT]
+    # el interprete nuevo no ve el runner de tests, sin DJANGO_TESTING pediria redis/memcached
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE, 'DJANGO_TESTING': str(settings.TESTING)}
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(f"El arranque fallo:\n{result.stderr[-2000:]}")
+    # la ultima linea, los prints de los modulos al importarse quedan antes
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def loaded(modules, names) -> list:
+    """ Names (packages or modules) of names that are imported in modules. """
+    return [name for name in names if any(m == name or m.startswith(name + '.') for m in modules)]
+
+
+def parse_importtime(stderr) -> list:
+    """
+    Parses the -X importtime output.
+
+    Returns:
+        list: (self_us, cumulative_us, depth, module) in the order python prints them
+        (each module after the modules it imported).
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            entries.append((
+                int(match['self']), int(match['cumulative']), len(match['indent']) // 2, match['module']
+            ))
+    return entries
+
+
+def project_packages() -> set:
+    """ Top level packages of the apps of the project (the rest are django and third party). """
+    base_dir = str(settings.BASE_DIR)
+    packages = {app.name.split('.')[0] for app in apps.get_app_configs() if app.path.startswith(base_dir)}
+    packages.add(settings.ROOT_URLCONF.split('.')[0])
+    return packages
+
+
+def summarize(entries, packages) -> tuple[dict, list]:
+    """
+    Attributes the import time to the app that caused it: the self time of a module outside the
+    project counts for the nearest project module that imported it (directly or not), the modules
+    imported by django itself count for their top level package.
+
+    Returns:
+        tuple: ({owner: ms}, [(importer, module, cumulative ms)]) the second one are the
+        imports of modules outside the project done directly by a project module.
+    """
+    by_owner = defaultdict(int)
+    direct = []
+    stack = []    # (depth, module, owner) de los ancestros del modulo actual
+    # al reves quedan en preorden: cada modulo antes de los que importo
+    for self_us, cumulative_us, depth, module in reversed(entries):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        top = module.split('.')[0]
+        if top in packages or not stack:
+            owner = top
+        else:
+            owner = stack[-1][2]
+            parent = stack[-1][1]
+            if parent.split('.')[0] in packages:
+                direct.append((parent, module, round(cumulative_us / 1000, 1)))
+        by_owner[owner] += self_us
+        stack.append((depth, module, owner))
+
+    by_owner = {owner: round(us / 1000, 1) for owner, us in sorted(by_owner.items(), key=lambda item: -item[1])}
+    direct.sort(key=lambda item: -item[2])
+    return by_owner, direct
+
+
+def run(repeat=5) -> dict:
+    """
+    Measures the cold start (median of repeat new interpreters) and profiles one more
+    with -X importtime.
+
+    Returns:
+        dict: {'setup_ms', 'total_ms', 'by_app': {owner: ms}, 'heavy_imports': [(importer, module, ms)],
+        'eager': modules of LAZY_IMPORTS loaded at startup}
+    """
+    runs = [cold_start()[0] for _ in range(repeat)]
+    result, stderr = cold_start(importtime=True)
+    by_app, heavy_imports = summarize(parse_importtime(stderr), project_packages())
+    return {
+        'setup_ms': round(percentile(sorted(r['setup'] for r in runs), 50) * 1000, 1),
+        'total_ms': round(percentile(sorted(r['total'] for r in runs), 50) * 1000, 1),
+        'by_app': by_app,
+        'heavy_imports': heavy_imports,
+        'eager': loaded(result['modules'], LAZY_IMPORTS),
+    }
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import external
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el throughput de las subidas a ImgBB y las llamadas a Mercado Pago con las vistas sync "
+        "(N threads, como gunicorn con WSGI) y async (un solo event loop, como un worker uvicorn) "
+        "contra servidores falsos locales con latencia fija. "
+        "Ej: python manage.py benchmark_async_io --requests 300 --workers 4 --delay 0.2"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', default='', help=f"Separadas por coma: {', '.join(external.OPERATIONS)}")
+        parser.add_argument('--requests', type=int, default=200, help="Requests por operacion y modo")
+        parser.add_argument('--workers', type=int, default=4, help="Threads del modo sync")
+        parser.add_argument('--concurrency', type=int, default=100, help="Requests simultaneos del modo async")
+        parser.add_argument('--delay', type=float, default=0.1, help="Latencia del servidor falso en segundos")
+
+    def handle(self, *args, **options):
+        operations = [o.strip() for o in options['operations'].split(',') if o.strip()] or None
+        unknown = set(operations or []) - set(external.OPERATIONS)
+        if unknown:
+            raise CommandError(f"Operaciones desconocidas: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"{'operacion':<12}{'modo':>7}{'req':>6}{'req/s':>9}{'p50':>9}{'p95':>9}")
+
+        def log(name, result):
+            for mode in ('sync', 'async'):
+                row = result[mode]
+                self.stdout.write(
+                    f"{name:<12}{mode:>7}{row['requests']:>6}{row['rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+                )
+
+        external.run(
+            operations, requests=options['requests'], workers=options['workers'],
+            concurrency=options['concurrency'], delay=options['delay'], log=log,
+        )
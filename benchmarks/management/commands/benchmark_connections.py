@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks import runner
+from benchmarks.scenarios import SCENARIOS, BenchContext
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de abrir la conexion a la DB en cada request: ejecuta los escenarios cerrando "
+        "la conexion antes de cada request (CONN_MAX_AGE=0) y reutilizandola (conexiones persistentes). "
+        "Con DB_POOL=True el cierre devuelve la conexion al pool. "
+        "Ej: python manage.py benchmark_connections --scenarios cart_add,favorite_toggle --requests 300"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default='cart_add,favorite_toggle', help=f"Separados por coma: {', '.join(SCENARIOS)}")
+        parser.add_argument('--requests', type=int, default=200, help="Requests medidos por modo")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        scenarios = [s.strip() for s in options['scenarios'].split(',') if s.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+        try:
+            ctx = BenchContext()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        pool = connection.settings_dict.get('OPTIONS', {}).get('pool')
+        self.stdout.write(
+            f"db: {connection.vendor} | CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']} | "
+            f"pool: {pool or 'no'}"
+        )
+        self.stdout.write(f"{'escenario':<18}{'modo':>8}{'media':>9}{'p50':>9}{'p95':>9}")
+        for name in scenarios:
+            result = runner.run_connection_overhead(name, ctx, options['requests'], options['warmup'], options['seed'])
+            for mode in ('new', 'reused'):
+                row = result[mode]
+                self.stdout.write(f"{name:<18}{mode:>8}{row['mean_ms']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}")
+            self.stdout.write(
+                f"{name:<18} conexion {result['connect_ms']} ms | "
+                f"sobrecosto por request {result['overhead_ms']} ms"
+            )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import fragments
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de render ahorrado por los fragmentos cacheados de base.html (navbars, footer, "
+        "menu de whatsapp): pide cada pagina alternando FRAGMENT_CACHE_TIMEOUT=0 y el cache activo "
+        "y mide solo el render de los templates. "
+        "Conviene correrlo despues de generate_catalog. Ej: python manage.py benchmark_fragments --requests 300"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests medidos por pagina y modo")
+        parser.add_argument('--warmup', type=int, default=10)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'pagina':<16}{'modo':>10}{'media':>9}{'p50':>9}{'p95':>9}")
+
+        def log(name, result):
+            for mode in ('rendered', 'cached'):
+                row = result[mode]
+                self.stdout.write(f"{name:<16}{mode:>10}{row['mean_ms']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}")
+            self.stdout.write(f"{name:<16} render ahorrado por request {result['saved_ms']} ms")
+
+        fragments.run(requests=options['requests'], warmup=options['warmup'], log=log)
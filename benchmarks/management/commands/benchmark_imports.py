@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en frio de un worker (django.setup() + import del URLconf) en interpretes nuevos "
+        "y resume python -X importtime por app: cuanto tarda cada app en importarse contando las librerias "
+        "que trae, y los imports de terceros mas pesados hechos desde el proyecto. "
+        "Ej: python manage.py benchmark_imports --repeat 10 --top 20"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Arranques medidos (se informa la mediana)")
+        parser.add_argument('--top', type=int, default=15, help="Filas de cada tabla")
+
+    def handle(self, *args, **options):
+        try:
+            report = imports.run(repeat=options['repeat'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"django.setup(): {report['setup_ms']} ms, + URLconf: {report['total_ms']} ms (mediana)")
+
+        self.stdout.write(f"\n{'app / paquete':<32}{'ms':>9}")
+        for owner, ms in list(report['by_app'].items())[:options['top']]:
+            self.stdout.write(f"{owner:<32}{ms:>9}")
+
+        self.stdout.write(f"\n{'importado por':<40}{'modulo':<32}{'ms':>9}")
+        for importer, module, ms in report['heavy_imports'][:options['top']]:
+            self.stdout.write(f"{importer:<40}{module:<32}{ms:>9}")
+
+        if report['eager']:
+            self.stdout.write(self.style.WARNING(
+                f"\nSe importan al arrancar y deberian ser lazy: {', '.join(report['eager'])}"
+            ))
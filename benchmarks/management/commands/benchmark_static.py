@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import static_assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los css/js que descarga cada tipo de pagina con los archivos separados (desarrollo) "
+        "y con los bundles offline de build_static: cantidad de requests y KB sin comprimir, gzip y brotli. "
+        "Ej: python manage.py build_static && python manage.py benchmark_static"
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'pagina':<16}{'modo':>9}{'req':>6}{'KB':>9}{'gzip':>9}{'brotli':>9}")
+
+        def log(name, result):
+            for mode in static_assets.MODES:
+                row = result[mode]
+                self.stdout.write(
+                    f"{name:<16}{mode:>9}{row['requests']:>6}{row['kb']:>9}{row['kb_gzip']:>9}{row['kb_brotli']:>9}"
+                )
+
+        try:
+            static_assets.run(log=log)
+        except ValueError as e:
+            raise CommandError(str(e))
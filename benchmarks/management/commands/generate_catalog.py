@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.catalog import clear_catalog, generate_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un catalogo sintetico para los benchmarks (productos, taxonomia, imagenes, usuarios, "
+        "carritos, favoritos y ordenes) con bulk inserts. Misma --seed = mismos datos. "
+        "Ej: python manage.py generate_catalog --products 100000 --clear"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10_000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--subcategories', type=int, default=5, help="Subcategorias por categoria")
+        parser.add_argument('--brands', type=int, default=50)
+        parser.add_argument('--images', type=int, default=3, help="Maximo de imagenes por producto")
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--clear', action='store_true', help="Elimina el catalogo de benchmark anterior")
+        parser.add_argument('--clear-only', action='store_true', help="Solo elimina el catalogo de benchmark")
+
+    def handle(self, *args, **options):
+        if options['clear'] or options['clear_only']:
+            clear_catalog(log=self.stdout.write)
+            if options['clear_only']:
+                return
+
+        start = time.perf_counter()
+        counts = generate_catalog(
+            products=options['products'], categories=options['categories'],
+            subcategories=options['subcategories'], brands=options['brands'], images=options['images'],
+            users=options['users'], orders=options['orders'], seed=options['seed'], log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - start
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Catalogo generado en {elapsed:.1f}s: {summary}"))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import runner
+from benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los escenarios de carga (home, listados, busqueda, detalle, carrito, checkout, dashboard) "
+        "contra el catalogo de generate_catalog y reporta req/s y p50/p95/p99. "
+        "Ej: python manage.py run_benchmarks --workers 8 --output bench.json --compare bench-main.json"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default='', help=f"Separados por coma: {', '.join(SCENARIOS)}")
+        parser.add_argument('--requests', type=int, default=200, help="Requests medidos por escenario")
+        parser.add_argument('--workers', type=int, default=4, help="Threads concurrentes")
+        parser.add_argument('--warmup', type=int, default=10, help="Requests sin medir por worker")
+        parser.add_argument('--base-url', default=None, help="Servidor levantado (ej http://127.0.0.1:8000), por defecto test client")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Guarda el reporte en json")
+        parser.add_argument('--compare', help="Reporte json de otro commit para comparar")
+
+    def handle(self, *args, **options):
+        scenarios = [s.strip() for s in options['scenarios'].split(',') if s.strip()] or None
+        unknown = set(scenarios or []) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(runner.HEADER)
+        try:
+            report = runner.run(
+                scenarios=scenarios, requests=options['requests'], workers=options['workers'],
+                base_url=options['base_url'], warmup=options['warmup'], seed=options['seed'],
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            runner.save(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Reporte guardado en {options['output']}"))
+        if options['compare']:
+            for line in runner.compare(report, runner.load(options['compare'])):
+                self.stdout.write(line)
@@ -0,0 +1,253 @@
+
+
+import json
+import math
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from benchmarks.scenarios import SCENARIOS, BenchContext
+from ecommerce.metrics import collect_metrics
+
+PERCENTILES = (50, 95, 99)
+
+
+class ClientTransport:
+    """ Requests through Django's test client (in process, also counts the SQL queries). """
+
+    def __init__(self, user=None):
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '.')), 'localhost')
+        # los errores de las vistas cuentan como 500 en el reporte en vez de cortar la corrida
+        self.client = Client(raise_request_exception=False, HTTP_HOST=host.lstrip('.'))
+        self.user = user
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, url, body=None):
+        kwargs = {'data': body, 'content_type': 'application/json'} if body is not None else {}
+        with collect_metrics() as metrics:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response.status_code, metrics.queries
+
+
+class HttpTransport:
+    """
+    Requests to a running server (gunicorn/runserver) with requests, the session of the
+    user is created with the test client and reused as cookie.
+    """
+
+    def __init__(self, base_url, user=None):
+        import requests    # ya instalado como dependencia del sdk de mercado pago
+
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.user = user
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            self.session.cookies.set(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+        csrf_token = get_random_string(32)
+        self.session.cookies.set(settings.CSRF_COOKIE_NAME, csrf_token)
+        self.session.headers['X-CSRFToken'] = csrf_token
+
+    def request(self, method, url, body=None):
+        response = self.session.request(method, self.base_url + url, json=body, timeout=30)
+        return response.status_code, None
+
+
+def percentile(values, p):
+    """ Nearest-rank percentile of an already sorted list. """
+    if not values:
+        return 0
+    index = max(0, math.ceil(p / 100 * len(values)) - 1)
+    return values[index]
+
+
+def run_scenario(name, ctx, requests=200, workers=4, base_url=None, warmup=10, seed=1) -> dict:
+    """
+    Runs `requests` requests of a scenario split between `workers` threads.
+
+    Returns:
+        dict: requests, errors, rps, mean/p50/p95/p99 in ms and queries per request
+        (only with the test client).
+    """
+    builder, needs_user, admin = SCENARIOS[name]
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(f'{seed}-{name}-{index}')
+        user = ctx.user_for(index, admin=admin) if needs_user else None
+        transport = HttpTransport(base_url, user) if base_url else ClientTransport(user)
+        count = requests // workers + (1 if index < requests % workers else 0)
+        try:
+            for i in range(-warmup, count):
+                method, url, body = builder(ctx, rng, transport)
+                start = time.perf_counter()
+                status, num_queries = transport.request(method, url, body)
+                elapsed = time.perf_counter() - start
+                if i < 0:
+                    continue    # warmup: caches y conexiones, no se mide
+                with lock:
+                    latencies.append(elapsed)
+                    if num_queries is not None:
+                        queries.append(num_queries)
+                    if status >= 400:
+                        errors.append(status)
+        finally:
+            connection.close()    # cada thread abre su propia conexion
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(worker, range(workers)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / wall, 1) if wall else 0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0,
+    }
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(percentile(latencies, p) * 1000, 2)
+    result['queries'] = round(sum(queries) / len(queries), 1) if queries else None
+    return result
+
+
+def run(scenarios=None, requests=200, workers=4, base_url=None, warmup=10, seed=1, log=print) -> dict:
+    """
+    Runs the scenarios and returns the report with the metadata needed to compare
+    runs between commits (commit, db, python/django versions and parameters).
+    """
+    ctx = BenchContext()
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'transport': base_url or 'test-client',
+            'requests': requests, 'workers': workers, 'warmup': warmup, 'seed': seed,
+        },
+        'scenarios': {},
+    }
+    for name in scenarios or SCENARIOS:
+        report['scenarios'][name] = result = run_scenario(name, ctx, requests, workers, base_url, warmup, seed)
+        log(format_row(name, result))
+    return report
+
+
+def connect_time(samples=20) -> float:
+    """ Mean seconds to open a DB connection (or to take one from the pool with DB_POOL). """
+    total = 0
+    for _ in range(samples):
+        connection.close()
+        start = time.perf_counter()
+        connection.ensure_connection()
+        total += time.perf_counter() - start
+    return total / samples
+
+
+def run_connection_overhead(name, ctx, requests=200, warmup=10, seed=1) -> dict:
+    """
+    Runs a scenario sequentially with the test client alternating two modes per request:
+        - 'new': the connection is closed before each request, like CONN_MAX_AGE=0 without pool.
+          With DB_POOL the close returns it to the pool, so it measures the pool checkout.
+        - 'reused': the connection stays open between requests (CONN_MAX_AGE > 0).
+    The test client does not close connections by itself, the close is done here.
+
+    Returns:
+        dict: {'new': {...}, 'reused': {...}, 'connect_ms': float, 'overhead_ms': float},
+        each mode with mean/p50/p95 in ms.
+    """
+    builder, needs_user, admin = SCENARIOS[name]
+    transport = ClientTransport(ctx.user_for(0, admin=admin) if needs_user else None)
+    rng = random.Random(f'{seed}-{name}')
+    latencies = {'new': [], 'reused': []}
+    try:
+        # los modos se alternan, asi los datos que crecen con la corrida (ej. el carrito) afectan a ambos por igual
+        for i in range(-warmup, requests * 2):
+            mode = 'new' if i % 2 == 0 else 'reused'
+            method, url, body = builder(ctx, rng, transport)
+            if mode == 'new':
+                connection.close()
+            start = time.perf_counter()
+            transport.request(method, url, body)
+            if i >= 0:
+                latencies[mode].append(time.perf_counter() - start)
+
+        result = {}
+        for mode, values in latencies.items():
+            values.sort()
+            result[mode] = {
+                'mean_ms': round(sum(values) / len(values) * 1000, 2) if values else 0,
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p95_ms': round(percentile(values, 95) * 1000, 2),
+            }
+        result['connect_ms'] = round(connect_time() * 1000, 2)
+    finally:
+        connection.close()
+    result['overhead_ms'] = round(result['new']['mean_ms'] - result['reused']['mean_ms'], 2)
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+HEADER = f"{'escenario':<18}{'req':>6}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}"
+
+
+def format_row(name, result) -> str:
+    queries = '-' if result['queries'] is None else result['queries']
+    return (
+        f"{name:<18}{result['requests']:>6}{result['errors']:>5}{result['rps']:>9}"
+        f"{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}{queries:>9}"
+    )
+
+
+def compare(report, baseline) -> list:
+    """
+    Lines with the change of req/s and p95 of each scenario against a previous report.
+    Negative p95 / positive req/s deltas are improvements.
+    """
+    lines = [f"comparado con {baseline['meta'].get('commit')} ({baseline['meta'].get('date', '')[:19]})"]
+    params = ('database', 'transport', 'requests', 'workers', 'seed')
+    different = [p for p in params if report['meta'].get(p) != baseline['meta'].get(p)]
+    if different:
+        lines.append(f"atencion: parametros distintos ({', '.join(different)}), los numeros no son comparables")
+    for name, result in report['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if not old:
+            continue
+        rps = (result['rps'] - old['rps']) / old['rps'] * 100 if old['rps'] else 0
+        p95 = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+        lines.append(f"{name:<18} req/s {rps:+7.1f}%   p95 {p95:+7.1f}%")
+    return lines
+
+
+def save(report, path) -> None:
+    with open(path, 'w') as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+
+def load(path) -> dict:
+    with open(path) as file_obj:
+        return json.load(file_obj)
@@ -0,0 +1,122 @@
+
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from benchmarks.catalog import BENCH_PREFIX, bench_email
+from cart.models import Cart, CartItem
+from products.models import PBrand, PCategory, Product
+
+SAMPLE_SIZE = 1000    # productos del catalogo usados para armar las urls
+
+CHECKOUT_DATA = {
+    'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench@example.com',
+    'cellphone': '3510000000', 'dni': '30000000', 'address': 'Av. Benchmark 123',
+    'province': 'Córdoba', 'city': 'Córdoba',
+    # efectivo: mercado pago haria llamadas externas en el on_commit del checkout
+    'shipping_method_id': '2', 'payment_method_id': '1',
+}
+
+
+class BenchContext:
+    """ Data of the generated catalog shared by every worker (loaded once per run). """
+
+    def __init__(self):
+        products = list(
+            Product.objects.filter(slug__startswith=f'{BENCH_PREFIX}-product-', stock__gte=100)
+            .order_by('id').values('id', 'slug', 'name')[:SAMPLE_SIZE]
+        )
+        if not products:
+            raise ValueError("No hay catalogo de benchmark, ejecute: python manage.py generate_catalog")
+        self.products = products
+        self.categories = list(
+            PCategory.objects.filter(slug__startswith=f'{BENCH_PREFIX}-cat-')
+            .prefetch_related('subcategories').order_by('id')
+        )
+        self.brands = list(
+            PBrand.objects.filter(slug__startswith=f'{BENCH_PREFIX}-brand-').order_by('id').values_list('slug', flat=True)
+        )
+        User = get_user_model()
+        self.buyers = list(User.objects.filter(email__startswith=f'{BENCH_PREFIX}-user-', role='buyer').order_by('id'))
+        self.admin = User.objects.get(email=bench_email('admin'))
+
+    def user_for(self, worker: int, admin=False):
+        return self.admin if admin else self.buyers[worker % len(self.buyers)]
+
+
+# ======================================================================
+#     Each scenario returns (method, url, body) for the i-th request
+# ======================================================================
+def home(ctx, rng, transport):
+    return 'get', reverse('Home'), None
+
+
+def listing(ctx, rng, transport):
+    return 'get', reverse('product_list') + f'?page={rng.randint(1, 3)}', None
+
+
+def listing_filtered(ctx, rng, transport):
+    category = rng.choice(ctx.categories)
+    subcategory = rng.choice(list(category.subcategories.all()))
+    url = reverse('pl_subcategory', args=[category.slug, subcategory.slug])
+    if rng.random() < 0.5:
+        url = reverse('pl_brand', args=[rng.choice(ctx.brands)])
+    return 'get', url + f"?sort={rng.choice(('price', '-price', 'popular'))}", None
+
+
+def search(ctx, rng, transport):
+    name = rng.choice(ctx.products)['name']
+    return 'get', reverse('product_top_search') + f'?topQuery={name[-4:]}', None
+
+
+def detail(ctx, rng, transport):
+    product = rng.choice(ctx.products)
+    return 'get', reverse('product_detail', args=[product['id'], product['slug']]), None
+
+
+def cart_add(ctx, rng, transport):
+    product = rng.choice(ctx.products)
+    return 'post', reverse('cart-api', args=[product['id']]), {'action': 'add', 'quantity': 1}
+
+
+def cart_remove(ctx, rng, transport):
+    # el producto se agrega antes, fuera de la medicion
+    product = rng.choice(ctx.products)
+    url = reverse('cart-api', args=[product['id']])
+    transport.request('post', url, {'action': 'add', 'quantity': 1})
+    return 'delete', url, {'action': 'delete'}
+
+
+def favorite_toggle(ctx, rng, transport):
+    product = rng.choice(ctx.products)
+    return 'post', reverse('toggle-favorite', args=[product['id']]), {}
+
+
+def checkout(ctx, rng, transport):
+    # el checkout vacia el carrito, se repone fuera de la medicion
+    cart, _ = Cart.objects.get_or_create(user=transport.user)
+    CartItem.objects.filter(cart=cart).delete()
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product_id=product['id'], quantity=1) for product in rng.sample(ctx.products, 3)
+    ])
+    return 'post', reverse('valid_order_form'), CHECKOUT_DATA
+
+
+def dashboard(ctx, rng, transport):
+    section = rng.choice(('products', 'statistics'))
+    return 'get', reverse('get-dashboard', args=[section]), None
+
+
+# name: (builder, user needed, admin)
+SCENARIOS = {
+    'home': (home, False, False),
+    'listing': (listing, False, False),
+    'listing_filtered': (listing_filtered, False, False),
+    'search': (search, False, False),
+    'detail': (detail, False, False),
+    'cart_add': (cart_add, True, False),
+    'cart_remove': (cart_remove, True, False),
+    'favorite_toggle': (favorite_toggle, True, False),
+    'checkout': (checkout, True, False),
+    'dashboard': (dashboard, True, True),
+}
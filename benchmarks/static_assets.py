@@ -0,0 +1,70 @@
+
+
+import os
+import re
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from products.models import Product
+
+# <link href="..."> y <script src="..."> de los estaticos propios (los CDN no cuentan)
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="(?P<url>/?%s[^"]+\.(?:css|js))"' % re.escape(settings.STATIC_URL.lstrip('/')))
+
+MODES = {
+    # desarrollo: un request por archivo, sin minificar
+    'files': override_settings(COMPRESS_ENABLED=False, COMPRESS_OFFLINE=False),
+    # produccion despues de build_static
+    'bundles': override_settings(COMPRESS_ENABLED=True, COMPRESS_OFFLINE=True),
+}
+
+
+def default_pages() -> dict:
+    """ One page of each type, {name: url}. """
+    pages = {'home': reverse('Home'), 'product_list': reverse('product_list'), 'cart': reverse('cart_page_detail')}
+    product = Product.objects.filter(available=True, slug__isnull=False).only('id', 'slug').first()
+    if product:
+        pages['product_detail'] = reverse('product_detail', args=[product.id, product.slug])
+    return pages
+
+
+def asset_urls(html) -> list:
+    return [match.group('url') for match in ASSET_RE.finditer(html)]
+
+
+def asset_size(url, encoding=None) -> int:
+    """ Bytes of the file in STATIC_ROOT, with encoding ('br'/'gz') the precompressed variant if it exists. """
+    name = url.split(settings.STATIC_URL.strip('/') + '/', 1)[-1]
+    path = os.path.join(settings.STATIC_ROOT, name)
+    if encoding and os.path.exists(f'{path}.{encoding}'):
+        path = f'{path}.{encoding}'
+    return os.path.getsize(path)
+
+
+def run(pages=None, log=print) -> dict:
+    """
+    Renders each page with the separate files and with the offline bundles and sums the
+    css/js that the browser downloads (needs build_static).
+
+    Returns:
+        dict: {page: {mode: {'requests', 'kb', 'kb_gzip', 'kb_brotli'}}}
+    """
+    if not os.path.isdir(settings.STATIC_ROOT):
+        raise ValueError(f"No existe {settings.STATIC_ROOT}, correr python manage.py build_static")
+
+    client = Client(raise_request_exception=False)
+    report = {}
+    for name, url in (pages or default_pages()).items():
+        report[name] = {}
+        for mode, mode_settings in MODES.items():
+            with mode_settings:
+                urls = asset_urls(client.get(url).content.decode())
+            report[name][mode] = {
+                'requests': len(urls),
+                'kb': round(sum(asset_size(u) for u in urls) / 1024, 1),
+                'kb_gzip': round(sum(asset_size(u, 'gz') for u in urls) / 1024, 1),
+                'kb_brotli': round(sum(asset_size(u, 'br') for u in urls) / 1024, 1),
+            }
+        log(name, report[name])
+    return report
@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase, TestCase
+
+# Create your tests here.
+from benchmarks import catalog, imports, runner
+from orders.models import Order
+from products.models import Product
+
+
+class CatalogGeneratorTest(TestCase):
+    def test_generate_and_clear(self):
+        counts = catalog.generate_catalog(products=30, categories=3, brands=4, users=5, orders=10, log=lambda msg: None)
+
+        self.assertEqual(counts['products'], 30)
+        self.assertEqual(counts['subcategories'], 15)
+        self.assertEqual(Order.objects.filter(items__isnull=False).distinct().count(), 10)
+        self.assertTrue(all(order.total > 500 for order in Order.objects.all()))
+
+        # misma seed, mismos datos
+        first = list(Product.objects.order_by('id').values_list('price', 'stock'))
+        catalog.clear_catalog(log=lambda msg: None)
+        self.assertFalse(Product.objects.filter(slug__startswith='bench-').exists())
+        catalog.generate_catalog(products=30, categories=3, brands=4, users=5, orders=10, log=lambda msg: None)
+        self.assertEqual(list(Product.objects.order_by('id').values_list('price', 'stock')), first)
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual([runner.percentile(values, p) for p in runner.PERCENTILES], [50, 95, 99])
+
+
+class ColdStartTest(SimpleTestCase):
+    # django.setup() + URLconf en un interprete nuevo, ~0.5 s en desarrollo
+    BUDGET_SECONDS = 1.5
+
+    def test_cold_start_under_budget_without_heavy_imports(self):
+        # el mejor de 3 arranques, para no depender de la carga de la maquina
+        runs = [imports.cold_start()[0] for _ in range(3)]
+
+        self.assertLess(min(r['total'] for r in runs), self.BUDGET_SECONDS)
+        self.assertEqual(imports.loaded(runs[0]['modules_setup'], imports.LAZY_SETUP_IMPORTS), [])
+        self.assertEqual(imports.loaded(runs[0]['modules'], imports.LAZY_IMPORTS), [])
+
+    def test_importtime_is_attributed_to_the_importing_app(self):
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       500 |        500 |       aiohttp.client",
+            "import time:       100 |        600 |     aiohttp",
+            "import time:        50 |        650 |   products.utils",
+            "import time:        20 |        670 | products.signals",
+            "import time:       300 |        300 | django.db",
+        ])
+        by_app, heavy = imports.summarize(imports.parse_importtime(stderr), {'products'})
+
+        self.assertEqual(by_app, {'products': 0.7, 'django': 0.3})
+        self.assertEqual(heavy[0], ('products.utils', 'aiohttp', 0.6))
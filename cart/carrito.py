@@ -3,6 +3,7 @@
 from cart.models import Cart
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from products.cards import cache_product_cards, get_product_cards
 
 
 class Carrito:
@@ -13,7 +14,12 @@ class Carrito:
         # Esto viene del middleware, puede ser None si no está autenticado
         self.cart = request.cart
         
-        self.carrito = self.session.get("carrito", {})
+        # formato compacto {product_id: quantity}, las sesiones viejas guardaban el dict del producto
+        self.carrito = {
+            product_id: value['quantity'] if isinstance(value, dict) else value
+            for product_id, value in self.session.get("carrito", {}).items()
+        }
+        self._cards = None
         
         self.cart_id = self.session.get("cart_id", None)
         self.last_modified = self.session.get('last_modified', None)
@@ -59,6 +65,13 @@ class Carrito:
         self.save_session(cart_id=cart.id)
         
         
+    @property
+    def cards(self) -> dict:
+        """ Product data of the items, read once per request from the shared product cache. """
+        if self._cards is None:
+            self._cards = get_product_cards(self.carrito)
+        return self._cards
+
     def get_cart_serializer(self) -> dict:
         """
         Return a dict with:
@@ -66,24 +79,13 @@ class Carrito:
             - 'cart_price': total price (float)
             - 'cart_quantity': total items (int)
         """
-        cart_items = []
+        cart_items = self.items
         total_price = 0
         total_items = 0
 
-        if self.carrito:
-            for values in self.carrito.values():
-                item = {
-                    'id': int(values['id']),
-                    'name': values['name'],
-                    'slug': values['slug'],
-                    'price': float(values['price']),
-                    'image': values['image'],
-                    'quantity': int(values['quantity']),
-                    'stock': int(values['stock']),
-                }
-                cart_items.append(item)
-                total_price += item['price'] * item['quantity']
-                total_items += item['quantity']
+        for item in cart_items:
+            total_price += item['price'] * item['quantity']
+            total_items += item['quantity']
 
         dict_context = {
             'cart': cart_items,
@@ -101,7 +103,7 @@ class Carrito:
             - The 'self.total' attribute is used to calculate this value only once 
             via the context processor, and then it is passed to templates as context.
         """
-        t = sum(item['price'] * item['quantity'] for item in self.carrito.values()) if self.carrito else 0
+        t = sum(item['price'] * item['quantity'] for item in self.items)
         return float(t)
 
 
@@ -110,17 +112,22 @@ class Carrito:
         """
         Returns the total quantity of all products in the cart.
         """
-        t = sum(item['quantity'] for item in self.carrito.values()) if self.carrito else 0
+        t = sum(self.carrito.values())
         return t
 
 
     @property
-    def items(self):
+    def items(self) -> list:
         """
-        Returns the cart items as a (key, value) dictionary pair 
-        so it can be easily used in Django views and templates.
+        Returns the cart items (product card + quantity) so they can be easily used
+        in Django views and templates. Products that no longer exist are skipped.
         """
-        return self.carrito.items()
+        cards = self.cards
+        return [
+            {**cards[int(product_id)], 'quantity': int(quantity)}
+            for product_id, quantity in self.carrito.items()
+            if int(product_id) in cards
+        ]
 
 
     # ======================================================================
@@ -159,12 +166,12 @@ class Carrito:
         
         # cart = Cart.objects.get(id=self.cart_id)
         product_id = str(product.id)
-        item_data = self.carrito.get(product_id)    # product_data or None
+        quantity = self.carrito.get(product_id)    # quantity or None
         
         # Delegamos toda la lógica al modelo Cart
         cart.sync_item_from_session(
             product=product,
-            item_data=item_data
+            quantity=quantity
         )
         
     def add_product(self, product, quantity=1) -> bool:
@@ -181,18 +188,11 @@ class Carrito:
         product_id = str(product.id)
         
         # Update the cart in the session
-        if product_id not in self.carrito:
-            self.carrito[product_id] = {
-                "id": product.id,
-                "name": product.name,
-                "slug": product.slug,
-                "price": float(product.price),
-                "image": product.main_image,
-                "quantity": quantity,
-                "stock": product.stock,
-            }
-        else:
-            self.carrito[product_id]["quantity"] += quantity
+        self.carrito[product_id] = self.carrito.get(product_id, 0) + quantity
+        
+        # el producto ya esta cargado, su tarjeta queda en cache para el serializer
+        cache_product_cards([product])
+        self._cards = None
         
         # save data in session
         self.save_session(cart_id=self.cart_id)
@@ -209,8 +209,8 @@ class Carrito:
         """
         product_id = str(product.id)
         
-        if self.carrito[product_id]["quantity"] > 1:
-            self.carrito[product_id]["quantity"] -= quantity
+        if self.carrito[product_id] > 1:
+            self.carrito[product_id] -= quantity
             delete_item = False
         else:
             # eliminar el producto si la cantidad llega a 0
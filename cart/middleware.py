@@ -1,12 +1,33 @@
 
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 from cart.models import Cart
 
 class CartMiddleware:
+    # con ASGI las vistas async no pasan por un thread solo por este middleware
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        self.load_cart(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # request.user y request.auser() cachean por separado, asi la vista async no repite la query
+        request.user = await request.auser()
+        await sync_to_async(self.load_cart)(request)
+        return await self.get_response(request)
+
+    def load_cart(self, request):
         if request.user.is_authenticated:
             cart_id = request.session.get('cart_id')
 
@@ -25,8 +46,6 @@ class CartMiddleware:
                 request.session['cart_id'] = cart.id
         else:
             request.cart = None
-
-        return self.get_response(request)
     
     
 """  
@@ -2,6 +2,7 @@ from django.db import models
 
 # Create your models here.
 from users.models import CustomUser
+from products.cards import cache_product_cards
 from products.models import Product
 
 from django.db import transaction
@@ -22,16 +23,10 @@ class Cart(models.Model):
         """
         Recupera todos los items guardados en la db, y los transforma al diccionario que utiliza carrito de la session
         
-        Estructura del carrito de la session (shop_cart):
-            self.carrito = {
-                "1": {
-                    "id": 1,
-                    "name": "Product 1",
-                    "price": 20.99,
-                    "image": "image_url_1.jpg",
-                    "quantity": 2,
-                },
-            }
+        Estructura del carrito de la session (shop_cart), solo ids y cantidades:
+            self.carrito = {"1": 2, "7": 1}
+        Los datos de cada producto (nombre, precio, imagen, stock) se leen de products.cards,
+        aca se aprovechan los productos ya cargados para dejar sus tarjetas en cache.
         
         Returns:
             un diccionario adaptado al formato del self.carrito de la session que utiizamos,
@@ -43,19 +38,20 @@ class Cart(models.Model):
             self.items
             .select_related('product')
             .only(
-                'quantity',
+                'quantity', 'cart_id',    # sin cart_id el related manager lo carga con 1 query por item
                 'product__id', 'product__name', 'product__slug', 'product__price',
                 'product__main_image', 'product__stock', 'product__available'
             )
             .filter(product__available=True)
         )
         
+        products = []
         for item in items:
             product = item.product
             product_id = str(product.id)
             
             # 2. sería la cantidad combinada de ambos carritos
-            combined_qty = max(item.quantity, shop_cart.get(product_id, {}).get('quantity', 0))
+            combined_qty = max(item.quantity, shop_cart.get(product_id, 0))
             
             # 3. consultamos disponibilidad de la cantidad combinada
             is_available, stock = product.stock_or_available(combined_qty)
@@ -65,19 +61,13 @@ class Cart(models.Model):
                 shop_cart.pop(product_id, None)
                 continue
             
-            # 5. si llegamos hasta aca actualizamos con los datos del producto
-            shop_cart[str(product.id)] = {
-                "id": product.id,
-                "name": product.name,
-                "slug": product.slug,
-                "price": float(product.price),
-                "image": product.main_image,
-                'quantity': min(combined_qty, stock),    # colocamos la cantidad maxima disponible en esta instancia
-                'stock': stock,
-            }
+            # 5. si llegamos hasta aca colocamos la cantidad maxima disponible en esta instancia
+            shop_cart[product_id] = min(combined_qty, stock)
+            products.append(product)
             
         # 6. Actualizamos los items en el Cart de la db basado en los id obtenidos
         self.save_items(shop_cart)
+        cache_product_cards(products)
            
         # 7. retornamos el dict para ser utilizado como cart de la session
         return shop_cart
@@ -93,16 +83,13 @@ class Cart(models.Model):
             # 1. Preparar datos para bulk_update/create
             current_items = {
                 str(item.product_id): item 
-                for item in self.items.only('product_id', 'quantity').all()
+                for item in self.items.only('cart_id', 'product_id', 'quantity').all()
             }
             updates = []
             creates = []
             
             # 2. Comparar con shop_cart
-            for product_id, item_data in shop_cart.items():
-                print(f'producto id: {product_id}, y cantidad: {item_data['quantity']}')
-                quantity = item_data['quantity']
-                
+            for product_id, quantity in shop_cart.items():
                 if product_id in current_items:  # Item existente
                     item = current_items[product_id]
                     if item.quantity != quantity:
@@ -134,16 +121,16 @@ class Cart(models.Model):
             # 5. Actualizar last_modified
             self.touch()
             
-    def sync_item_from_session(self, product: Product, item_data: dict = None):
+    def sync_item_from_session(self, product: Product, quantity: int = None):
         """
         Sincroniza un producto del carrito de sesión con la base de datos.
-        - Si item_data es None, elimina el producto.
+        - Si quantity es None, elimina el producto.
         - Si existe, actualiza o crea el CartItem.
         """
-        if item_data is None:
+        if quantity is None:
             self.remove_product(product)
         else:
-            self.add_or_update_product(product, item_data['quantity'])
+            self.add_or_update_product(product, quantity)
         
         self.touch()  # Actualiza last_modified
 
@@ -1,8 +1,13 @@
+from django.core.cache import cache
 from django.test import TestCase
 
 # Create your tests here.
+from django.urls import reverse
+
 from cart.carrito import Carrito
+from ecommerce.testing import QueryBudgetMixin
 from cart.models import Cart, CartItem
+from products.cards import get_product_cards
 from products.models import Product
 from django.contrib.auth import get_user_model
 
@@ -38,3 +43,62 @@ class CartModelTest(TestCase):
     def test_carrito_asociado_a_usuario(self):
         # Verificar que el carrito está correctamente asociado al usuario
         self.assertEqual(self.carrito.user, self.user)
+
+
+class CartAPIBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        self.products = [Product.objects.create(name=f"Product {i}", stock=10, price=100, available=True) for i in range(5)]
+        self.client.force_login(self.user)
+
+    def test_add_product_query_budget(self):
+        for product in self.products[:4]:
+            self.client.post(
+                reverse('cart-api', args=[product.id]), {'action': 'add', 'quantity': 1},
+                content_type='application/json'
+            )
+        # middleware + producto + sync del Cart (fijo) + alta del item + session (lectura desde cache), sin queries por item
+        self.assertViewBudget(
+            'post', reverse('cart-api', args=[self.products[4].id]), max_queries=16,
+            data={'action': 'add', 'quantity': 1}, content_type='application/json'
+        )
+
+
+class CompactSessionCartTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(name="Product 1", slug="product-1", stock=10, price=100, available=True)
+        self.url = reverse('cart-api', args=[self.product.id])
+
+    def add(self, quantity=1):
+        return self.client.post(self.url, {'action': 'add', 'quantity': quantity}, content_type='application/json')
+
+    def test_session_keeps_only_ids_and_quantities(self):
+        self.add(2)
+        response = self.add(1)
+
+        self.assertEqual(self.client.session['carrito'], {str(self.product.id): 3})
+        item = response.json()['cart']['cart'][0]
+        self.assertEqual(item['name'], "Product 1")
+        self.assertEqual(item['quantity'], 3)
+        self.assertEqual(response.json()['cart']['cart_price'], 300.0)
+
+    def test_card_is_refreshed_after_product_change(self):
+        self.add()
+        self.product.price = 150
+        self.product.save()
+
+        # el carrito se lee del cache de tarjetas, el post_save lo invalida
+        with self.assertNumQueries(1):
+            cards = get_product_cards([self.product.id])
+        self.assertEqual(cards[self.product.id]['price'], 150.0)
+        self.assertEqual(self.add().json()['cart']['cart_price'], 300.0)
+
+    def test_legacy_session_format(self):
+        session = self.client.session
+        session['carrito'] = {str(self.product.id): {'id': self.product.id, 'name': 'viejo', 'quantity': 2, 'stock': 10}}
+        session.save()
+
+        response = self.add(1)
+        self.assertEqual(self.client.session['carrito'], {str(self.product.id): 3})
+        self.assertEqual(response.json()['cart']['cart'][0]['name'], "Product 1")
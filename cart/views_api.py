@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from cart.carrito import Carrito
 from products.models import Product
 from products.utils import valid_id_or_None    
+from products import popularity
 from rest_framework.permissions import AllowAny
 
 
@@ -34,6 +35,7 @@ class CartAPIView(APIView):
         
         if action == 'add':
             cart.add_product(product=product, quantity=quantity)
+            popularity.incr(product.id, 'cart_adds')
             detail = "Producto agregado."
             
         elif action == 'substract':
@@ -0,0 +1,210 @@
+
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Sum
+from django.utils import timezone
+
+from dashboard.models import SalesDaily, SalesDailyBreakdown
+
+# Orders counted as sales: 4 Pago Confirmado, 5 Enviado, 6 Completado
+SALE_STATUSES = (4, 5, 6)
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+TOP_PRODUCTS_LIMIT = 5
+
+# (dimension, key field, name field, parent field) grouped from ItemOrder
+# las dimensiones product* guardan en parent_id la categoria, marca o metodo de pago para los top por cada uno
+ITEM_DIMENSIONS = (
+    ('category', 'product__category_id', 'product__category__name', None),
+    ('brand', 'product__brand_id', 'product__brand__name', None),
+    ('product', 'product_id', 'product__name', 'product__category_id'),
+    ('product_brand', 'product_id', 'product__name', 'product__brand_id'),
+    ('product_payment', 'product_id', 'product__name', 'order__payment_id'),
+)
+
+LINE_TOTAL = ExpressionWrapper(
+    F('quantity') * F('final_price'), output_field=DecimalField(max_digits=14, decimal_places=2)
+)
+
+
+def day_bounds(day):
+    """ Returns the aware [start, end) datetimes of a local day. """
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=1)
+
+
+def order_day(order):
+    """ Day under which an order is accounted (local date of its creation). """
+    return timezone.localdate(order.created_at)
+
+
+def rebuild_sales_day(day):
+    """
+    Recomputes the rollup rows of a single day from Order/ItemOrder.
+
+    Only the orders of that day are read (index on created_at), so the cost does not
+    grow with the history. The SalesDaily row is locked while rebuilding so two
+    concurrent status changes of the same day can not write duplicated breakdowns.
+
+    Args:
+        day (date): Local date to rebuild.
+
+    Returns:
+        SalesDaily | None: The updated row, None when the day has no sales.
+    """
+    from orders.models import ItemOrder, Order
+
+    start, end = day_bounds(day)
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end, status_id__in=SALE_STATUSES)
+    items = ItemOrder.objects.filter(
+        order__created_at__gte=start, order__created_at__lt=end, order__status_id__in=SALE_STATUSES
+    )
+
+    with transaction.atomic():
+        SalesDaily.objects.get_or_create(date=day)
+        daily = SalesDaily.objects.select_for_update().get(date=day)
+
+        totals = orders.aggregate(orders=Count('id'), revenue=Sum('total'))
+        if not totals['orders']:
+            SalesDailyBreakdown.objects.filter(date=day).delete()
+            daily.delete()
+            return None
+
+        breakdowns = []
+        for dimension, key, name, parent in ITEM_DIMENSIONS:
+            fields = {'key_id': F(key), 'key_name': F(name)}
+            if parent:
+                fields['parent_id'] = F(parent)
+            rows = items.values(**fields).annotate(
+                orders=Count('order_id', distinct=True), units=Sum('quantity'), revenue=Sum(LINE_TOTAL)
+            )
+            breakdowns.extend(_breakdown(day, dimension, row) for row in rows)
+
+        # el metodo de pago es de la orden, el revenue incluye envio y cupon como en SalesDaily
+        units_by_payment = dict(
+            items.values_list('order__payment_id').annotate(units=Sum('quantity'))
+        )
+        rows = orders.values(key_id=F('payment_id'), key_name=F('payment__name')).annotate(
+            orders=Count('id'), revenue=Sum('total')
+        )
+        for row in rows:
+            row['units'] = units_by_payment.get(row['key_id'], 0)
+            breakdowns.append(_breakdown(day, 'payment', row))
+
+        SalesDailyBreakdown.objects.filter(date=day).delete()
+        SalesDailyBreakdown.objects.bulk_create(breakdowns)
+
+        daily.orders = totals['orders']
+        daily.revenue = totals['revenue'] or 0
+        daily.units = items.aggregate(units=Sum('quantity'))['units'] or 0
+        daily.save()
+
+    return daily
+
+
+def _breakdown(day, dimension, row):
+    return SalesDailyBreakdown(
+        date=day, dimension=dimension,
+        key_id=row['key_id'] or 0,
+        key_name=(row['key_name'] or 'Sin asignar')[:120],
+        parent_id=row.get('parent_id'),
+        orders=row['orders'] or 0,
+        units=row['units'] or 0,
+        revenue=row['revenue'] or 0,
+    )
+
+
+def sales_days(since=None, until=None):
+    """ Distinct local days that have sales orders, used by the backfill command. """
+    from orders.models import Order
+    from django.db.models.functions import TruncDate
+
+    orders = Order.objects.filter(status_id__in=SALE_STATUSES)
+    if since:
+        orders = orders.filter(created_at__gte=day_bounds(since)[0])
+    if until:
+        orders = orders.filter(created_at__lt=day_bounds(until)[1])
+
+    return orders.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct().order_by('day')
+
+
+def get_sales_context(days=DEFAULT_DAYS, category_id=None, brand_id=None, payment_id=None):
+    """
+    Builds the statistics section of the dashboard reading only rollup rows.
+
+    Args:
+        days (int, optional): Window of days until today. Defaults to DEFAULT_DAYS.
+        category_id (int, optional): When given, top_products is limited to that category.
+        brand_id (int, optional): Same for a brand, if there is no category_id.
+        payment_id (int, optional): Same for a payment method, if there is no category_id or brand_id.
+
+    Returns:
+        dict: Keys 'days', 'totals', 'daily', 'categories', 'brands', 'payments', 'top_products',
+        'top_products_by_category', 'top_products_by_brand' and 'top_products_by_payment'.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+
+    daily = list(SalesDaily.objects.filter(date__gte=since).values('date', 'orders', 'units', 'revenue'))
+    for row in daily:
+        row['avg_ticket'] = _avg(row['revenue'], row['orders'])
+
+    total_orders = sum(row['orders'] for row in daily)
+    total_revenue = sum((row['revenue'] for row in daily), Decimal('0'))
+    totals = {
+        'orders': total_orders,
+        'units': sum(row['units'] for row in daily),
+        'revenue': total_revenue,
+        'avg_ticket': _avg(total_revenue, total_orders),
+    }
+
+    breakdowns = SalesDailyBreakdown.objects.filter(date__gte=since)
+
+    def _by_dimension(dimension, extra=()):
+        return list(
+            breakdowns.filter(dimension=dimension).values('key_id', *extra).annotate(
+                name=Max('key_name'), orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue')
+            ).order_by('-revenue', 'key_id')
+        )
+
+    def _top_by_parent(dimension):
+        top = defaultdict(list)
+        for product in _by_dimension(dimension, extra=('parent_id',)):
+            if len(top[product['parent_id']]) < TOP_PRODUCTS_LIMIT:
+                top[product['parent_id']].append(product)
+        return dict(top)
+
+    products = _by_dimension('product', extra=('parent_id',))
+    top_by_category = _top_by_parent('product')
+    top_by_brand = _top_by_parent('product_brand')
+    top_by_payment = _top_by_parent('product_payment')
+
+    if category_id:
+        top_products = top_by_category.get(category_id, [])
+    elif brand_id:
+        top_products = top_by_brand.get(brand_id, [])
+    elif payment_id:
+        top_products = top_by_payment.get(payment_id, [])
+    else:
+        top_products = products[:TOP_PRODUCTS_LIMIT]
+
+    return {
+        'days': days,
+        'totals': totals,
+        'daily': daily,
+        'categories': _by_dimension('category'),
+        'brands': _by_dimension('brand'),
+        'payments': _by_dimension('payment'),
+        'top_products': top_products,
+        'top_products_by_category': top_by_category,
+        'top_products_by_brand': top_by_brand,
+        'top_products_by_payment': top_by_payment,
+    }
+
+
+def _avg(revenue, orders):
+    return round(revenue / orders, 2) if orders else 0
@@ -0,0 +1,156 @@
+
+
+import csv
+import tempfile
+from datetime import datetime
+
+from django.utils import timezone
+
+from orders.models import Order
+from products.models import Product
+
+# Rows are read with a server-side cursor (PostgreSQL) in chunks of this size,
+# so the memory used by an export does not depend on the number of rows
+EXPORT_CHUNK_SIZE = 2000
+
+# (header, field of .values()) for each exportable model
+PRODUCT_COLUMNS = (
+    ('id', 'id'),
+    ('nombre', 'name'),
+    ('slug', 'slug'),
+    ('precio', 'price'),
+    ('precio lista', 'price_list'),
+    ('descuento', 'discount'),
+    ('stock', 'stock'),
+    ('stock reservado', 'stock_reserved'),
+    ('disponible', 'available'),
+    ('categoria', 'category__name'),
+    ('subcategoria', 'subcategory__name'),
+    ('marca', 'brand__name'),
+    ('imagen', 'main_image'),
+    ('actualizado', 'updated_at'),
+)
+
+# one row per ItemOrder, orders without items are exported with empty item columns (LEFT JOIN)
+ORDER_COLUMNS = (
+    ('orden', 'id'),
+    ('fecha', 'created_at'),
+    ('estado', 'status__name'),
+    ('usuario', 'user__email'),
+    ('nombre', 'name'),
+    ('dni', 'dni'),
+    ('email', 'email'),
+    ('pago', 'payment__name'),
+    ('envio', 'shipment__method__name'),
+    ('costo envio', 'shipment_cost'),
+    ('cupon', 'discount_coupon'),
+    ('total', 'total'),
+    ('producto id', 'items__product_id'),
+    ('producto', 'items__product__name'),
+    ('cantidad', 'items__quantity'),
+    ('precio original', 'items__original_price'),
+    ('descuento', 'items__discount'),
+    ('precio final', 'items__final_price'),
+)
+
+EXPORTS = {
+    'products': (
+        PRODUCT_COLUMNS,
+        lambda: Product.objects.order_by('id'),
+    ),
+    'orders': (
+        ORDER_COLUMNS,
+        lambda: Order.objects.order_by('id', 'items__id'),
+    ),
+}
+
+FORMATS = ('csv', 'xlsx')
+
+
+def iter_rows(model_name: str):
+    """
+    Yields the header and then one list per row of the requested export.
+
+    Args:
+        model_name (str): One of EXPORTS keys ('products', 'orders').
+
+    Raises:
+        ValueError: If the model_name is not exportable.
+    """
+    if model_name not in EXPORTS:
+        raise ValueError(f"Exportación '{model_name}' no soportada. Use: {', '.join(EXPORTS)}")
+
+    columns, get_queryset = EXPORTS[model_name]
+    yield [header for header, _ in columns]
+
+    fields = [field for _, field in columns]
+    rows = get_queryset().values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield [_clean(value) for value in row]
+
+
+def _clean(value):
+    """ Datetimes in local time without tz for excel, None as empty cells. """
+    if value is None:
+        return ''
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        # la DB devuelve UTC, el excel muestra la hora de la tienda (TIME_ZONE)
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+class Echo:
+    """ Pseudo buffer for csv.writer, each write returns the line instead of storing it. """
+    def write(self, value):
+        return value
+
+
+def stream_csv(model_name: str):
+    """ Generator of CSV lines to be used with StreamingHttpResponse. """
+    writer = csv.writer(Echo())
+    for row in iter_rows(model_name):
+        yield writer.writerow(row)
+
+
+def write_csv(model_name: str, file_obj) -> int:
+    """
+    Writes the export to an open text file.
+
+    Returns:
+        int: Number of rows written (without the header).
+    """
+    writer = csv.writer(file_obj)
+    count = -1
+    for count, row in enumerate(iter_rows(model_name)):
+        writer.writerow(row)
+    return max(count, 0)
+
+
+def write_xlsx(model_name: str, file_obj) -> int:
+    """
+    Writes the export to a binary file using an openpyxl write-only workbook,
+    rows are flushed to disk as they are appended instead of kept in memory.
+
+    Returns:
+        int: Number of rows written (without the header).
+    """
+    from openpyxl import Workbook    # heavy import, only when exporting to excel
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=model_name)
+    count = -1
+    for count, row in enumerate(iter_rows(model_name)):
+        ws.append(row)
+    wb.save(file_obj)
+    return max(count, 0)
+
+
+def xlsx_tempfile(model_name: str):
+    """
+    Builds the xlsx export in a temporary file and returns it rewound,
+    ready to be streamed with FileResponse. The file is deleted when closed.
+    """
+    tmp = tempfile.TemporaryFile(suffix='.xlsx')
+    write_xlsx(model_name, tmp)
+    tmp.seek(0)
+    return tmp
@@ -0,0 +1,44 @@
+
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import analytics
+from dashboard.models import SalesDaily, SalesDailyBreakdown
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las tablas de ventas diarias (SalesDaily/SalesDailyBreakdown) del dashboard. "
+        "Ej: python manage.py backfill_sales --since 2025-01-01 --until 2025-01-31"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help="Fecha inicial YYYY-MM-DD (incluida)")
+        parser.add_argument('--until', type=date.fromisoformat, help="Fecha final YYYY-MM-DD (incluida)")
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Borra los rollups del rango antes de recalcular (dias que ya no tienen ventas)"
+        )
+
+    def handle(self, *args, **options):
+        since, until = options['since'], options['until']
+        if since and until and since > until:
+            raise CommandError("--since no puede ser mayor que --until")
+
+        if options['clear']:
+            for model in (SalesDaily, SalesDailyBreakdown):
+                rows = model.objects.all()
+                if since:
+                    rows = rows.filter(date__gte=since)
+                if until:
+                    rows = rows.filter(date__lte=until)
+                rows.delete()
+
+        count = 0
+        for day in analytics.sales_days(since, until).iterator():
+            analytics.rebuild_sales_day(day)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{count} dias recalculados"))
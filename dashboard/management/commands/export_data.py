@@ -0,0 +1,34 @@
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import exports
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta productos u ordenes (con sus items) a CSV o XLSX leyendo la base por chunks. "
+        "Ej: python manage.py export_data orders --format xlsx --output orders.xlsx"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_name', choices=list(exports.EXPORTS))
+        parser.add_argument('--format', dest='file_format', choices=exports.FORMATS, default='csv')
+        parser.add_argument('--output', help="Ruta del archivo de salida (por defecto <model_name>.<format>)")
+
+    def handle(self, *args, **options):
+        model_name = options['model_name']
+        file_format = options['file_format']
+        output = options['output'] or f"{model_name}.{file_format}"
+
+        try:
+            if file_format == 'csv':
+                with open(output, 'w', newline='', encoding='utf-8') as f:
+                    count = exports.write_csv(model_name, f)
+            else:
+                with open(output, 'wb') as f:
+                    count = exports.write_xlsx(model_name, f)
+        except OSError as e:
+            raise CommandError(f"No se pudo escribir {output}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"{count} filas exportadas en {output}"))
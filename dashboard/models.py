@@ -1,3 +1,75 @@
 from django.db import models
 
 # Create your models here.
+
+
+class SalesDaily(models.Model):
+    """
+    Daily rollup of confirmed sales, maintained by dashboard.analytics.
+    One row per day, the dashboard charts read these rows instead of scanning Order/ItemOrder.
+    """
+    date = models.DateField(unique=True)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+
+    @property
+    def avg_ticket(self):
+        return round(self.revenue / self.orders, 2) if self.orders else 0
+
+    def __str__(self):
+        return f"{self.date} - {self.orders} ordenes - ${self.revenue}"
+
+
+class SalesDailyBreakdown(models.Model):
+    """
+    Daily rollup of confirmed sales grouped by a dimension (category, brand, payment or product).
+
+    Notes:
+        - key_id is the id of the grouped object, 0 when it does not exist anymore (SET_NULL).
+        - key_name is denormalized so the dashboard does not need to join the taxonomy tables.
+        - parent_id is only used by the product dimensions and stores the category id (product),
+          brand id (product_brand) or payment method id (product_payment) of the sales, this
+          allows "top products per category/brand/payment" reading only rollup rows.
+    """
+    DIMENSION_CHOICES = [
+        ('category', 'Categoría'),
+        ('brand', 'Marca'),
+        ('payment', 'Método de pago'),
+        ('product', 'Producto'),
+        ('product_brand', 'Producto por marca'),
+        ('product_payment', 'Producto por método de pago'),
+    ]
+    date = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key_id = models.PositiveBigIntegerField(default=0)
+    key_name = models.CharField(max_length=120, blank=True, default='')
+    parent_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            # en PostgreSQL los NULL son distintos en un unique: las filas sin parent_id (category, brand,
+            # payment) y las que lo tienen (product*, el mismo producto por cada metodo de pago) van por separado
+            models.UniqueConstraint(
+                fields=['date', 'dimension', 'key_id'], condition=models.Q(parent_id__isnull=True),
+                name='sales_breakdown_unique_key',
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'dimension', 'key_id', 'parent_id'], condition=models.Q(parent_id__isnull=False),
+                name='sales_breakdown_unique_parent_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'date'], name='sales_breakdown_dim_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.dimension}: {self.key_name} ${self.revenue}"
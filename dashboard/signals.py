@@ -0,0 +1,42 @@
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from orders.models import Order
+from dashboard import analytics
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    # estado con el que se cargo la orden, para detectar cambios en post_save
+    instance._sales_status_id = instance.__dict__.get('status_id')
+
+
+@receiver(post_save, sender=Order)
+def update_sales_rollup(sender, instance, created, **kwargs):
+    """
+    Rebuilds the sales rollup of the order day when it enters or leaves a sale status.
+    Runs after commit so a rolled back checkout never touches the rollups.
+
+    Notes:
+        - QuerySet.update() does not send signals, use the backfill_sales command after bulk changes.
+    """
+    old_status = None if created else instance._sales_status_id
+    new_status = instance.status_id
+    instance._sales_status_id = new_status
+
+    if old_status == new_status:
+        return
+    if old_status not in analytics.SALE_STATUSES and new_status not in analytics.SALE_STATUSES:
+        return
+
+    transaction.on_commit(partial(analytics.rebuild_sales_day, analytics.order_day(instance)))
+
+
+@receiver(post_delete, sender=Order)
+def remove_from_sales_rollup(sender, instance, **kwargs):
+    if instance.status_id in analytics.SALE_STATUSES:
+        transaction.on_commit(partial(analytics.rebuild_sales_day, analytics.order_day(instance)))
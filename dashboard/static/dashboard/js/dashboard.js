@@ -284,6 +284,10 @@ function eventsOnDashboard(sectionId, dashSection, data=null) {
                 banners: [...data.active_banners, ...data.inactive_banners]
             } : null;
         },
+        statistics: (dashSection) => {
+            // se re-renderiza completo, los datos vienen de los rollups diarios
+            renderStatisticsDashboard(dashSection, data);
+        },
     };
 
     // 2. Asignar eventos
@@ -326,7 +330,7 @@ async function getDashboardSection(sectionId) {
     if (!dashSection) throw new Error(`Section "${sectionId}" not found in DOM`);
 
     // 3. Update DOM with new content
-    const excludeSections = ['products', 'categories', 'headers']; // lista de secciones a excluir
+    const excludeSections = ['products', 'categories', 'headers', 'statistics']; // lista de secciones a excluir
     if (!excludeSections.includes(sectionId)) {
         dashSection.innerHTML = data.html;
     }
@@ -0,0 +1,73 @@
+/**
+ * Renders a simple ranking table of a sales breakdown (categories, brands, payments, products).
+ * Rows come already aggregated from the daily rollups (dashboard.analytics).
+ *
+ * @param {string} title - Title of the table
+ * @param {Array<Object>} rows - [{ key_id, name, orders, units, revenue }]
+ * @returns {string} HTML string
+ */
+function renderSalesRanking(title, rows) {
+    const rowsHtml = (rows.length > 0)
+        ? rows.map(r => {
+            const row = deepEscape(r);
+            return /*html*/`
+                <div class="cont-space-between border-secondary bg-secondary p-1 px-2 gap-2">
+                    <span class="text-truncate bolder">${row.name}</span>
+                    <span>${row.units} u. | ${row.orders} ped. | $${row.revenue}</span>
+                </div>
+            `
+        }).join('')
+        : /*html*/`<p class="p-2">Sin ventas en el periodo.</p>`;
+
+    return /*html*/`
+        <div class="border-hover d-flex-col gap-1 p-2">
+            <h3 class="bold-main">${title}</h3>
+            ${rowsHtml}
+        </div>
+    `
+}
+
+
+/**
+ * Renders the statistics section from the JSON of get_dashboard('statistics').
+ *
+ * @param {HTMLElement} dashSection - Container of the section
+ * @param {Object} data - { days, totals, daily, categories, brands, payments, top_products }
+ */
+function renderStatisticsDashboard(dashSection, data) {
+    const totals = deepEscape(data.totals);
+    const maxRevenue = Math.max(1, ...data.daily.map(d => Number(d.revenue)));
+
+    const dailyHtml = data.daily.map(d => {
+        const day = deepEscape(d);
+        const width = Math.round((Number(d.revenue) / maxRevenue) * 100);
+        return /*html*/`
+            <div class="d-flex align-center gap-2" title="${day.orders} pedidos | ticket promedio $${day.avg_ticket}">
+                <span class="w-max">${day.date}</span>
+                <div class="bg-main h-100" style="width: ${width}%; min-height: 12px;"></div>
+                <span class="w-max">$${day.revenue}</span>
+            </div>
+        `
+    }).join('');
+
+    const html = /*html*/`
+        <h2 class="bold-main mt-2">Ventas de los últimos ${data.days} días</h2>
+        <div class="d-flex gap-2 mt-2">
+            <div class="border-secondary p-2"><strong>Ingresos</strong><p>$${totals.revenue}</p></div>
+            <div class="border-secondary p-2"><strong>Pedidos</strong><p>${totals.orders}</p></div>
+            <div class="border-secondary p-2"><strong>Unidades</strong><p>${totals.units}</p></div>
+            <div class="border-secondary p-2"><strong>Ticket Promedio</strong><p>$${totals.avg_ticket}</p></div>
+        </div>
+
+        <div class="d-flex-col gap-1 mt-2">${dailyHtml}</div>
+
+        <div class="d-flex-col gap-2 mt-2">
+            ${renderSalesRanking('Productos más vendidos', data.top_products)}
+            ${renderSalesRanking('Categorías', data.categories)}
+            ${renderSalesRanking('Marcas', data.brands)}
+            ${renderSalesRanking('Métodos de pago', data.payments)}
+        </div>
+    `;
+
+    dashSection.innerHTML = html.replace(/<!--.*?-->/gs, '');
+}
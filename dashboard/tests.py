@@ -1,3 +1,147 @@
 from django.test import TestCase
 
 # Create your tests here.
+import csv
+import io
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from dashboard import exports
+from orders.models import ItemOrder, Order, StatusOrder
+from products.models import Product
+
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        StatusOrder.objects.get_or_create(id=2, name="Pendiente")
+        self.admin = get_user_model().objects.create_user(email="admin@gmail.com", password="1234", role='admin')
+        self.products = [
+            Product.objects.create(name=f"Product {i}", stock=10, price=100, available=True)
+            for i in range(3)
+        ]
+        self.order = Order.objects.create(user=self.admin, status_id=2, total=300)
+        for product in self.products[:2]:
+            ItemOrder.objects.create(order=self.order, product=product, quantity=1, final_price=100)
+        # una orden sin items igual se exporta (LEFT JOIN)
+        self.empty_order = Order.objects.create(user=self.admin, status_id=2)
+
+    def _read_csv(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_products_csv_is_streamed(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dash-export', args=['products', 'csv']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = self._read_csv(response)
+        self.assertEqual(rows[0], [header for header, _ in exports.PRODUCT_COLUMNS])
+        self.assertEqual([row[1] for row in rows[1:]], [p.name for p in self.products])
+
+    def test_orders_export_one_row_per_item(self):
+        rows = list(exports.iter_rows('orders'))[1:]
+        self.assertEqual([row[0] for row in rows], [self.order.id, self.order.id, self.empty_order.id])
+        self.assertEqual(rows[-1][13], '')
+
+    def test_export_datetimes_are_local(self):
+        created_at = datetime(2025, 3, 1, 2, 30, tzinfo=dt_timezone.utc)
+        # 02:30 UTC son las 23:30 del dia anterior en Buenos Aires (TIME_ZONE)
+        self.assertEqual(exports._clean(created_at), datetime(2025, 2, 28, 23, 30))
+
+    def test_export_requires_admin(self):
+        user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        self.client.force_login(user)
+        response = self.client.get(reverse('dash-export', args=['orders', 'xlsx']))
+        self.assertNotEqual(response.status_code, 200)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dash-export', args=['orders', 'xlsx']))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'PK'))
+
+
+class SalesRollupTest(TestCase):
+    def setUp(self):
+        from orders.models import PaymentMethod
+        for status_id, name in ((1, "Cancelado"), (2, "Pendiente"), (4, "Pago Confirmado"), (6, "Completado")):
+            StatusOrder.objects.get_or_create(id=status_id, name=name)
+        self.payment = PaymentMethod.objects.create(id=3, name="Mercado Pago")
+        self.admin = get_user_model().objects.create_user(email="admin@gmail.com", password="1234", role='admin')
+        self.product = Product.objects.create(name="Mouse", stock=10, price=100, available=True)
+
+    def _create_order(self, total, quantity):
+        order = Order.objects.create(user=self.admin, status_id=2, payment=self.payment, total=total)
+        ItemOrder.objects.create(order=order, product=self.product, quantity=quantity, final_price=100)
+        return order
+
+    def _set_status(self, order, status_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status_id = status_id
+            order.save()
+
+    def test_rollup_follows_order_status(self):
+        from dashboard.models import SalesDaily, SalesDailyBreakdown
+
+        order1 = self._create_order(total=210, quantity=2)
+        order2 = self._create_order(total=100, quantity=1)
+        self.assertFalse(SalesDaily.objects.exists())
+
+        self._set_status(order1, 4)
+        self._set_status(order2, 4)
+        daily = SalesDaily.objects.get()
+        self.assertEqual((daily.orders, daily.units, daily.revenue, daily.avg_ticket), (2, 3, 310, 155))
+
+        product_row = SalesDailyBreakdown.objects.get(dimension='product')
+        self.assertEqual((product_row.key_id, product_row.parent_id), (self.product.id, self.product.category_id))
+        self.assertEqual((product_row.units, product_row.revenue), (3, 300))
+
+        # pasar de un estado de venta a otro no cambia nada, cancelar la saca del rollup
+        self._set_status(order1, 6)
+        self._set_status(order2, 1)
+        daily.refresh_from_db()
+        self.assertEqual((daily.orders, daily.revenue), (1, 210))
+
+    def test_breakdown_rows_without_parent_are_unique(self):
+        from django.db import IntegrityError, transaction
+        from django.utils import timezone
+        from dashboard.models import SalesDailyBreakdown
+
+        today = timezone.localdate()
+        SalesDailyBreakdown.objects.create(date=today, dimension='category', key_id=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SalesDailyBreakdown.objects.create(date=today, dimension='category', key_id=1)
+
+        # el mismo producto puede tener una fila por metodo de pago, pero no dos del mismo
+        SalesDailyBreakdown.objects.create(date=today, dimension='product_payment', key_id=1, parent_id=3)
+        SalesDailyBreakdown.objects.create(date=today, dimension='product_payment', key_id=1, parent_id=4)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SalesDailyBreakdown.objects.create(date=today, dimension='product_payment', key_id=1, parent_id=4)
+
+    def test_statistics_section_and_backfill(self):
+        from django.core.management import call_command
+        from dashboard.models import SalesDaily
+
+        order = self._create_order(total=100, quantity=1)
+        Order.objects.filter(id=order.id).update(status_id=4)    # sin señales
+        self.assertFalse(SalesDaily.objects.exists())
+
+        call_command('backfill_sales', stdout=io.StringIO())
+
+        self.client.force_login(self.admin)
+        data = self.client.get(reverse('get-dashboard', args=['statistics'])).json()
+        self.assertEqual(data['totals']['orders'], 1)
+        self.assertEqual(data['top_products'][0]['name'], self.product.name)
+        self.assertEqual(data['payments'][0]['name'], "Mercado Pago")
+
+        # top de productos por marca y por metodo de pago (claves str en el json)
+        by_brand = data['top_products_by_brand'][str(self.product.brand_id)]
+        self.assertEqual([row['key_id'] for row in by_brand], [self.product.id])
+        by_payment = data['top_products_by_payment'][str(self.payment.id)]
+        self.assertEqual((by_payment[0]['units'], Decimal(by_payment[0]['revenue'])), (1, 100))
+
+        data = self.client.get(reverse('get-dashboard', args=['statistics']), {'payment': 999}).json()
+        self.assertEqual(data['top_products'], [])
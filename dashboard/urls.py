@@ -14,4 +14,7 @@ urlpatterns = [
     # html response
     path('dashboard/filter/products', views.dash_filter_products, name='dash-filter-products'),
     
+    # streaming exports (csv / xlsx)
+    path('dashboard/export/<str:model_name>/<str:file_format>/', views.export_data, name='dash-export'),
+    
 ]
@@ -1,7 +1,8 @@
 
 
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse
+from django.utils import timezone
 from django.template.loader import render_to_string
 
 from products import filters
@@ -11,6 +12,8 @@ from django.db.models import Prefetch, F
 
 from home.models import Store, StoreImage
 from products.serializers import ProductListSerializer
+from products.utils import valid_id_or_None
+from dashboard import analytics, exports
 
 
 @admin_or_superuser_required
@@ -123,6 +126,20 @@ def get_dashboard(request, section_name):
             values_sub=('id', 'name', 'is_default', 'image_url', 'category_id')
         )
         return JsonResponse(context)
+    
+    
+    if section_name == 'statistics':
+        # solo lee las tablas de rollups diarios, nunca Order/ItemOrder
+        days = valid_id_or_None(request.GET.get('days')) or analytics.DEFAULT_DAYS
+        days = min(days, analytics.MAX_DAYS)
+        category_id = valid_id_or_None(request.GET.get('category'))
+        brand_id = valid_id_or_None(request.GET.get('brand'))
+        payment_id = valid_id_or_None(request.GET.get('payment'))
+        
+        context = analytics.get_sales_context(
+            days=days, category_id=category_id, brand_id=brand_id, payment_id=payment_id
+        )
+        return JsonResponse(context)
         
 
     context = {'sectionId': section_name}
@@ -144,4 +161,30 @@ def main_dashboard(request):
         'msg': 'Hola',
     }
     
-    return render(request, "dashboard/dashboard.html", context)
\ No newline at end of file
+    return render(request, "dashboard/dashboard.html", context)
+
+
+
+@admin_or_superuser_required
+def export_data(request, model_name, file_format):
+    """
+    Streams a full export of products or orders (with their items) as CSV or XLSX.
+
+    The CSV is generated row by row while the queryset is read in chunks, so the memory
+    stays constant no matter how many rows are exported. The XLSX is built with a
+    write-only workbook into a temporary file and streamed from disk.
+    """
+    if model_name not in exports.EXPORTS or file_format not in exports.FORMATS:
+        return JsonResponse({'detail': 'Exportación no soportada.'}, status=404)
+
+    filename = f"{model_name}_{timezone.localdate():%Y%m%d}.{file_format}"
+
+    if file_format == 'csv':
+        response = StreamingHttpResponse(exports.stream_csv(model_name), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    return FileResponse(
+        exports.xlsx_tempfile(model_name), as_attachment=True, filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
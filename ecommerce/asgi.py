@@ -3,6 +3,14 @@ ASGI config for ecommerce project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Deploy with uvicorn workers and the async views enabled, so one worker overlaps many
+calls to ImgBB and Mercado Pago (see products/views_async.py and payments/views_async.py):
+
+    ASYNC_VIEWS=True gunicorn ecommerce.asgi:application -k uvicorn.workers.UvicornWorker
+
+The rest of the views are sync and run in a thread per request, as with WSGI.
+``python manage.py benchmark_async_io`` compares both models against local fake servers.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,158 @@
+
+
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+_MISS = object()
+
+
+class TwoLevelCache(BaseCache):
+    """
+    In-process L1 (LocMemCache, one per worker) in front of the shared L2 cache
+    (settings.CACHES[LOCATION], redis/memcached in production).
+
+    Plain keys live in L1 at most L1_TIMEOUT seconds, so a delete made by another worker is
+    seen after that. For data that must be invalidated everywhere at once use namespaces:
+        - get_versioned/set_versioned store the value under '<namespace>:<version>:<key>'.
+        - bump(namespace) increments the version in L2, the old keys are never read again.
+        - The version itself is kept in L1 only VERSION_TIMEOUT seconds, that is the max time
+          another worker can serve the previous version.
+
+    settings:
+        CACHES['tiered'] = {
+            'BACKEND': 'ecommerce.cache.TwoLevelCache',
+            'LOCATION': 'default',    # alias del cache compartido
+            'OPTIONS': {'L1_TIMEOUT': 5, 'VERSION_TIMEOUT': 2, 'L1_MAX_ENTRIES': 1000},
+        }
+    """
+    # las metricas de request (ecommerce.metrics) cuentan los hits/misses del L2, un hit de L1 no sale del proceso
+    skip_metrics = True
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = location or 'default'
+        self.l1_timeout = options.get('L1_TIMEOUT', 5)
+        self.version_timeout = options.get('VERSION_TIMEOUT', 2)
+        self.versioned_timeout = options.get('VERSIONED_L1_TIMEOUT', 300)
+        # mismo nombre = mismo dict de LocMemCache para todos los threads del proceso
+        self.l1 = LocMemCache(f'tiered-l1-{self.l2_alias}', {
+            'TIMEOUT': self.l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)},
+        })
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def _l1_set(self, key, value, timeout, limit, version=None):
+        if limit <= 0:
+            return    # L1 desactivado (tests)
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        self.l1.set(key, value, limit if timeout is None else min(timeout, limit), version=version)
+
+    # ======================================================================
+    #                   BaseCache API (plain keys)
+    # ======================================================================
+    def get(self, key, default=None, version=None):
+        value = self.l1.get(key, _MISS, version=version)
+        if value is _MISS:
+            value = self.l2.get(key, _MISS, version=version)
+            if value is _MISS:
+                return default
+            self._l1_set(key, value, self.l1_timeout, self.l1_timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self._l1_set(key, value, timeout, self.l1_timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # la atomicidad la da el L2
+        added = self.l2.add(key, value, timeout, version=version)
+        if added:
+            self._l1_set(key, value, timeout, self.l1_timeout, version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.l1.delete(key, version=version)
+        return self.l2.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.l1.has_key(key, version=version) or self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.l1.delete(key, version=version)
+        return self.l2.incr(key, delta, version=version)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def clear_local(self):
+        """ Drops only the L1 of this worker. """
+        self.l1.clear()
+
+    # ======================================================================
+    #                   Namespaces with version keys
+    # ======================================================================
+    def _version_key(self, namespace):
+        return f'ns_version:{namespace}'
+
+    def get_namespace_version(self, namespace) -> int:
+        key = self._version_key(namespace)
+        version = self.l1.get(key)
+        if version is None:
+            version = self.l2.get(key)
+            if version is None:
+                # arranca en un valor distinto despues de un clear del L2, asi un L1 de otro
+                # worker nunca confunde datos viejos con la version nueva
+                version = int(time.time() * 1000)
+                if not self.l2.add(key, version, None):
+                    version = self.l2.get(key, version)
+            self._l1_set(key, version, None, self.version_timeout)
+        return version
+
+    def bump(self, namespace) -> None:
+        """ Invalidates every key of the namespace in every worker (after VERSION_TIMEOUT at most). """
+        key = self._version_key(namespace)
+        self.l1.delete(key)
+        try:
+            self.l2.incr(key)
+        except ValueError:
+            self.l2.set(key, int(time.time() * 1000), None)
+
+    def versioned_key(self, namespace, key) -> str:
+        return f'{namespace}:{self.get_namespace_version(namespace)}:{key}'
+
+    def get_versioned(self, namespace, key, default=None):
+        full_key = self.versioned_key(namespace, key)
+        value = self.l1.get(full_key, _MISS)
+        if value is _MISS:
+            value = self.l2.get(full_key, _MISS)
+            if value is _MISS:
+                return default
+            self._l1_set(full_key, value, self.versioned_timeout, self.versioned_timeout)
+        return value
+
+    def set_versioned(self, namespace, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        full_key = self.versioned_key(namespace, key)
+        self.l2.set(full_key, value, timeout)
+        self._l1_set(full_key, value, timeout, self.versioned_timeout)
+
+
+class _TieredProxy:
+    """ Lazy access to caches['tiered'] (one instance per thread, like django.core.cache.cache). """
+
+    def __getattr__(self, name):
+        return getattr(caches['tiered'], name)
+
+
+tiered_cache = _TieredProxy()
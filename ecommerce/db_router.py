@@ -0,0 +1,117 @@
+
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+
+# Replica of the read request being processed (see ReplicaRoutingMiddleware), None means primary.
+# Commands, workers and signals outside a request always use the primary.
+_replica = ContextVar('replica', default=None)
+
+STICKY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@contextmanager
+def replica_reads(alias=None):
+    """
+    Reads of settings.REPLICA_READ_APPS inside the block go to one replica (the same one for
+    the whole block, so two queries never see different replication lags).
+    Without replicas configured the block does nothing.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    token = _replica.set(alias or (random.choice(replicas) if replicas else None))
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends catalog and taxonomy reads (settings.REPLICA_READ_APPS) to one of settings.DATABASE_REPLICAS,
+    everything else (cart, orders, payments, favorites, sessions, users) stays on 'default'.
+        - Only inside replica_reads(), so a write request, a worker or a select_for_update
+          never reads stock from a replica.
+        - After the first write of a request the rest of its reads go to the primary.
+
+    Local test with two SQLite files (the replica is a copy of the primary):
+        DATABASES['replica_0'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}
+        DATABASE_REPLICAS = ['replica_0']
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None or model._meta.app_label not in settings.REPLICA_READ_APPS:
+            return 'default'
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # read-your-writes dentro del mismo request, lo que sigue se lee del primario
+        _replica.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # las replicas tienen los mismos datos que el primario
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # las replicas se actualizan por replicacion, no con migrate
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of GET/HEAD/OPTIONS requests to the replicas, except during the
+    sticky-primary window (settings.REPLICA_STICKY_SECONDS) that follows a write request of
+    the same client, so the user always sees its own cart, order or favorite changes even if
+    the replica is behind. The window is kept in a cookie, it avoids a session write per request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if request.method in SAFE_METHODS and not self.is_sticky(request):
+            with replica_reads():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        return self.stick_after_write(request, response)
+
+    async def __acall__(self, request):
+        # sync_to_async copia el contexto, las queries de los threads ven la replica elegida
+        if request.method in SAFE_METHODS and not self.is_sticky(request):
+            with replica_reads():
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+        return self.stick_after_write(request, response)
+
+    def stick_after_write(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE, str(int(time.time()) + self.sticky_seconds),
+                max_age=self.sticky_seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def is_sticky(self, request) -> bool:
+        try:
+            return int(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
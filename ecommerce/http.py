@@ -0,0 +1,33 @@
+
+
+import asyncio
+import weakref
+
+from django.conf import settings
+
+# One ClientSession per event loop: with uvicorn that is one per worker, shared by every request,
+# so the async views reuse keep-alive connections to ImgBB and Mercado Pago.
+_sessions = weakref.WeakKeyDictionary()
+
+
+def get_async_session() -> 'aiohttp.ClientSession':
+    """
+    Shared aiohttp.ClientSession of the running event loop, it must be called from a coroutine.
+    The timeouts are set per request by each caller.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        # aiohttp tarda ~150 ms en importar, solo lo pagan los workers que usan las vistas async
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=settings.ASYNC_HTTP_MAX_CONNECTIONS)
+        session = _sessions[loop] = aiohttp.ClientSession(connector=connector)
+    return session
+
+
+async def close_async_session() -> None:
+    """ Closes the session of the running loop (tests and benchmarks, that create a loop per run). """
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
@@ -0,0 +1,151 @@
+
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger('ecommerce.metrics')
+
+# Metrics of the request being processed in this thread/task (None outside a request)
+_current = ContextVar('request_metrics', default=None)
+_MISS = object()
+
+
+class RequestMetrics:
+    """ Counters of one request: SQL count/time, cache hits/misses and total latency. """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.total_time = 0.0
+        self.sql = []    # statements ejecutados, para los mensajes de los tests
+
+    def server_timing(self) -> str:
+        return (
+            f'sql;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries", '
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses", '
+            f'total;dur={self.total_time * 1000:.1f}'
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'total_ms': round(self.total_time * 1000, 1),
+        }
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - start
+        metrics.queries += 1
+        metrics.sql.append(sql)
+
+
+def _instrument_cache(cache) -> None:
+    """
+    Wraps get/get_many of this cache instance (one per thread) to count hits and misses.
+    The wrappers do nothing when there is no request being measured.
+    """
+    if getattr(cache, '_metrics_instrumented', False) or getattr(cache, 'skip_metrics', False):
+        return
+    original_get, original_get_many = cache.get, cache.get_many
+
+    def get(key, default=None, version=None):
+        value = original_get(key, _MISS, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            if value is _MISS:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISS else value
+
+    def get_many(keys, version=None):
+        keys = list(keys)
+        values = original_get_many(keys, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    cache.get, cache.get_many = get, get_many
+    cache._metrics_instrumented = True
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Measures everything executed inside the block.
+
+    Usage:
+        with collect_metrics() as metrics:
+            ...
+        metrics.queries, metrics.cache_misses, metrics.total_time
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    for alias in settings.CACHES:
+        _instrument_cache(caches[alias])
+
+    start = time.perf_counter()
+    try:
+        with _sql_wrappers():
+            yield metrics
+    finally:
+        metrics.total_time = time.perf_counter() - start
+        _current.reset(token)
+
+
+@contextmanager
+def _sql_wrappers():
+    wrappers = [connections[alias].execute_wrapper(_sql_wrapper) for alias in connections]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+
+class RequestMetricsMiddleware:
+    """
+    Opt-in (settings.REQUEST_METRICS) middleware that records SQL count, SQL time,
+    cache hits/misses and latency of each request.
+        - Adds a Server-Timing header (visible in the Network tab of the browser).
+        - Logs one line per request in the 'ecommerce.metrics' logger with the url name,
+          as a warning when the request goes over REQUEST_METRICS_QUERY_BUDGET queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_budget = getattr(settings, 'REQUEST_METRICS_QUERY_BUDGET', 30)
+
+    def __call__(self, request):
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else request.path
+        response['Server-Timing'] = metrics.server_timing()
+
+        level = logging.WARNING if metrics.queries > self.query_budget else logging.INFO
+        logger.log(level, "%s %s %s", request.method, url_name, metrics.as_dict())
+        return response
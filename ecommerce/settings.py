@@ -9,6 +9,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 #             EVERYTHING RELATED TO ENVIRONMENTAL VARIABLES n DB
 # =====================================================================================
 import environ, os
+from django.core.exceptions import ImproperlyConfigured
+import atexit
+import shutil
+import sys
+import tempfile
 env = environ.Env()    # Init the environment
 
 # configuiracion estander email
@@ -68,8 +73,38 @@ except environ.ImproperlyConfigured:
     EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', 'email_not_found'),
     EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', 'pw_email_not_found'),
     DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-  
-  
+
+
+# Read replicas (DB_REPLICA_HOSTS=host1,host2, same credentials as the primary): catalog and
+# taxonomy reads of GET requests go to a replica, see ecommerce/db_router.py
+DATABASE_REPLICAS = []
+for i, host in enumerate(h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica_{i}'] = dict(DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica_{i}')
+REPLICA_READ_APPS = ['products', 'home']
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 10))    # lecturas al primario despues de escribir
+DATABASE_ROUTERS = ['ecommerce.db_router.PrimaryReplicaRouter']
+
+# Database connections (python manage.py benchmark_connections measures the difference):
+#   - default: persistent connections, each worker thread reuses its connection DB_CONN_MAX_AGE
+#     seconds and CONN_HEALTH_CHECKS replaces it if postgres closed it meanwhile.
+#   - DB_POOL=True: psycopg 3 pool per process, the connection goes back to the pool at the end
+#     of each request. Keep workers * DB_POOL_MAX_SIZE below max_connections of postgres.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+for db in DATABASES.values():
+    db['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL and db['ENGINE'] == 'django.db.backends.postgresql':
+        db['CONN_MAX_AGE'] = 0    # django no permite conexiones persistentes con pool
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),    # segundos esperando una conexion libre
+            'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', 300)),
+        }
+    else:
+        db['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+
 # =====================================================================================
 #             Application definition
 # =====================================================================================
@@ -99,6 +134,9 @@ INSTALLED_APPS = [
     'favorites',
     
     'contact',
+    
+    # load benchmarks (generate_catalog / run_benchmarks), no models
+    'benchmarks',
     'compressor', 
 ]
  
@@ -113,6 +151,84 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+if DATABASE_REPLICAS:
+    MIDDLEWARE.insert(0, 'ecommerce.db_router.ReplicaRoutingMiddleware')
+
+# ======================================================================
+#   Cache: 'default' is shared by every gunicorn worker (redis or memcached in production),
+#   'tiered' adds an in-process L1 for read-mostly data with version-key invalidation
+#   (see ecommerce/cache.py). REDIS_URL or MEMCACHED_LOCATION is required: a file based
+#   cache is only used by the tests and, with LOCAL_FILE_CACHE=True, in local development.
+# ======================================================================
+# manage.py test y pytest se detectan solos, otros runners: DJANGO_TESTING=True
+_test_runner = (len(sys.argv) > 1 and sys.argv[1] == 'test') or 'pytest' in sys.modules
+TESTING = os.getenv('DJANGO_TESTING', str(_test_runner)) == 'True'
+REDIS_URL = os.getenv('REDIS_URL')
+MEMCACHED_LOCATION = os.getenv('MEMCACHED_LOCATION')
+# el culling del FileBasedCache recorre el directorio en cada set, con el default (300) borraria
+# claves calientes todo el tiempo: cards, payloads, snapshots de ordenes, fragmentos
+FILE_CACHE_OPTIONS = {
+    'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 20000)),
+    'CULL_FREQUENCY': 10,    # al llenarse borra 1/10 de las entradas
+}
+
+if REDIS_URL:
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}
+elif MEMCACHED_LOCATION:
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': MEMCACHED_LOCATION}
+elif TESTING:
+    # cada corrida de tests usa su propio directorio, se borra al terminar
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='ecommerce-test-cache-'),
+        'OPTIONS': FILE_CACHE_OPTIONS,
+    }
+    atexit.register(shutil.rmtree, SHARED_CACHE['LOCATION'], ignore_errors=True)
+elif os.getenv('LOCAL_FILE_CACHE', 'False') == 'True':
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ecommerce-cache')),
+        'OPTIONS': FILE_CACHE_OPTIONS,
+    }
+else:
+    raise ImproperlyConfigured(
+        "Falta el cache compartido: definir REDIS_URL o MEMCACHED_LOCATION "
+        "(en desarrollo LOCAL_FILE_CACHE=True usa un cache en archivos)."
+    )
+
+CACHES = {
+    'default': SHARED_CACHE,
+    'tiered': {
+        'BACKEND': 'ecommerce.cache.TwoLevelCache',
+        'LOCATION': 'default',
+        'OPTIONS': {
+            # L1 desactivado en tests: cada test limpia el cache compartido con cache.clear()
+            'L1_TIMEOUT': 0 if TESTING else int(os.getenv('CACHE_L1_TIMEOUT', 5)),
+            'VERSION_TIMEOUT': 0 if TESTING else int(os.getenv('CACHE_VERSION_TIMEOUT', 2)),
+            'VERSIONED_L1_TIMEOUT': 0 if TESTING else 300,
+        },
+    },
+}
+
+# Sessions: 'cached_db' reads from the shared cache and keeps the DB as backup (a cache restart
+# does not log users out), 'cache' skips the DB write of each cart click (only with redis/memcached).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+}
+# con el cache local en archivos las sesiones van solo a la DB, el culling las perderia
+LOCAL_FILE_CACHE = not (REDIS_URL or MEMCACHED_LOCATION or TESTING)
+SESSION_ENGINE = SESSION_ENGINES[os.getenv('SESSION_BACKEND', 'db' if LOCAL_FILE_CACHE else 'cached_db')]
+if LOCAL_FILE_CACHE and SESSION_ENGINE != SESSION_ENGINES['db']:
+    raise ImproperlyConfigured("Con LOCAL_FILE_CACHE=True las sesiones solo pueden usar SESSION_BACKEND=db.")
+SESSION_CACHE_ALIAS = 'default'
+
+# SQL count/time, cache hits and latency per request (Server-Timing header + 'ecommerce.metrics' logger)
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'False') == 'True'
+REQUEST_METRICS_QUERY_BUDGET = int(os.getenv('REQUEST_METRICS_QUERY_BUDGET', 30))
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, 'ecommerce.metrics.RequestMetricsMiddleware')
 
 ROOT_URLCONF = 'ecommerce.urls'
 
@@ -132,6 +248,7 @@ TEMPLATES = [
                 'products.context_processors.get_categories_n_subcats',
                 'home.context_processors.get_ecommerce_data',
                 'cart.context_processors.carrito_total',
+                'home.context_processors.fragment_cache',
             ],
         },
     },
@@ -175,7 +292,17 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # Add for deploy to use "Whitenoise" and "Compress"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# collectstatic: nombres con hash del contenido + variantes .gz/.br que WhiteNoise sirve segun Accept-Encoding
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+if TESTING:
+    # los tests no corren collectstatic, sin manifest {% static %} fallaria
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+# los archivos del manifest y los bundles de compress (CACHE/css/output.<hash>.css) tienen 12 hex
+# del contenido en el nombre, se sirven con cache de un año
+WHITENOISE_IMMUTABLE_FILE_TEST = r'\.[0-9a-f]{12}\.\w+$'
 
 # "compress" stuff
 STATICFILES_FINDERS = [  
@@ -183,10 +310,17 @@ STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.AppDirectoriesFinder',  
     'compressor.finders.CompressorFinder',  
 ]  
-COMPRESS_ENABLED = False  # Desactiva la compresión pero mantiene el tag (default=True)
-COMPRESS_OFFLINE = False    # en produccion a True     
-COMPRESS_CSS_FILTERS = ["compressor.filters.cssmin.CSSMinFilter"]    
-COMPRESS_JS_FILTERS = ["compressor.filters.jsmin.JSMinFilter"]
+# Build (python manage.py build_static): collectstatic + compress offline de un bundle minificado por
+# bloque {% compress %} + .br/.gz de los bundles. En produccion COMPRESS_OFFLINE=True despues del build,
+# en desarrollo cada archivo se sirve por separado y sin minificar
+COMPRESS_OFFLINE = os.getenv('COMPRESS_OFFLINE', 'False') == 'True'
+COMPRESS_ENABLED = COMPRESS_OFFLINE or os.getenv('COMPRESS_ENABLED', 'False') == 'True'
+COMPRESS_FILTERS = {
+    # CssAbsoluteFilter reescribe los url() relativos, el bundle queda en otra carpeta (CACHE/css/)
+    'css': ['compressor.filters.css_default.CssAbsoluteFilter', 'compressor.filters.cssmin.rCSSMinFilter'],
+    'js': ['compressor.filters.jsmin.rJSMinFilter'],
+}
+COMPRESS_CSS_HASHING_METHOD = 'content'    # mismo bundle en todos los servidores del build
 
 
 # Default primary key field type
@@ -205,10 +339,35 @@ REST_FRAMEWORK = {
     ),
 }
 
+# part of the ETags of the catalog (products/conditional.py), set a new value on each deploy
+# so the browsers do not revalidate html rendered with the previous templates
+RELEASE_VERSION = os.getenv('RELEASE_VERSION', '')
+# seconds of the {% cache %} fragments of base.html (home.context_processors.fragment_cache), 0 disables them
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', 60 * 60))
+
 # this is for deployment API imgBB
 IMGBB_KEY = '7923341a22d8128e89471ca8a60919a2'
+IMGBB_API_URL = os.getenv('IMGBB_API_URL', 'https://api.imgbb.com/1/upload')    # fake server en benchmarks
+IMGBB_TIMEOUT = 10
 PYME_NAME = "Cat Cat Games"
 
+# Mercado Pago gateway client (payments/gateway.py), the api url can point to a local fake server
+MERCADO_PAGO_API_URL = os.getenv('MERCADO_PAGO_API_URL', 'https://api.mercadopago.com')
+# secret of the webhooks panel, used to validate the x-signature header of the notifications
+MERCADO_PAGO_WEBHOOK_SECRET = os.getenv('MERCADO_PAGO_WEBHOOK_SECRET', '')
+MP_CONNECT_TIMEOUT = float(os.getenv('MP_CONNECT_TIMEOUT', 3))
+MP_READ_TIMEOUT = float(os.getenv('MP_READ_TIMEOUT', 10))
+MP_MAX_RETRIES = int(os.getenv('MP_MAX_RETRIES', 2))
+MP_POOL_SIZE = int(os.getenv('MP_POOL_SIZE', 10))
+# create the preference in a background thread as soon as the order is created
+MP_BACKGROUND = os.getenv('MP_BACKGROUND', 'True') == 'True'
+MP_BACKGROUND_WORKERS = int(os.getenv('MP_BACKGROUND_WORKERS', 4))
+
+# ASGI deployment (ecommerce/asgi.py): the image uploads and the Mercado Pago pages use the async
+# views (products/views_async.py, payments/views_async.py), that overlap the external calls
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', 100))    # por worker
+
 # this is for deployment and ngrok web hook
 ALLOWED_HOSTS = ['127.0.0.1']
 
@@ -0,0 +1,64 @@
+
+
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from ecommerce.metrics import collect_metrics
+
+
+class Rollback(Exception):
+    """ Raised at the end of rolled_back() to discard every row written inside. """
+
+
+@contextmanager
+def rolled_back(using=None):
+    """
+    Runs the block in a transaction that is always rolled back, for the benchmark commands
+    that write synthetic rows in a real database (benchmark_checkout).
+
+    Usage:
+        with rolled_back():
+            results = self.run(...)
+    """
+    try:
+        with transaction.atomic(using=using):
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin to assert the query budget of a view, unlike assertNumQueries
+    a view can go under the budget without breaking the test.
+
+    Usage:
+        class HomeBudgetTest(QueryBudgetMixin, TestCase):
+            def test_home(self):
+                self.assertViewBudget('get', reverse('Home'), max_queries=6)
+    """
+
+    @contextmanager
+    def assertBudget(self, max_queries, max_cache_misses=None):
+        with collect_metrics() as metrics:
+            yield metrics
+
+        sql = '\n'.join(f"{i}. {statement}" for i, statement in enumerate(metrics.sql, start=1))
+        self.assertLessEqual(
+            metrics.queries, max_queries,
+            f"{metrics.queries} queries ejecutadas, presupuesto {max_queries}:\n{sql}"
+        )
+        if max_cache_misses is not None:
+            self.assertLessEqual(
+                metrics.cache_misses, max_cache_misses,
+                f"{metrics.cache_misses} cache misses, presupuesto {max_cache_misses}"
+            )
+
+    def assertViewBudget(self, method, url, max_queries, max_cache_misses=None, **kwargs):
+        """ Requests the url with self.client and returns the response. """
+        with self.assertBudget(max_queries, max_cache_misses):
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, f"{url} respondio {response.status_code}")
+        return response
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FavoritesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'favorites'
+
+    # Asegura que las señales se carguen
+    def ready(self):
+        import favorites.signals
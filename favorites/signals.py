@@ -0,0 +1,12 @@
+
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from favorites.utils import migrate_session_favs_to_db
+
+
+@receiver(user_logged_in)  # Se dispara dentro de login() en LoginView y RegisterUserView
+def merge_session_favorites(sender, request, user, **kwargs):
+    # Los favoritos guardados como anonimo en la session se pasan a la db al logearse
+    if request is not None:
+        migrate_session_favs_to_db(request, user=user)
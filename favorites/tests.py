@@ -1,3 +1,76 @@
 from django.test import TestCase
 
 # Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from favorites import utils
+from favorites.models import FavoriteProduct
+from products.models import Product
+
+
+class BulkFavoritesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.password = "password123"
+        self.user = get_user_model().objects.create_user(email="favs@gmail.com", password=self.password)
+        self.products = [
+            Product.objects.create(name=f"Product {i}", stock=10, price=100, available=True)
+            for i in range(3)
+        ]
+        self.url = reverse('favorites-bulk')
+
+    def test_bulk_add_and_remove(self):
+        self.client.force_login(self.user)
+        FavoriteProduct.objects.create(user=self.user, product=self.products[0])
+
+        data = {'add': [p.id for p in self.products[1:]], 'remove': [self.products[0].id]}
+        response = self.client.post(self.url, data, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        expected = sorted(p.id for p in self.products[1:])
+        self.assertEqual(response.json()['favorites'], expected)
+        self.assertEqual(
+            sorted(self.user.favorites.values_list('product_id', flat=True)), expected
+        )
+
+    def test_anonymous_favorites_are_merged_on_login(self):
+        ids = [p.id for p in self.products]
+        response = self.client.post(self.url, {'add': ids}, content_type='application/json')
+        self.assertEqual(response.json()['favorites'], ids)
+        self.assertFalse(FavoriteProduct.objects.exists())
+
+        # una favorita ya existente no debe romper el bulk_create
+        FavoriteProduct.objects.create(user=self.user, product=self.products[0])
+
+        response = self.client.post(
+            reverse('widget_login'), {'email': self.user.email, 'password': self.password},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(self.user.favorites.values_list('product_id', flat=True)), ids)
+        self.assertNotIn('favorites', self.client.session)
+
+    def test_anonymous_favorites_are_checked_and_capped(self):
+        ids = [p.id for p in self.products]
+        response = self.client.post(self.url, {'add': ids + [999999]}, content_type='application/json')
+        self.assertEqual(response.json()['favorites'], ids)
+        self.assertEqual(self.client.session['favorites'], ids)
+
+        # al superar el maximo no se guarda nada
+        extra = Product.objects.create(name="Product 3", stock=10, price=100, available=True)
+        old_max, utils.MAX_BULK_FAVORITES = utils.MAX_BULK_FAVORITES, 3
+        try:
+            response = self.client.post(self.url, {'add': [extra.id]}, content_type='application/json')
+        finally:
+            utils.MAX_BULK_FAVORITES = old_max
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.session['favorites'], ids)
+
+    def test_merge_uses_constant_queries(self):
+        from favorites.utils import bulk_sync_favorites
+
+        # existencia de productos + INSERT + lectura del set de favoritos (sin cache)
+        with self.assertNumQueries(3):
+            bulk_sync_favorites(self.user, add_ids=[p.id for p in self.products])
@@ -1,11 +1,12 @@
 
 
 from django.urls import path
-from favorites.views import ToggleFavoriteProduct
+from favorites.views import ToggleFavoriteProduct, BulkFavoriteProducts
 
 
 urlpatterns = [
     path('products/toggle-favorite/<int:product_id>/', ToggleFavoriteProduct.as_view(), name='toggle-favorite'),
+    path('products/favorites/bulk/', BulkFavoriteProducts.as_view(), name='favorites-bulk'),
 
 ]
 
@@ -43,3 +43,132 @@ def get_favs_products(user, return_qs=False, only_ids=True, favorites_ids:set =
     # Return a set of full Product objects using select_related to avoid extra DB hits
     user_favorites = user.favorites.select_related('product')
     return {fav.product for fav in user_favorites}
+
+
+# ======================================================================
+#            Bulk sync n session favorites (anonymous users)
+# ======================================================================
+SESSION_FAVS_KEY = 'favorites'
+# maximo de IDs por request del bulk y de favoritos guardados en la session de un anonimo
+MAX_BULK_FAVORITES = 200
+
+
+def get_session_favs(session) -> set:
+    """
+    Returns the favorite product IDs stored in the session for anonymous users.
+    The session keeps a list because sets are not JSON serializable.
+    """
+    return set(session.get(SESSION_FAVS_KEY, []))
+
+
+def save_session_favs(session, fav_ids: set) -> None:
+    """ Stores the favorite IDs in the session as a sorted list. """
+    session[SESSION_FAVS_KEY] = sorted(fav_ids)
+    session.modified = True
+
+
+def update_session_favs(session, add_ids=(), remove_ids=()) -> set | None:
+    """
+    Adds and removes favorites of an anonymous user in the session.
+
+    Args:
+        session (SessionBase): The session of the anonymous user.
+        add_ids (Iterable[int]): Product IDs to mark as favorites, IDs of missing products are dropped.
+        remove_ids (Iterable[int]): Product IDs to remove from favorites.
+
+    Returns:
+        set[int] | None: The updated favorite IDs, None (nothing saved) if they would be more
+        than MAX_BULK_FAVORITES.
+    """
+    from products.models import Product
+
+    favorites = get_session_favs(session)
+    remove_ids = set(remove_ids)
+    add_ids = set(add_ids) - remove_ids - favorites
+
+    if add_ids:
+        # 1 query, solo para los nuevos: la session no guarda IDs de productos que no existen
+        add_ids = set(Product.objects.filter(id__in=add_ids).values_list('id', flat=True))
+
+    favorites = (favorites | add_ids) - remove_ids
+    if len(favorites) > MAX_BULK_FAVORITES:
+        return None
+
+    save_session_favs(session, favorites)
+    return favorites
+
+
+def bulk_sync_favorites(user, add_ids=(), remove_ids=()) -> set:
+    """
+    Adds and removes many favorite products for a user with a constant number of queries.
+
+    Args:
+        user (User): The authenticated user instance.
+        add_ids (Iterable[int]): Product IDs to mark as favorites.
+        remove_ids (Iterable[int]): Product IDs to remove from favorites.
+
+    Returns:
+        set[int]: The updated set of favorite product IDs (also refreshed in cache).
+
+    Notes:
+        - 1 query to keep only existing product IDs.
+        - 1 INSERT with bulk_create(ignore_conflicts=True), duplicates are skipped by 'unique_favorite'.
+        - 1 DELETE for the removed IDs.
+        - 1 query to build the favorites set only if it was not cached already.
+    """
+    from products.models import Product
+    from favorites.models import FavoriteProduct
+
+    from products import popularity
+
+    remove_ids = set(remove_ids)
+    add_ids = set(add_ids) - remove_ids    # if an ID comes in both lists removal wins
+
+    # obtenemos el set cacheado o creado de nuevo, sirve para saber que cambió realmente
+    favorites = get_favs_products(user, only_ids=True)
+
+    if add_ids:
+        # evita IntegrityError por FK de productos que no existen
+        add_ids = set(Product.objects.filter(id__in=add_ids).values_list('id', flat=True))
+        FavoriteProduct.objects.bulk_create(
+            [FavoriteProduct(user=user, product_id=product_id) for product_id in add_ids],
+            ignore_conflicts=True
+        )
+
+    if remove_ids:
+        FavoriteProduct.objects.filter(user=user, product_id__in=remove_ids).delete()
+
+    # contadores de popularidad solo para los cambios reales
+    for product_id in add_ids - favorites:
+        popularity.incr(product_id, 'favorites')
+    for product_id in remove_ids & favorites:
+        popularity.incr(product_id, 'favorites', amount=-1)
+
+    # actualizamos el set en memoria sin volver a consultar
+    favorites = (favorites | add_ids) - remove_ids
+    cache.set(f'user_favs_{user.id}', favorites, timeout=60*5)  # 5 min
+    return favorites
+
+
+def migrate_session_favs_to_db(request, user=None) -> set | None:
+    """
+    Merges the anonymous favorites stored in the session into FavoriteProduct when the user logs in,
+    the same way Carrito.migrate_carrito_to_cart_db merges the session cart into the Cart model.
+
+    Args:
+        request (HttpRequest): The request whose session holds the anonymous favorites.
+        user (User, optional): The user that just logged in. Defaults to request.user.
+
+    Returns:
+        set[int] | None: The merged favorite IDs or None if there was nothing to migrate.
+    """
+    user = user or request.user
+    session_favs = get_session_favs(request.session)
+    if not session_favs or not user.is_authenticated:
+        return None
+
+    favorites = bulk_sync_favorites(user, add_ids=session_favs)
+
+    # ya quedaron persistidos en la db, no hace falta mantenerlos en la session
+    request.session.pop(SESSION_FAVS_KEY, None)
+    return favorites
@@ -9,7 +9,9 @@ from rest_framework.status import HTTP_401_UNAUTHORIZED, HTTP_400_BAD_REQUEST, H
 from products.models import Product
 from favorites.models import FavoriteProduct
 from favorites.utils import get_favs_products
+from favorites import utils
 from products.utils import valid_id_or_None
+from products import popularity
 from django.core.cache import cache
 
 class ToggleFavoriteProduct(APIView):
@@ -35,9 +37,11 @@ class ToggleFavoriteProduct(APIView):
         if created:
             # este caso es nuevo favorito se agrega
             favorites.add(product_id)
+            popularity.incr(product_id, 'favorites')
         else:
             # este caso si ya existía significa que desfaveo, o sea se quita 
             favorites.discard(product_id)  # si es un set
+            popularity.incr(product_id, 'favorites', amount=-1)
         cache_key = f'user_favs_{user.id}'
         cache.set(cache_key, favorites, timeout=60*5)  # 5 min
 
@@ -46,3 +50,49 @@ class ToggleFavoriteProduct(APIView):
             return Response({'detail': 'Product removed from favorites'}, status=HTTP_200_OK)
 
         return Response({'detail': 'Product added to favorites'}, status=HTTP_200_OK)
+
+
+class BulkFavoriteProducts(APIView):
+    """
+    Adds or removes many favorite products in a single request.
+
+    data_example = {
+        "add": [1, 5, 8],
+        "remove": [3]
+    }
+
+    Anonymous users keep their favorites in the session, they are merged into
+    FavoriteProduct when they log in (see favorites.signals).
+    """
+
+    def post(self, request):
+        add_ids, response = self._valid_ids(request.data.get('add', []))
+        if response:
+            return response
+
+        remove_ids, response = self._valid_ids(request.data.get('remove', []))
+        if response:
+            return response
+
+        if not add_ids and not remove_ids:
+            return Response({'detail': 'No products to update.'}, status=HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        if user.is_authenticated:
+            favorites = utils.bulk_sync_favorites(user, add_ids=add_ids, remove_ids=remove_ids)
+        else:
+            favorites = utils.update_session_favs(request.session, add_ids=add_ids, remove_ids=remove_ids)
+            if favorites is None:
+                detail = f'Anonymous users can keep at most {utils.MAX_BULK_FAVORITES} favorites, please login.'
+                return Response({'detail': detail}, status=HTTP_400_BAD_REQUEST)
+
+        return Response({'detail': 'Favorites updated', 'favorites': sorted(favorites)}, status=HTTP_200_OK)
+
+    def _valid_ids(self, values):
+        if not isinstance(values, list) or len(values) > utils.MAX_BULK_FAVORITES:
+            detail = f'Expected a list of at most {utils.MAX_BULK_FAVORITES} product IDs.'
+            return None, Response({'detail': detail}, status=HTTP_400_BAD_REQUEST)
+
+        ids = {valid_id_or_None(value) for value in values}
+        ids.discard(None)
+        return ids, None
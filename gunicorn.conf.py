@@ -0,0 +1,26 @@
+# gunicorn lee este archivo del directorio de trabajo al arrancar (tambien con -c gunicorn.conf.py)
+import os
+
+
+def post_worker_init(worker):
+    """
+    With WARMUP_ON_FORK=True every new worker loads the shared caches into its L1 and compiles
+    the templates before its first request. The shared caches are filled by python manage.py warmup.
+    """
+    if os.getenv('WARMUP_ON_FORK', 'False') != 'True':
+        return
+    # la app ya esta cargada en el worker, django.setup() ya corrio
+    from home.warmup import warm_worker
+    try:
+        warm_worker()
+    except Exception:
+        worker.log.exception("warmup del worker fallo, los caches se llenan con los primeros requests")
+
+
+def worker_exit(server, worker):
+    """ Persists the popularity counters still buffered in the worker (restart, deploy, max_requests). """
+    from products import popularity
+    try:
+        popularity.flush()
+    except Exception:
+        worker.log.exception("flush de popularidad al salir fallo, se pierden los contadores pendientes")
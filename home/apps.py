@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HomeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'home'
+
+    # Asegura que las señales se carguen
+    def ready(self):
+        import home.signals
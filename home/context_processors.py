@@ -1,10 +1,25 @@
 
 
-from django.core.cache import cache
+from django.conf import settings
+
+from ecommerce.cache import tiered_cache
 from home.models import Store
+from products.filters import CATALOG_CACHE_NAMESPACE
 
-def get_ecommerce_data(request):
-    store = cache.get('store')
+# datos de la tienda para el header/footer de todas las paginas, se invalida en home/signals.py
+STORE_CACHE_NAMESPACE = 'store'
+STORE_CACHE_KEY = 'store'
+STORE_CACHE_TIMEOUT = 3600
+
+
+def get_store(refresh=False) -> dict:
+    """
+    Store data of the header/footer, from the tiered cache.
+
+    Args:
+        refresh (bool): reads it from the DB and stores it even if it is cached (warmup).
+    """
+    store = None if refresh else tiered_cache.get_versioned(STORE_CACHE_NAMESPACE, STORE_CACHE_KEY)
     
     if not store:
         store = Store.objects.filter(id=1).values(
@@ -23,9 +38,27 @@ def get_ecommerce_data(request):
             'email'
         ).first()  # Usar first() para obtener solo un registro
         
-        cache.set('store', store, 3600)
+        tiered_cache.set_versioned(STORE_CACHE_NAMESPACE, STORE_CACHE_KEY, store, STORE_CACHE_TIMEOUT)
 
-    return {'store': store}
+    return store
 
-    
-    
\ No newline at end of file
+
+def get_ecommerce_data(request):
+    return {'store': get_store()}
+
+
+def fragment_cache(request):
+    """
+    Keys of the {% cache %} fragments of home/base.html (navbars, footer, whatsapp menu),
+    stored in the tiered cache. A bump of the store or catalog namespace changes the key,
+    so the fragment is rendered again in every worker and the old one just expires.
+
+    Use Template:
+        {% cache fragment_cache.timeout footer fragment_cache.store fragment_cache.release using='tiered' %}
+    """
+    return {'fragment_cache': {
+        'timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        'store': tiered_cache.get_namespace_version(STORE_CACHE_NAMESPACE),
+        'catalog': tiered_cache.get_namespace_version(CATALOG_CACHE_NAMESPACE),
+        'release': settings.RELEASE_VERSION,    # los templates cambian con cada deploy
+    }}
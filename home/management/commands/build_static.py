@@ -0,0 +1,52 @@
+import os
+
+from compressor.conf import settings as compress_settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from whitenoise.compress import Compressor
+
+
+def precompress_bundles(root) -> list:
+    """
+    Writes the .br/.gz variants of the bundles of compress, collectstatic already did it
+    for the rest of the files (CompressedManifestStaticFilesStorage).
+
+    Returns:
+        list: paths of the variants written.
+    """
+    compressor = Compressor(quiet=True)
+    written = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if compressor.should_compress(filename):
+                written += compressor.compress(os.path.join(dirpath, filename))
+    return written
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los estaticos de produccion: collectstatic (nombres con hash y variantes .br/.gz), "
+        "compress offline (un bundle css/js minificado por bloque {% compress %} de cada template) "
+        "y las variantes .br/.gz de los bundles. Despues del build el servidor corre con COMPRESS_OFFLINE=True. "
+        "Ej: python manage.py build_static && COMPRESS_OFFLINE=True gunicorn ecommerce.wsgi"
+    )
+
+    def handle(self, *args, **options):
+        verbosity = max(options['verbosity'] - 1, 0)
+
+        self.stdout.write("collectstatic...")
+        call_command('collectstatic', interactive=False, verbosity=verbosity)
+
+        # --force: el build corre sin COMPRESS_OFFLINE, recien el servidor lo activa.
+        # Con COMPRESS_ENABLED=False compressor genera un archivo por <link> en vez de un bundle
+        self.stdout.write("compress...")
+        with override_settings(COMPRESS_ENABLED=True):
+            call_command('compress', force=True, verbosity=verbosity)
+
+        bundles_root = os.path.join(compress_settings.COMPRESS_ROOT, compress_settings.COMPRESS_OUTPUT_DIR)
+        written = precompress_bundles(bundles_root)
+        self.stdout.write(self.style.SUCCESS(
+            f"Build listo en {compress_settings.COMPRESS_ROOT}: {len(written)} variantes .br/.gz de los bundles. "
+            f"Medir con python manage.py benchmark_static"
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from home import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Llena los caches compartidos despues de un deploy para que los primeros visitantes no paguen las queries: "
+        "categorias, store, productos y marcas del home, primeras paginas del listado de cada categoria y marca "
+        "y el detalle de los productos mas populares, en paralelo. Informa el tiempo y las claves escritas. "
+        "Ej: python manage.py warmup --pages 2 --products 100 --workers 8"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1, help="Paginas de cada listado (max 3)")
+        parser.add_argument('--products', type=int, default=50, help="Productos populares con el detalle cacheado")
+        parser.add_argument('--workers', type=int, default=4, help="Threads en paralelo")
+
+    def handle(self, *args, **options):
+        report = warmup.run(
+            listing_pages=options['pages'],
+            products=options['products'],
+            workers=options['workers'],
+            log=lambda msg: self.stderr.write(msg),
+        )
+
+        for kind, keys in report['by_kind'].items():
+            self.stdout.write(f"{kind:<16}{keys:>6} claves")
+
+        style = self.style.WARNING if report['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Warmup listo en {report['seconds']} s: {report['keys']} claves escritas, {len(report['errors'])} errores"
+        ))
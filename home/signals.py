@@ -0,0 +1,15 @@
+
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ecommerce.cache import tiered_cache
+from home.models import Store
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store(sender, instance, **kwargs):
+    # antes el store quedaba cacheado 1 hora despues de editarlo desde el dashboard
+    from home.context_processors import STORE_CACHE_NAMESPACE
+    tiered_cache.bump(STORE_CACHE_NAMESPACE)
@@ -1,3 +1,172 @@
+import json
+import os
+import re
+import tempfile
+
 from django.test import TestCase
 
 # Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import override_settings
+from django.urls import reverse
+
+from ecommerce.cache import tiered_cache
+from ecommerce.testing import QueryBudgetMixin
+from home.context_processors import STORE_CACHE_NAMESPACE
+from home.management.commands.build_static import precompress_bundles
+from home import warmup
+from home.models import Store
+from products.models import PBrand, PCategory, Product
+
+
+class HomeBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        Store.objects.create(id=1)
+        category = PCategory.objects.create(name="Perifericos", slug="perifericos")
+        for i in range(5):
+            Product.objects.create(name=f"Product {i}", stock=10, price=100 + i, available=True, category=category)
+
+    def test_home_query_budget(self):
+        self.client.get(reverse('Home'))    # cache de store, categorias, marcas y productos
+        # store + imagenes
+        self.assertViewBudget('get', reverse('Home'), max_queries=2, max_cache_misses=0)
+
+    def test_metrics_middleware_adds_server_timing(self):
+        middleware = ['ecommerce.metrics.RequestMetricsMiddleware'] + settings.MIDDLEWARE
+        with override_settings(MIDDLEWARE=middleware), self.assertLogs('ecommerce.metrics', 'INFO') as logs:
+            response = self.client.get(reverse('Home'))
+
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertRegex(response['Server-Timing'], r'cache;desc="\d+ hits [1-9]\d* misses"')    # cache vacia
+        self.assertIn('GET Home', logs.output[0])
+
+
+class TieredCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def make_worker(self, name, **options):
+        """ TwoLevelCache with its own L1, like a different gunicorn worker. """
+        from django.core.cache.backends.locmem import LocMemCache
+        from ecommerce.cache import TwoLevelCache
+
+        worker = TwoLevelCache('default', {'OPTIONS': {'L1_TIMEOUT': 60, 'VERSION_TIMEOUT': 60, **options}})
+        worker.l1 = LocMemCache(f'test-l1-{name}', {})
+        worker.l1.clear()
+        return worker
+
+    def test_l1_serves_without_going_to_shared_cache(self):
+        worker = self.make_worker('a')
+        worker.set('key', 'value')
+        cache.delete('key')    # otro proceso borra del L2
+
+        self.assertEqual(worker.get('key'), 'value')
+        worker.clear_local()
+        self.assertIsNone(worker.get('key'))
+
+    def test_bump_invalidates_other_workers(self):
+        worker_a = self.make_worker('a')
+        worker_b = self.make_worker('b', VERSION_TIMEOUT=0)
+
+        worker_a.set_versioned('catalog', 'menu', ['v1'])
+        self.assertEqual(worker_b.get_versioned('catalog', 'menu'), ['v1'])
+
+        worker_a.bump('catalog')
+        self.assertIsNone(worker_a.get_versioned('catalog', 'menu'))
+        self.assertIsNone(worker_b.get_versioned('catalog', 'menu'))
+
+    def test_store_changes_reach_the_context(self):
+        store = Store.objects.create(id=1, name="Tienda")
+        self.client.get(reverse('Home'))
+
+        store.name = "Tienda Nueva"
+        store.save()
+        response = self.client.get(reverse('Home'))
+        self.assertEqual(response.context['store']['name'], "Tienda Nueva")
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = Store.objects.create(id=1, name="Tienda", address="Calle 1")
+
+    def footer_key(self):
+        store_version = tiered_cache.get_namespace_version(STORE_CACHE_NAMESPACE)
+        return make_template_fragment_key('footer', [store_version, settings.RELEASE_VERSION])
+
+    def test_fragments_are_cached_until_store_or_catalog_changes(self):
+        self.assertContains(self.client.get(reverse('product_list')), "Calle 1")
+        self.assertIn("Calle 1", tiered_cache.get(self.footer_key()))
+
+        self.store.address = "Calle 2"
+        self.store.save()
+        self.assertIsNone(tiered_cache.get(self.footer_key()))
+        self.assertContains(self.client.get(reverse('product_list')), "Calle 2")
+
+        PCategory.objects.create(name="Monitores", slug="monitores")
+        self.assertContains(self.client.get(reverse('product_list')), 'href="/productos/monitores/"')
+
+    def test_navbars_fragment_has_no_cart_count(self):
+        product = Product.objects.create(name="Mouse", slug="mouse", stock=10, price=100, available=True)
+        session = self.client.session
+        session['carrito'] = {str(product.id): 3}
+        session.save()
+
+        # el badge se comparte entre sesiones, el total lo pone el js con cart_data
+        response = self.client.get(reverse('product_list'))
+        self.assertContains(response, '<span class="cart-badge" id="badge-cart-button"></span>')
+        self.assertEqual(json.loads(response.context['cart_data'])['cart_quantity'], 3)
+
+    def test_fragments_are_not_stored_when_disabled(self):
+        with self.settings(FRAGMENT_CACHE_TIMEOUT=0):
+            self.client.get(reverse('product_list'))
+        self.assertIsNone(tiered_cache.get(self.footer_key()))
+
+
+class BuildStaticTest(TestCase):
+    def test_bundles_get_brotli_and_gzip_variants(self):
+        with tempfile.TemporaryDirectory() as root:
+            bundle = os.path.join(root, 'output.0123456789ab.css')
+            with open(bundle, 'w') as f:
+                f.write("body { color: #333; }\n" * 200)
+
+            written = precompress_bundles(root)
+
+            self.assertCountEqual(written, [bundle + '.gz', bundle + '.br'])
+
+    def test_hashed_names_are_served_as_immutable(self):
+        immutable = re.compile(settings.WHITENOISE_IMMUTABLE_FILE_TEST)
+        self.assertTrue(immutable.search('/static/CACHE/css/output.0123456789ab.css'))
+        self.assertFalse(immutable.search('/static/css/base.css'))
+
+
+class WarmupTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        Store.objects.create(id=1, name="Tienda")
+        category = PCategory.objects.create(name="Perifericos", slug="perifericos")
+        brand = PBrand.objects.create(name="Logi", slug="logi")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i}", slug=f"product-{i}", stock=10, price=100 + i, available=True,
+                category=category, brand=brand,
+            )
+            for i in range(5)
+        ]
+
+    def test_warmup_writes_the_keys_of_the_first_requests(self):
+        report = warmup.run(products=2, workers=1)
+
+        self.assertEqual(report['errors'], [])
+        # listados: todos + 1 categoria + 1 marca
+        self.assertEqual(report['by_kind'], {'taxonomy': 1, 'store': 1, 'home': 2, 'listing': 3, 'product_detail': 2})
+        self.assertEqual(report['keys'], 9)
+
+        cat_url = reverse('pl_category', args=['perifericos'])
+        with self.assertNumQueries(1):    # la categoria del slug
+            self.client.get(cat_url)
+        popular = self.products[0]
+        self.assertViewBudget('get', reverse('product_detail', args=[popular.id, popular.slug]), max_queries=0)
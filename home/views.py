@@ -7,7 +7,8 @@ from django.db.models import Prefetch, F
 
 import json
 from products.models import Product
-from products.filters import VALUES_CARDS_LIST, get_serializer_brands, get_categories_n_subcategories
+from products import payloads
+from products.filters import get_categories_n_subcategories
 from products.serializers import ProductListSerializer
 
 from favorites.utils import get_favs_products
@@ -39,20 +40,12 @@ def home(request):
     if user.is_authenticated:
         favorites_ids = get_favs_products(user)
 
-    products = (
-        Product.objects.filter(category__is_default=False, available=True, stock__gt=0)
-        .values(*VALUES_CARDS_LIST)
-        .order_by('price', 'id')[:100]    # limita a 100 la query
-        .annotate(
-            category_id=F("category__id"),
-            subcategory_id=F("subcategory__id"),
-            brand_id=F("brand__id"),
-        )
-    )
+    # los 100 mas populares con stock, del cache compartido (products/payloads.py)
+    products = payloads.get_home_products()
     
     # maybe in the future get categories with image_url to home
     categories = get_categories_n_subcategories(from_cache=True)
-    brands = get_serializer_brands(values=('id', 'name', 'slug', 'image_url'))
+    brands = payloads.get_brands()
     
     serializer = ProductListSerializer(products, many=True, context={'favorites_ids': favorites_ids})
     products_data = serializer.data
@@ -0,0 +1,151 @@
+
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from django.db import close_old_connections
+from django.template.loader import get_template
+
+from ecommerce.cache import tiered_cache
+from home.context_processors import get_store
+from products import payloads
+from products.filters import (
+    CATALOG_CACHE_NAMESPACE, CATEGORIES_CACHE_KEY, CATEGORIES_CACHE_TIMEOUT, SORT_OPTIONS,
+    get_categories_n_subcategories,
+)
+from products.models import PBrand, PCategory, Product
+
+# templates compilados por el cached loader de cada worker en warm_worker()
+WORKER_TEMPLATES = ('home/home.html', 'products/products_list.html', 'products/product_detail.html')
+
+
+def _written(value) -> int:
+    """ Keys written by a payloads.get_*(refresh=True) call, cached_payload stores everything but None. """
+    return int(value is not None)
+
+
+def warm_taxonomy() -> int:
+    categories_dropmenu = get_categories_n_subcategories(from_cache=False)
+    tiered_cache.set_versioned(
+        CATALOG_CACHE_NAMESPACE, CATEGORIES_CACHE_KEY, categories_dropmenu, CATEGORIES_CACHE_TIMEOUT
+    )
+    return 1
+
+
+def warm_store() -> int:
+    get_store(refresh=True)
+    return 1
+
+
+def warm_listing(filter_args, page) -> int:
+    return _written(payloads.get_listing_page(filter_args, page, refresh=True))
+
+
+def warm_product(product_id, slug) -> int:
+    return _written(payloads.get_product_detail(product_id, slug, refresh=True))
+
+
+def warmup_tasks(listing_pages=1, products=50) -> list:
+    """
+    Everything the first visitors of a page would compute: taxonomy, store, home payloads,
+    the first pages of the full listing and of each category and brand, and the detail
+    of the most popular products.
+
+    Args:
+        listing_pages (int): pages of each listing, at most payloads.LISTING_CACHED_PAGES.
+        products (int): popular products whose detail is cached.
+
+    Returns:
+        list: (kind, callable that returns the keys written).
+    """
+    tasks = [
+        ('taxonomy', warm_taxonomy),
+        ('store', warm_store),
+        ('home', lambda: _written(payloads.get_home_products(refresh=True))),
+        ('home', lambda: _written(payloads.get_brands(refresh=True))),
+    ]
+
+    # mismos filter_args que product_list, mismas claves
+    listings = [{'stock': True}]
+    listings += [
+        {'category': category_id, 'stock': True}
+        for category_id in PCategory.objects.filter(is_default=False).values_list('id', flat=True)
+    ]
+    listings += [
+        {'brand': brand_id, 'stock': True}
+        for brand_id in PBrand.objects.filter(is_default=False).values_list('id', flat=True)
+    ]
+    for filter_args in listings:
+        for page in range(1, min(listing_pages, payloads.LISTING_CACHED_PAGES) + 1):
+            tasks.append(('listing', partial(warm_listing, filter_args, page)))
+
+    popular = (
+        Product.objects.filter(available=True, slug__isnull=False)
+        .order_by(*SORT_OPTIONS['popular'])
+        .values_list('id', 'slug')[:products]
+    )
+    for product_id, slug in popular:
+        tasks.append(('product_detail', partial(warm_product, product_id, slug)))
+    return tasks
+
+
+def _run_task(task):
+    # cada thread abre su propia conexion a la DB, se cierra al terminar como al final de un request
+    try:
+        return task()
+    finally:
+        close_old_connections()
+
+
+def run(listing_pages=1, products=50, workers=4, log=None) -> dict:
+    """
+    Fills the shared caches in parallel (workers threads, with 1 in this thread). Meant to run
+    after each deploy, before (or while) the new workers start.
+
+    Returns:
+        dict: {'seconds', 'keys', 'by_kind': {kind: keys written}, 'errors': [(kind, message)]}
+    """
+    start = time.perf_counter()
+    tasks = warmup_tasks(listing_pages=listing_pages, products=products)
+    by_kind = dict.fromkeys((kind for kind, _ in tasks), 0)
+    errors = []
+
+    def collect(kind, result):
+        try:
+            by_kind[kind] += result()
+        except Exception as e:
+            # un error no corta el warmup, esa pagina se calcula en el primer request como antes
+            errors.append((kind, repr(e)))
+            if log:
+                log(f"error en {kind}: {e!r}")
+
+    if workers <= 1:
+        for kind, task in tasks:
+            collect(kind, task)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='warmup') as executor:
+            futures = {executor.submit(_run_task, task): kind for kind, task in tasks}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    return {
+        'seconds': round(time.perf_counter() - start, 2),
+        'keys': sum(by_kind.values()),
+        'by_kind': by_kind,
+        'errors': errors,
+    }
+
+
+def warm_worker() -> None:
+    """
+    Per worker part, for the gunicorn post_worker_init hook (gunicorn.conf.py): reads the
+    shared data of every page into the L1 of the tiered cache and compiles the templates.
+    """
+    get_categories_n_subcategories(from_cache=True)
+    get_store()
+    payloads.get_brands()
+    payloads.get_home_products()
+    for name in WORKER_TEMPLATES:
+        get_template(name)
+    close_old_connections()
@@ -0,0 +1,75 @@
+
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cart.models import Cart, CartItem
+from ecommerce.testing import rolled_back
+from orders import utils
+from orders.models import PaymentMethod, ShipmentMethod, StatusOrder
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el throughput del checkout (utils.checkout_order) con datos sinteticos. "
+        "Todo corre dentro de una transaccion que se descarta al final. "
+        "Ej: python manage.py benchmark_checkout --orders 200 --items 5"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200, help="Cantidad de checkouts a ejecutar")
+        parser.add_argument('--items', type=int, default=5, help="Productos distintos por carrito")
+
+    def handle(self, *args, **options):
+        total_orders, items = options['orders'], options['items']
+
+        with rolled_back():
+            results = self.run(total_orders, items)
+
+        elapsed, queries = results
+        self.stdout.write(
+            f"{total_orders} checkouts de {items} items en {elapsed:.2f}s | "
+            f"{total_orders / elapsed:.1f} ordenes/s | "
+            f"{elapsed / total_orders * 1000:.2f} ms/orden | "
+            f"{queries / total_orders:.1f} queries/orden"
+        )
+
+    def run(self, total_orders, items):
+        StatusOrder.objects.get_or_create(id=2, defaults={'name': 'Pendiente'})
+        shipment, _ = ShipmentMethod.objects.get_or_create(id=2, defaults={'name': 'Envío', 'price': 500})
+        payment, _ = PaymentMethod.objects.get_or_create(id=3, defaults={'name': 'Mercado Pago', 'time': 2})
+
+        user = get_user_model().objects.create_user(email='benchmark-checkout@example.com', password=None)
+        cart = Cart.objects.create(user=user)
+        products = Product.objects.bulk_create([
+            Product(name=f'benchmark checkout {i}', price=100, stock=total_orders, available=True)
+            for i in range(items)
+        ])
+        order_data = {
+            'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench@example.com',
+            'cellphone': '0', 'dni': '0', 'address': 'x', 'province': 'x', 'city': 'x',
+            'shipping_method_id': str(shipment.id), 'payment_method_id': str(payment.id),
+        }
+        cart_items = [CartItem(cart=cart, product=product, quantity=1) for product in products]
+        utils.get_shipment_methods(), utils.get_payment_methods()    # cache caliente como en produccion
+
+        elapsed, queries = 0, 0
+        for _ in range(total_orders):
+            # el checkout vacia el carrito, se repone fuera de la medicion
+            CartItem.objects.bulk_create([CartItem(cart=cart, product=i.product, quantity=1) for i in cart_items])
+
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                order, response = utils.checkout_order(order_data, user, cart)
+                elapsed += time.perf_counter() - start
+            queries += len(ctx.captured_queries)
+
+            if order is None:
+                raise RuntimeError(response.data)
+
+        return elapsed, queries
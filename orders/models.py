@@ -1,7 +1,7 @@
 
 
 # Create your models here.
-from django.db import models
+from django.db import connections, models, router, transaction
 
 
 class StatusOrder(models.Model):
@@ -113,12 +113,68 @@ class Order(models.Model):
     email = models.EmailField(blank=True, null=True)
     cellphone = models.CharField(max_length=15, blank=True, null=True)
     detail_order = models.TextField(blank=True, null=True)
+    
+    # key sent by the checkout to avoid duplicated orders on double clicks or retries
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True)
 
     class Meta:
         ordering = ['-created_at']  # ordenar por fecha si agregas `de created`
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='order_user_idempotency_key_unique'
+            ),
+        ]
+        indexes = [
+            # keyset pagination de los tabs de perfil (usuario y admin filtrando por estado)
+            models.Index(fields=['user', '-updated_at', '-id'], name='order_user_updated_idx'),
+            models.Index(fields=['status', '-updated_at', '-id'], name='order_status_updated_idx'),
+            models.Index(fields=['-updated_at', '-id'], name='order_updated_idx'),
+            # rollups diarios de ventas (dashboard.analytics) leen las ordenes de un solo dia
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
     
 
 
+class InvoiceSequence(models.Model):
+    """
+    Counter row per fiscal type (A, B, C). The row is locked by the UPDATE until the
+    transaction that creates the invoice commits, so concurrent confirmations are
+    serialized per series and a rollback does not leave gaps.
+    """
+    fiscal_type = models.CharField(max_length=1, primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.fiscal_type}: {self.last_number}"
+
+    @classmethod
+    def next_number(cls, fiscal_type, using=None) -> int:
+        """
+        Increments and returns the counter of the series with a single
+        UPDATE ... RETURNING. Must be called inside a transaction of the same database.
+
+        Args:
+            fiscal_type (str): Series ('A', 'B', 'C').
+            using (str, optional): Database alias of the invoice. Defaults to the router write alias.
+        """
+        using = using or router.db_for_write(cls)
+        sql = (
+            f"UPDATE {cls._meta.db_table} SET last_number = last_number + 1 "
+            f"WHERE fiscal_type = %s RETURNING last_number"
+        )
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, [fiscal_type])
+            row = cursor.fetchone()
+            if row is None:
+                # primera factura de la serie
+                cls.objects.using(using).bulk_create([cls(fiscal_type=fiscal_type)], ignore_conflicts=True)
+                cursor.execute(sql, [fiscal_type])
+                row = cursor.fetchone()
+        return row[0]
+
+
 class Invoice(models.Model):
     order = models.OneToOneField(Order, on_delete=models.PROTECT, related_name='invoice')
     user = models.ForeignKey('users.CustomUser', on_delete=models.PROTECT, related_name='invoices')
@@ -144,3 +200,15 @@ class Invoice(models.Model):
     # maybe for analitycs
     total_mp = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    def save(self, *args, **kwargs):
+        # el numero se asigna en el mismo INSERT, correlativo por tipo fiscal (FAC-B-00000001)
+        if self._state.adding and not self.invoice_number:
+            # misma base que el INSERT: el contador queda en la transaccion de la factura
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            # sin savepoint propio: si el INSERT falla se revierte junto con el contador
+            with transaction.atomic(using=using, savepoint=False):
+                number = InvoiceSequence.next_number(self.fiscal_type, using=using)
+                self.invoice_number = f"FAC-{self.fiscal_type}-{number:08d}"
+                return super().save(*args, **kwargs)
+        return super().save(*args, **kwargs)
+
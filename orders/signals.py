@@ -0,0 +1,58 @@
+
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from ecommerce.cache import tiered_cache
+from orders.models import Order, PaymentMethod, ShipmentMethod
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_status_counts(sender, instance, **kwargs):
+    # Cualquier alta, cambio de estado o baja de una orden cambia los contadores del select
+    from orders.utils import STATUS_COUNTS_CACHE_KEY
+    cache.delete(STATUS_COUNTS_CACHE_KEY)
+
+
+@receiver(post_save, sender=ShipmentMethod)
+@receiver(post_delete, sender=ShipmentMethod)
+@receiver(post_save, sender=PaymentMethod)
+@receiver(post_delete, sender=PaymentMethod)
+def invalidate_checkout_methods(sender, instance, **kwargs):
+    # el checkout lee precios de envio y tiempos de pago desde el tiered cache de cada worker
+    from orders.utils import CHECKOUT_METHODS_NAMESPACE
+    tiered_cache.bump(CHECKOUT_METHODS_NAMESPACE)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_detail_status(sender, instance, **kwargs):
+    # estado con el que se cargo la orden, para detectar cambios en post_save
+    instance._detail_status_id = instance.__dict__.get('status_id')
+
+
+@receiver(post_save, sender=Order)
+def refresh_order_detail(sender, instance, created, **kwargs):
+    """
+    Rebuilds the order detail snapshot when the order is created or its status changes,
+    any other save only drops it (rebuilt on the next read). Both after commit: on creation
+    the items are inserted after the Order, and a reader must not cache uncommitted data.
+    """
+    from orders.utils import ORDER_DETAIL_CACHE_KEY, build_order_detail_snapshot
+
+    status_changed = created or instance._detail_status_id != instance.status_id
+    instance._detail_status_id = instance.status_id
+
+    if status_changed:
+        transaction.on_commit(partial(build_order_detail_snapshot, instance.id))
+    else:
+        transaction.on_commit(partial(cache.delete, ORDER_DETAIL_CACHE_KEY.format(instance.id)))
+
+
+@receiver(post_delete, sender=Order)
+def delete_order_detail(sender, instance, **kwargs):
+    from orders.utils import ORDER_DETAIL_CACHE_KEY
+    cache.delete(ORDER_DETAIL_CACHE_KEY.format(instance.id))
@@ -145,6 +145,14 @@ async function validFormOrder(form) {
     const jsonData = Object.fromEntries(formData.entries());
     const url = window.TEMPLATE_URLS.validOrder
 
+    // Same key for every retry of this form, the server returns the original order
+    // instead of creating a duplicate (double click, timeout + retry)
+    if (!form.dataset.idempotencyKey) {
+        form.dataset.idempotencyKey = (window.crypto && crypto.randomUUID)
+            ? crypto.randomUUID()
+            : `${Date.now()}-${Math.random().toString(36).slice(2, 12)}`;
+    }
+
     try {
         // Send the POST request to the server with JSON data
         const response = await fetch(url, { 
@@ -153,6 +161,7 @@ async function validFormOrder(form) {
             headers: {
                 'X-CSRFToken': getCookie('csrftoken'),
                 'Content-Type': 'application/json',
+                'Idempotency-Key': form.dataset.idempotencyKey,
             }
         });
 
@@ -0,0 +1,246 @@
+from django.test import TestCase
+
+# orders/tests.py quedo desactualizado respecto de los modelos, los tests del checkout viven aca
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from cart.models import Cart, CartItem
+from ecommerce.testing import QueryBudgetMixin
+from orders.models import Invoice, ItemOrder, Order, PaymentMethod, ShipmentMethod, ShipmentOrder, StatusOrder
+from products.models import Product
+
+
+class CheckoutTestMixin:
+    def setUp(self):
+        cache.clear()
+        StatusOrder.objects.create(id=2, name="Pendiente")
+        ShipmentMethod.objects.create(id=2, name="Envío a domicilio", price=500)
+        PaymentMethod.objects.create(id=3, name="Mercado Pago", time=2)
+
+        self.user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        self.product = Product.objects.create(name="Mouse", stock=10, price=100, available=True)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['cart_id'] = self.cart.id
+        session.save()
+
+        self.url = reverse('valid_order_form')
+        self.data = {
+            "first_name": "Lucas", "last_name": "Martinez", "email": "lucas@gmail.com",
+            "cellphone": "3515437688", "dni": "41224335",
+            "province": "Córdoba", "city": "Córdoba Capital", "address": "Av. Colón 1234",
+            "shipping_method_id": "2", "payment_method_id": "3",
+        }
+
+    def post_order(self, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(self.url, self.data, content_type='application/json', **headers)
+
+
+class IdempotentOrderTest(CheckoutTestMixin, TestCase):
+    key = 'checkout-0001-abcdef'
+
+    def test_repeated_key_returns_original_order(self):
+        response = self.post_order(self.key)
+        self.assertEqual(response.status_code, 201)
+        order_id = response.json()['order_id']
+
+        # el carrito ya esta vacio, sin la key este reintento fallaria con 400
+        with self.assertNumQueries(2):    # user + cart del middleware (sesion desde cache), sin locks
+            retry = self.post_order(self.key)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json()['order_id'], order_id)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(ShipmentOrder.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.stock_reserved), (8, 2))
+
+    def test_key_is_found_in_db_after_cache_expires(self):
+        order_id = self.post_order(self.key).json()['order_id']
+        cache.clear()
+        self.assertEqual(self.post_order(self.key).json()['order_id'], order_id)
+
+    def test_in_flight_key_returns_conflict(self):
+        from orders import utils
+        self.assertTrue(utils.acquire_idempotency_lock(self.user, self.key))
+
+        response = self.post_order(self.key)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+
+class CheckoutPipelineTest(QueryBudgetMixin, CheckoutTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = [self.product] + [
+            Product.objects.create(name=f"Teclado {i}", stock=5, price=200, discount=10, available=True)
+            for i in range(4)
+        ]
+        for product in self.products[1:]:
+            CartItem.objects.create(cart=self.cart, product=product, quantity=1)
+
+    def test_fixed_number_of_queries(self):
+        from orders import utils
+        utils.get_shipment_methods(), utils.get_payment_methods()    # cache caliente
+
+        # SAVEPOINT + items + FOR UPDATE + bulk UPDATE + 3 INSERT + DELETE + RELEASE
+        with self.assertNumQueries(9):
+            order, response = utils.checkout_order(self.data, self.user, self.cart)
+
+        self.assertIsNone(response)
+        # 2 * 100 + 4 * 180 + envio 500 - cupon 2
+        self.assertEqual(order.total, 1418)
+        self.assertEqual(order.items.count(), 5)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+
+    def test_order_api_query_budget(self):
+        self.client.get(reverse('resume-order'))    # cache de metodos de envio y pago
+        # middleware + idempotency key + checkout (9)
+        with self.assertBudget(max_queries=14):
+            response = self.post_order()
+        self.assertEqual(response.status_code, 201)
+
+    def test_insufficient_stock_releases_everything(self):
+        from orders import utils
+        CartItem.objects.filter(product=self.products[-1]).update(quantity=50)
+
+        order, response = utils.checkout_order(self.data, self.user, self.cart)
+
+        self.assertIsNone(order)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            list(Product.objects.order_by('id').values_list('stock_reserved', flat=True)), [0] * 5
+        )
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 5)
+
+    def test_method_cache_is_invalidated(self):
+        from orders import utils
+        self.assertEqual(utils.get_shipment_methods()[2]['price'], 500)
+        ShipmentMethod.objects.filter(id=2).update(price=700)
+        self.assertEqual(utils.get_shipment_methods()[2]['price'], 500)
+
+        ShipmentMethod.objects.get(id=2).save()
+        self.assertEqual(utils.get_shipment_methods()[2]['price'], 700)
+
+
+class OrderDetailSnapshotTest(CheckoutTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        StatusOrder.objects.create(id=4, name="Pago Confirmado")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order_id = self.post_order().json()['order_id']
+
+    def test_snapshot_is_built_on_creation(self):
+        from orders.utils import get_order_detail_context
+
+        with self.assertNumQueries(0):
+            context = get_order_detail_context(self.order_id, self.user)
+        self.assertEqual(context['order']['total'], 698)
+        self.assertEqual(context['items'][0]['product']['name'], "Mouse")
+
+        # el permiso se valida contra el owner_id del snapshot, sin consultas
+        other = get_user_model().objects.create_user(email="other@gmail.com", password="1234")
+        admin = get_user_model().objects.create_user(email="admin@gmail.com", password="1234", role='admin')
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_order_detail_context(self.order_id, other))
+            self.assertIsNotNone(get_order_detail_context(self.order_id, admin))
+
+    def test_snapshot_is_refreshed_on_status_change(self):
+        from orders.utils import get_order_detail_context
+
+        order = Order.objects.get(id=self.order_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status_id = 4
+            order.save()
+
+        with self.assertNumQueries(0):
+            context = get_order_detail_context(self.order_id, self.user)
+        self.assertEqual(context['status'], {'id': 4, 'name': "Pago Confirmado"})
+
+    def test_other_saves_drop_the_snapshot_without_rebuilding(self):
+        from django.core.cache import cache
+        from orders.utils import ORDER_DETAIL_CACHE_KEY, get_order_detail_context
+
+        order = Order.objects.get(id=self.order_id)
+        # sin cambio de estado no se arma el join en el request, solo se borra la clave
+        with self.assertNumQueries(1):
+            with self.captureOnCommitCallbacks(execute=True):
+                order.total = 700
+                order.save(update_fields=['total'])
+        self.assertIsNone(cache.get(ORDER_DETAIL_CACHE_KEY.format(self.order_id)))
+
+        self.assertEqual(get_order_detail_context(self.order_id, self.user)['order']['total'], 700)
+
+
+class FillOrderTotalsTest(TestCase):
+    def setUp(self):
+        StatusOrder.objects.create(id=2, name="Pendiente")
+        user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        method = ShipmentMethod.objects.create(id=2, name="Envío a domicilio", price=500)
+        product = Product.objects.create(name="Mouse", stock=10, price=100, available=True)
+        self.orders = []
+        for quantity in (1, 2, 3):
+            order = Order.objects.create(
+                user=user, status_id=2, total=0, shipment=ShipmentOrder.objects.create(method=method)
+            )
+            ItemOrder.objects.create(order=order, product=product, quantity=quantity, final_price=100)
+            self.orders.append(order)
+
+    def test_totals_are_filled_with_one_update(self):
+        from products.management.commands.updates import update_some_orders
+
+        # lectura de las ordenes afectadas + UPDATE con subqueries (+ savepoint), sin importar cuantas sean
+        with self.assertNumQueries(4):
+            self.assertEqual(update_some_orders(), 3)
+
+        totals = [Order.objects.get(id=order.id).total for order in self.orders]
+        self.assertEqual(totals, [598, 698, 798])
+        self.assertEqual(update_some_orders(), 0)
+
+
+class InvoiceNumberingTest(TestCase):
+    def setUp(self):
+        StatusOrder.objects.create(id=2, name="Pendiente")
+        self.user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+
+    def create_invoice(self, fiscal_type='B'):
+        order = Order.objects.create(user=self.user, status_id=2, total=100)
+        return Invoice.objects.create(order=order, user=self.user, fiscal_total=100, fiscal_type=fiscal_type)
+
+    def test_numbers_are_correlative_per_fiscal_type(self):
+        numbers = [self.create_invoice(t).invoice_number for t in ('B', 'B', 'A', 'B')]
+        self.assertEqual(numbers, ['FAC-B-00000001', 'FAC-B-00000002', 'FAC-A-00000001', 'FAC-B-00000003'])
+
+    def test_number_is_assigned_in_the_insert(self):
+        self.create_invoice()
+        order = Order.objects.create(user=self.user, status_id=2, total=100)
+        # UPDATE ... RETURNING del contador + INSERT, sin un segundo UPDATE de la factura
+        with self.assertNumQueries(2):
+            Invoice.objects.create(order=order, user=self.user, fiscal_total=100)
+
+    def test_rollback_does_not_leave_gaps(self):
+        from django.db import IntegrityError, transaction
+
+        invoice = self.create_invoice()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            # la orden ya tiene factura (OneToOne)
+            Invoice.objects.create(order=invoice.order, user=self.user, fiscal_total=100)
+        self.assertEqual(self.create_invoice().invoice_number, 'FAC-B-00000002')
+
+    def test_counter_uses_the_database_of_the_invoice(self):
+        from unittest import mock
+        from orders.models import InvoiceSequence
+
+        order = Order.objects.create(user=self.user, status_id=2, total=100)
+        invoice = Invoice(order=order, user=self.user, fiscal_total=100)
+        with mock.patch.object(InvoiceSequence, 'next_number', return_value=7) as next_number:
+            invoice.save(using='default')
+        next_number.assert_called_once_with('B', using='default')
+        self.assertEqual(invoice.invoice_number, 'FAC-B-00000007')
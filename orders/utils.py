@@ -16,20 +16,30 @@ from rest_framework.response import Response
 
 from products.utils import valid_id_or_None
 
-def get_order_detail_context(order_id, user):
-    # Optimización de consultas con select_related
-    order_id = valid_id_or_None(order_id)
-    if not order_id:
-        return None
-    
-    order = Order.objects.filter(id=order_id)
-    if user.role != 'admin':
-        order = order.filter(user=user)
-        
+from django.core.cache import cache
+from ecommerce.cache import tiered_cache
+
+ORDER_DETAIL_CACHE_KEY = 'order_detail_{}'
+ORDER_DETAIL_CACHE_TIMEOUT = 60 * 60
+
+
+def build_order_detail_snapshot(order_id):
+    """
+    Builds the read model of an order page (order, shipment, payment, status and items)
+    and stores it in cache. It is rebuilt after commit when the order is created or changes
+    status, other saves drop it (see orders.signals), so the page views do not repeat the joins.
+
+    Args:
+        order_id (int): ID of the order.
+
+    Returns:
+        dict | None: Snapshot with an extra 'owner_id' key used for the permission check.
+    """
     order = (
-        order
+        Order.objects.filter(id=order_id)
         .values(
             'id', 'created_at', 'expire_at', 'email', 'name', 'shipment_cost', 'total', 'discount_coupon',
+            'user_id',
             'shipment__id', 'shipment__address', 
             'status__id', 'status__name',
             'payment__id', 'payment__name', 'payment__time', 
@@ -39,9 +49,11 @@ def get_order_detail_context(order_id, user):
     )
     
     if not order:
+        cache.delete(ORDER_DETAIL_CACHE_KEY.format(order_id))
         return None
     
     # Extraemos y eliminamos datos de forma limpia
+    owner_id = order.pop('user_id')
     shipment = {
         'id': order.pop('shipment__id'),
         'address': order.pop('shipment__address'),
@@ -81,61 +93,337 @@ def get_order_detail_context(order_id, user):
         item['product'] = product
         processed_items.append(item)
     
-    context = {
+    snapshot = {
+        'owner_id': owner_id,
         'items': processed_items,
         'order': order,
         'shipment': shipment,
         'payment': payment,
         'status': status
     }
-    return context
+    cache.set(ORDER_DETAIL_CACHE_KEY.format(order_id), snapshot, ORDER_DETAIL_CACHE_TIMEOUT)
+    return snapshot
 
 
-def create_order_pending(order_data, user, products, quantities):
-    from decimal import Decimal
+def get_order_detail_context(order_id, user):
     """
-    # example on order data
-    order_data = {
-        "first_name": "Lucas",
-        "last_name": "Martinez",
-        "email": "lucas.martinez@example.com",
-        "cellphone": "3515437688",
-        "dni": "41224335",
-        "detail_order": "Por favor, entregar antes de las 18:00.",
-        
-        # NOTE if id_envio_method == '1': # this is only for retire local
-        "name_retire": "lucas",
-        "dni_retire": "martinez",
-        
-        # NOTE if id_envio_method != '1': # Home delivery
-        "province": "Córdoba",
-        "city": "Córdoba Capital",
-        "address": "Av. Colón 1234",
-        "postal_code": "5000",
-        "detail": "Departamento 2B",
-        
-        # NOTE this is for use to complete de order
-        "shipping_method_id": "2", 
-        "payment_method_id": "3"
-    }
+    Returns the context of the order pages from the cached snapshot (zero joins on a hit).
+    Only the owner of the order or an admin can see it.
+
+    Returns:
+        dict | None: {'items', 'order', 'shipment', 'payment', 'status'} or None if
+        the order does not exist or the user can not see it.
+    """
+    order_id = valid_id_or_None(order_id)
+    if not order_id:
+        return None
+    
+    snapshot = cache.get(ORDER_DETAIL_CACHE_KEY.format(order_id))
+    if snapshot is None:
+        snapshot = build_order_detail_snapshot(order_id)
+        if snapshot is None:
+            return None
+    
+    owner_id = snapshot.pop('owner_id')
+    if user.role != 'admin' and owner_id != user.id:
+        return None
+    return snapshot
+
+
+# ======================================================================
+#            Keyset pagination n cached counters for profile tabs
+# ======================================================================
+import base64
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
+
+ORDERS_PAGE_SIZE = 50
+STATUS_COUNTS_CACHE_KEY = 'orders_status_counts'
+
+
+def encode_cursor(updated_at, order_id) -> str:
+    """ Builds an opaque url-safe cursor from the last row of a page. """
+    raw = f'{updated_at.isoformat()}|{order_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (updated_at, order_id) or (None, None) if the cursor is missing or invalid.
+    """
+    if not cursor:
+        return None, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        updated_at, order_id = raw.rsplit('|', 1)
+        return parse_datetime(updated_at), valid_id_or_None(order_id)
+    except (ValueError, UnicodeDecodeError):
+        return None, None
+
+
+def get_orders_page(orders, cursor=None, limit=ORDERS_PAGE_SIZE, values=None) -> tuple:
+    """
+    Keyset (seek) pagination over orders sorted by ('-updated_at', '-id').
+
+    Unlike OFFSET pagination the cost of each page does not grow with the page number,
+    the WHERE on (updated_at, id) walks the indexes declared on Order.Meta.
+
+    Args:
+        orders (QuerySet[Order]): Already filtered queryset (by user, status, etc).
+        cursor (str, optional): Cursor returned as 'next_cursor' by the previous page.
+        limit (int, optional): Max orders per page. Defaults to ORDERS_PAGE_SIZE.
+        values (tuple, optional): Fields for .values(), defaults to the ones used by the tabs.
+
+    Returns:
+        tuple:
+            - list[dict]: The orders of the page.
+            - dict: {'next_cursor': str | None, 'has_next': bool, 'limit': int}
+    """
+    values = values or ('id', 'created_at', 'total', 'status__name')
+    updated_at, order_id = decode_cursor(cursor)
+    if updated_at and order_id:
+        orders = orders.filter(
+            Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=order_id)
+        )
+
+    # pedimos uno mas para saber si existe una pagina siguiente sin hacer un COUNT(*)
+    fields = values if 'updated_at' in values else ('updated_at', *values)
+    rows = list(orders.order_by('-updated_at', '-id').values(*fields)[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id']) if has_next else None
+    if 'updated_at' not in values:
+        for row in rows:
+            row.pop('updated_at')
+
+    return rows, {'next_cursor': next_cursor, 'has_next': has_next, 'limit': limit}
+
+
+def get_status_counts() -> dict:
+    """
+    Returns the number of orders per status for the admin filter select,
+    cached until an order is created, updated or deleted (see orders.signals).
+
+    Returns:
+        dict: {status_id: count}
+    """
+    counts = cache.get(STATUS_COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = dict(
+            Order.objects.order_by()
+            .values_list('status_id')
+            .annotate(total=Count('id'))
+        )
+        # TTL corto por si algun .update() masivo no dispara las señales
+        cache.set(STATUS_COUNTS_CACHE_KEY, counts, 300)
+    return counts
+
+
+# ======================================================================
+#            Idempotency keys for order creation
+# ======================================================================
+import re
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+IDEMPOTENCY_CACHE_TIMEOUT = 60 * 10    # los reintentos llegan en segundos, la DB es el respaldo
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+IDEMPOTENCY_KEY_RE = re.compile(r'^[A-Za-z0-9_\-]{8,64}$')
+
+
+def get_idempotency_key(request):
+    """
+    Reads the idempotency key sent by the checkout, as header 'Idempotency-Key'
+    or as 'idempotency_key' in the body.
+
+    Returns:
+        str | None: The key if it is present and valid (8-64 chars, [A-Za-z0-9_-]).
+    """
+    key = request.META.get(IDEMPOTENCY_HEADER) or request.data.get('idempotency_key')
+    if isinstance(key, str) and IDEMPOTENCY_KEY_RE.match(key):
+        return key
+    return None
+
+
+def _idempotency_cache_key(user_id, key) -> str:
+    return f'order_idem_{user_id}_{key}'
+
+
+def get_order_id_by_idempotency_key(user, key):
+    """
+    Returns the id of the order already created with this key, first from cache
+    and then from the unique (user, idempotency_key) index.
+
+    Returns:
+        int | None: order_id or None if the key was never used.
+    """
+    cache_key = _idempotency_cache_key(user.id, key)
+    order_id = cache.get(cache_key)
+    if order_id is None:
+        order_id = Order.objects.filter(user=user, idempotency_key=key).values_list('id', flat=True).first()
+        if order_id is not None:
+            cache.set(cache_key, order_id, IDEMPOTENCY_CACHE_TIMEOUT)
+    return order_id
+
+
+def remember_idempotency_key(user, key, order_id) -> None:
+    cache.set(_idempotency_cache_key(user.id, key), order_id, IDEMPOTENCY_CACHE_TIMEOUT)
+
+
+def acquire_idempotency_lock(user, key) -> bool:
+    """
+    Marks the key as in-flight, cache.add is atomic so only the first of two
+    simultaneous requests gets True. The lock expires by itself if the worker dies.
+    """
+    return cache.add(f'{_idempotency_cache_key(user.id, key)}_lock', True, IDEMPOTENCY_LOCK_TIMEOUT)
+
+
+def release_idempotency_lock(user, key) -> None:
+    cache.delete(f'{_idempotency_cache_key(user.id, key)}_lock')
+
+
+# ======================================================================
+#            Checkout pipeline (stock reservation + order creation)
+# ======================================================================
+from decimal import Decimal
+
+# read-mostly, en el tiered cache (L1 por worker), se invalidan con bump en orders.signals
+CHECKOUT_METHODS_NAMESPACE = 'checkout_methods'
+SHIPMENT_METHODS_CACHE_KEY = 'orders_shipment_methods'
+PAYMENT_METHODS_CACHE_KEY = 'orders_payment_methods'
+METHODS_CACHE_TIMEOUT = 60 * 60
+
+# maybe more logic like coupon model in the future
+DISCOUNT_COUPON = Decimal("2.00")
+
+
+def get_shipment_methods() -> dict:
+    """
+    Returns:
+        dict: {id: {'id': int, 'price': Decimal}} cached until a ShipmentMethod changes (see orders.signals).
+    """
+    methods = tiered_cache.get_versioned(CHECKOUT_METHODS_NAMESPACE, SHIPMENT_METHODS_CACHE_KEY)
+    if methods is None:
+        methods = ShipmentMethod.objects.in_bulk()
+        methods = {m.id: {'id': m.id, 'price': m.price} for m in methods.values()}
+        tiered_cache.set_versioned(CHECKOUT_METHODS_NAMESPACE, SHIPMENT_METHODS_CACHE_KEY, methods, METHODS_CACHE_TIMEOUT)
+    return methods
+
+
+def get_payment_methods() -> dict:
+    """
+    Returns:
+        dict: {id: {'id': int, 'time': int}} cached until a PaymentMethod changes (see orders.signals).
     """
-    # .values() no se aplica sobre get, para simular resultado, usamos filter + first para trear un unico diccionario
-    shipping_method = ShipmentMethod.objects.filter(id=order_data['shipping_method_id']).values('id', 'price').first()
+    methods = tiered_cache.get_versioned(CHECKOUT_METHODS_NAMESPACE, PAYMENT_METHODS_CACHE_KEY)
+    if methods is None:
+        methods = PaymentMethod.objects.in_bulk()
+        methods = {m.id: {'id': m.id, 'time': m.time} for m in methods.values()}
+        tiered_cache.set_versioned(CHECKOUT_METHODS_NAMESPACE, PAYMENT_METHODS_CACHE_KEY, methods, METHODS_CACHE_TIMEOUT)
+    return methods
+
+
+from products.cards import invalidate_product_cards
+from products.conditional import bump_products
+from products.models import Product
+def checkout_order(order_data, user, cart, idempotency_key=None):
+    """
+    Reserves the stock of the cart and creates the pending order in a single transaction.
+
+    The totals are calculated in memory before inserting, so the number of statements
+    is fixed no matter how many products the cart has:
+        SELECT cart items, SELECT ... FOR UPDATE products, UPDATE products (bulk),
+        INSERT shipment, INSERT order, INSERT items (bulk), DELETE cart items.
+    Shipment and payment methods come from cache. Any error (invalid data, insufficient
+    stock, duplicated idempotency key) rolls back everything, including the reservation.
+
+    Args:
+        order_data (dict): Validated data from OrderFormSerializer.
+            order_data = {
+                "first_name": "Lucas",
+                "last_name": "Martinez",
+                "email": "lucas.martinez@example.com",
+                "cellphone": "3515437688",
+                "dni": "41224335",
+                "detail_order": "Por favor, entregar antes de las 18:00.",
+                
+                # NOTE if id_envio_method == '1': # this is only for retire local
+                "name_retire": "lucas",
+                "dni_retire": "martinez",
+                
+                # NOTE if id_envio_method != '1': # Home delivery
+                "province": "Córdoba",
+                "city": "Córdoba Capital",
+                "address": "Av. Colón 1234",
+                "postal_code": "5000",
+                "detail": "Departamento 2B",
+                
+                # NOTE this is for use to complete de order
+                "shipping_method_id": "2", 
+                "payment_method_id": "3"
+            }
+        user (CustomUser): Buyer.
+        cart (Cart): Cart of the buyer (request.cart).
+        idempotency_key (str, optional): Stored on the order, unique per user.
+
+    Returns:
+        tuple:
+            - Order | None: The created order.
+            - Response | None: DRF Response with error detail.
+
+    Raises:
+        IntegrityError: If the idempotency_key was already used by the user (rolled back).
+    """
+    shipping_method = get_shipment_methods().get(valid_id_or_None(order_data['shipping_method_id']))
     if not shipping_method:
         return None, Response({'detail': 'Método de envío no válido'}, status=HTTP_400_BAD_REQUEST)
     
-    # .values() no se aplica sobre get, para simular resultado, usamos filter + first para trear un unico diccionario
-    payment_method = PaymentMethod.objects.filter(id=order_data['payment_method_id']).values('id', 'time').first()
+    payment_method = get_payment_methods().get(valid_id_or_None(order_data['payment_method_id']))
     if not payment_method:
         return None, Response({'detail': 'Método de pago no válido'}, status=HTTP_400_BAD_REQUEST)
 
-    # try:    realmente me puedo tomar la libertad de poner status_id = 2, evita consulta
-    #    status_order = StatusOrder.objects.only('id').get(id=2)  # Orden en estado "Pendiente"
-    # except ShipmentMethod.DoesNotExist:
-    #    return None, Response({'detail': 'Estado de orden no válido'}, status=HTTP_400_BAD_REQUEST)
-    
     with transaction.atomic():
-        
+        cart_items = list(CartItem.objects.filter(cart=cart).values_list('id', 'product_id', 'quantity'))
+        if not cart_items:
+            return None, Response({'detail': 'No hay productos agregados'}, status=HTTP_400_BAD_REQUEST)
+
+        # Fetch products in bulk with row-level locking to prevent concurrent stock modifications
+        products = (
+            Product.objects
+            .filter(id__in=[product_id for _, product_id, _ in cart_items])
+            .select_for_update()
+            .only('id', 'name', 'stock', 'stock_reserved', 'available', 'price', 'discount')
+            .in_bulk()  # Returns a dict {id: Product instance}
+        )
+
+        # Reserve stock and build the items in memory
+        order_items = []
+        subtotal = Decimal("0")
+        for _, product_id, quantity in cart_items:
+            product = products.get(product_id)
+            if product is None:
+                transaction.set_rollback(True)
+                return None, Response({'detail': 'Productos no validos.'}, status=HTTP_400_BAD_REQUEST)
+            
+            if not product.make_stock_reserved(quantity):
+                transaction.set_rollback(True)
+                return None, Response({'detail': f'Stock Insuficiente {product.name}'}, status=HTTP_400_BAD_REQUEST)
+
+            price_decimal = product.calc_discount_decimal()
+            subtotal += price_decimal * quantity
+            order_items.append(ItemOrder(
+                product=product,
+                discount=product.discount,
+                original_price=product.price,
+                quantity=quantity,
+                final_price=price_decimal
+            ))
+
+        Product.objects.bulk_update(products.values(), ['stock', 'stock_reserved'])
+        # bulk_update no dispara post_save, el stock de las tarjetas del carrito queda viejo
+        transaction.on_commit(lambda: (invalidate_product_cards(products), bump_products()))
+
         # Create shipping order to associate with the order
         shipment = ShipmentOrder.objects.create(
             method_id=shipping_method['id'],
@@ -148,13 +436,11 @@ def create_order_pending(order_data, user, products, quantities):
             detail=order_data.get("detail", ""),
         )
         
-        # Create expired time for the order, to apply maybe with a signal?
-        expire_at = timezone.now() + timedelta(hours=payment_method['time'])
+        shipment_cost = shipping_method['price']
         name = f'{order_data.get("first_name", "")} {order_data.get("last_name", "")}'
-        # Create new Order
         new_order = Order.objects.create(
             user=user,
-            status_id=2,    # status_order
+            status_id=2,    # Pendiente
             payment_id=payment_method['id'],
             shipment=shipment,
             name=name,
@@ -162,115 +448,18 @@ def create_order_pending(order_data, user, products, quantities):
             cellphone=order_data.get("cellphone", ""),
             dni=order_data.get("dni", ""),
             detail_order=order_data.get("detail_order", ""),
-            expire_at=expire_at
+            expire_at=timezone.now() + timedelta(hours=payment_method['time']),
+            shipment_cost=shipment_cost,
+            discount_coupon=DISCOUNT_COUPON,
+            total=subtotal + shipment_cost - DISCOUNT_COUPON,
+            idempotency_key=idempotency_key
         )
         
-        # crear order items
-        order_items = []
-        
-        # update post
-        subtotal = 0
-        shipment_cost = shipping_method['price']
-        # maybe more logic like coupon model in the future
-        # discount = Decimal(order_data.get("discount", "0"))    
-        discount_coupon = Decimal("2.00")
-        
-        for product_id, product in products.items():
-            quantity = quantities.get(product_id)['quantity']
-            
-            if product is None:
-                transaction.set_rollback(True)
-                return None, Response({'detail': 'Productos no validos.'}, status=HTTP_400_BAD_REQUEST)
-            
-            # Calcular subtotal de productos
-            price_decimal = product.calc_discount_decimal()
-            subtotal += ( price_decimal * quantity )    # get decimal * int = decimal
-            
-            order_items.append(ItemOrder(
-                order=new_order,
-                product=product,
-                discount=product.discount,
-                original_price=product.price,
-                quantity=quantity,
-                final_price=price_decimal
-            ))
-                
+        for item in order_items:
+            item.order = new_order
         ItemOrder.objects.bulk_create(order_items)
         
         # Eliminar items del carrito solo si todo lo anterior salió bien
-        CartItem.objects.filter(id__in=[v['item_id'] for v in quantities.values()]).delete()
-        
-        # Calcular total
-        total = subtotal + shipment_cost - discount_coupon
-
-        # Actualizar la orden con estos campos
-        new_order.shipment_cost = shipment_cost
-        new_order.discount_coupon = discount_coupon
-        new_order.total = total
-        new_order.save(update_fields=["shipment_cost", "discount_coupon", "total"])
+        CartItem.objects.filter(id__in=[item_id for item_id, _, _ in cart_items]).delete()
         
     return new_order, None
-    
-    
-from products.models import Product
-def confirm_stock_availability(cart):
-    """
-    Optimized function to reserve stock for products in the user's cart.
-    Uses atomic transactions and row-level locking to prevent race conditions.
-
-    Args:
-        cart (Cart): The cart instance for the current user.
-
-    Returns:
-        dict: {'products': {product_id: Product}, 'quantities': {product_id: quantity}} 
-              if stock reservation succeeds.
-        None, Response: DRF Response with error detail if stock is insufficient or cart is empty.
-    """
-    # Retrieve cart items as dictionaries to avoid loading full model instances
-    cart_items = (
-        CartItem.objects
-        .filter(cart=cart)
-        .values('id', 'quantity', 'product__id')
-    )
-
-    with transaction.atomic():
-        # Check if cart is empty
-        if not cart_items.exists():
-            transaction.set_rollback(True)
-            return None, Response({'detail': 'No hay productos agregados'}, status=HTTP_400_BAD_REQUEST)
-
-        # Prepare product IDs and quantities dictionary
-        product_ids = []
-        quantities = {}
-        for item in cart_items:
-            quantities[item['product__id']] = {'quantity': item['quantity'], 'item_id': item['id']} 
-            product_ids.append(item['product__id'])
-
-        # Fetch products in bulk with row-level locking to prevent concurrent stock modifications
-        products = (
-            Product.objects
-            .filter(id__in=product_ids)
-            .select_for_update()
-            .only('id', 'name', 'stock', 'stock_reserved', 'available', 'price', 'discount')
-            .in_bulk()  # Returns a dict {id: Product instance}
-        )
-
-        # Prepare list for bulk update
-        modified_products = []
-
-        for product_id, product in products.items():
-            quantity = quantities.get(product_id)['quantity']  # default None if not found
-
-            # Reserve stock in memory
-            if quantity is None or not product.make_stock_reserved(quantity):
-                transaction.set_rollback(True)
-                return None, Response({'detail': f'Stock Insuficiente {product.name}'}, status=HTTP_400_BAD_REQUEST)
-
-            modified_products.append(product)
-
-        # Commit all stock changes in a single bulk update
-        Product.objects.bulk_update(modified_products, ['stock', 'stock_reserved'])
-
-    # Return products and quantities to continue with order creation
-    return {'products': products, 'quantities': quantities}, None
-
@@ -11,7 +11,7 @@ def order_detail(request, order_id):
     
     context = get_order_detail_context(order_id, user)
     if not context:
-        render(request, "payments/fail_payments.html", {"error": "Order Not Found."})
+        return render(request, "payments/fail_payments.html", {"error": "Order Not Found."})
     
     return render(request, "orders/order_detail.html", context)
 
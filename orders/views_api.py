@@ -68,6 +68,8 @@ class ShipmentAPI(APIView):
 
 from orders import utils  
 from cart.models import Cart, CartItem
+from functools import partial
+from django.db import IntegrityError, transaction
 class OrderAPI(APIView):
     permission_classes = [IsAuthenticated]  # Solo usuarios autenticados pueden acceder
     
@@ -78,20 +80,51 @@ class OrderAPI(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        # Confirmar pedido y hacer reserva de stock:
-        cart = request.cart
-        dict_p_q, response = utils.confirm_stock_availability(cart)
-        if not dict_p_q:
-            return response
+        user = request.user
+        key = utils.get_idempotency_key(request)
+        if not key:
+            return self.create_order(request, serializer.validated_data)
+        
+        # Reintento o doble click: devolver la orden original sin volver a reservar stock
+        order_id = utils.get_order_id_by_idempotency_key(user, key)
+        if order_id:
+            return self.replayed_response(order_id)
+        
+        if not utils.acquire_idempotency_lock(user, key):
+            return Response(
+                {'detail': 'El pedido ya se está procesando.'},
+                status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'}
+            )
+        
+        try:
+            return self.create_order(request, serializer.validated_data, key)
+        
+        except IntegrityError:
+            # otro worker (sin cache compartida) creo la orden con la misma key primero
+            order_id = utils.get_order_id_by_idempotency_key(user, key)
+            if not order_id:
+                raise
+            return self.replayed_response(order_id)
         
-        # recuperamos el json de Datos ya validados
+        finally:
+            utils.release_idempotency_lock(user, key)
+            
+    def create_order(self, request, order_data, key=None):
+        """ Reserves stock and creates the pending order in one transaction (see utils.checkout_order). """
         user = request.user
-        order_data = serializer.validated_data
-        order, response = utils.create_order_pending(
-            order_data, user, dict_p_q['products'], dict_p_q['quantities']
-        )
+        order, response = utils.checkout_order(order_data, user, request.cart, idempotency_key=key)
         if not order:
             return response
-            
-        return Response({'order_id': order.id}, status=status.HTTP_201_CREATED)
         
+        if key:
+            utils.remember_idempotency_key(user, key, order.id)
+        
+        # Mercado Pago: la preferencia se crea en background mientras el cliente llega a la página de pago
+        if order.payment_id == 3:
+            from payments.utils_for_mp import prefetch_preference
+            transaction.on_commit(partial(prefetch_preference, order.id))
+        return Response({'order_id': order.id}, status=status.HTTP_201_CREATED)
+    
+    @staticmethod
+    def replayed_response(order_id):
+        return Response({'order_id': order_id}, status=status.HTTP_200_OK, headers={'Idempotent-Replayed': 'true'})
@@ -0,0 +1,176 @@
+
+
+import asyncio
+import json
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+MP_DEFAULT_API_URL = 'https://api.mercadopago.com'
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class PaymentGatewayError(Exception):
+    """ Mercado Pago did not answer in time, answered an error or the response is invalid. """
+    def __init__(self, message, status=None, response=None):
+        super().__init__(message)
+        self.status = status
+        self.response = response
+
+
+_sdk = None
+_sdk_lock = threading.Lock()
+
+
+def get_sdk():
+    """ Lazy SDK singleton, built on first use instead of at import time. """
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                # el SDK y requests se importan recien aca, no en cada arranque de worker o comando
+                from mercadopago import SDK
+                from payments.mp_http import PooledHttpClient
+                _sdk = SDK(settings.MERCADO_PAGO_ACCESS_TOKEN, http_client=PooledHttpClient())
+    return _sdk
+
+
+def reset_client():
+    """ Drops the SDK and its pool, the next call rebuilds them with the current settings (tests). """
+    global _sdk
+    with _sdk_lock:
+        if _sdk is not None:
+            _sdk.http_client.session.close()
+        _sdk = None
+
+
+def _request_options(idempotency_key=None):
+    from mercadopago.config import RequestOptions
+    return RequestOptions(
+        access_token=settings.MERCADO_PAGO_ACCESS_TOKEN,
+        custom_headers={'x-idempotency-key': idempotency_key or uuid.uuid4().hex},
+    )
+
+
+def _unwrap(result, action):
+    status = result.get('status')
+    if status is None or status >= 400 or result.get('response') is None:
+        raise PaymentGatewayError(f"Error de Mercado Pago al {action} ({status})", status, result.get('response'))
+    return result['response']
+
+
+def create_preference(preference_data, idempotency_key=None) -> dict:
+    """
+    Creates a Checkout Pro preference.
+
+    Args:
+        preference_data (dict): Body of the preference.
+        idempotency_key (str, optional): Same key on retries returns the same preference.
+
+    Returns:
+        dict: Preference created by Mercado Pago (with 'id').
+
+    Raises:
+        PaymentGatewayError: Timeout, connection error or error status.
+    """
+    result = get_sdk().preference().create(preference_data, _request_options(idempotency_key))
+    return _unwrap(result, 'crear la preferencia')
+
+
+def get_payment(payment_id) -> dict:
+    """
+    Raises:
+        PaymentGatewayError: Timeout, connection error or error status.
+    """
+    result = get_sdk().payment().get(payment_id, _request_options())
+    return _unwrap(result, 'consultar el pago')
+
+
+# ======================================================================
+#            Async calls (ASGI views)
+# ======================================================================
+# El SDK es sincronico, las vistas async llaman a la API REST con la sesion aiohttp compartida
+# (ecommerce/http.py), mismos timeouts, reintentos e idempotency key que PooledHttpClient.
+async def _arequest(method, path, action, idempotency_key=None, **kwargs):
+    import aiohttp
+    from ecommerce.http import get_async_session
+
+    headers = {
+        'Authorization': f'Bearer {settings.MERCADO_PAGO_ACCESS_TOKEN}',
+        'x-idempotency-key': idempotency_key or uuid.uuid4().hex,
+    }
+    timeout = aiohttp.ClientTimeout(sock_connect=settings.MP_CONNECT_TIMEOUT, sock_read=settings.MP_READ_TIMEOUT)
+    url = settings.MERCADO_PAGO_API_URL.rstrip('/') + path
+
+    for attempt in range(settings.MP_MAX_RETRIES + 1):
+        try:
+            async with get_async_session().request(method, url, headers=headers, timeout=timeout, **kwargs) as response:
+                status = response.status
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # un timeout no se reintenta, el cliente ya espero MP_READ_TIMEOUT
+            if attempt == settings.MP_MAX_RETRIES or isinstance(e, asyncio.TimeoutError):
+                raise PaymentGatewayError(f"Mercado Pago no respondió: {e!r}") from e
+        else:
+            if status not in RETRY_STATUS or attempt == settings.MP_MAX_RETRIES:
+                break
+        await asyncio.sleep(0.3 * 2 ** attempt)    # mismo backoff que urllib3 Retry
+
+    try:
+        body = json.loads(content) if content else None
+    except ValueError:
+        body = None
+    return _unwrap({'status': status, 'response': body}, action)
+
+
+async def acreate_preference(preference_data, idempotency_key=None) -> dict:
+    """ Async version of create_preference. """
+    return await _arequest('POST', '/checkout/preferences', 'crear la preferencia', idempotency_key, json=preference_data)
+
+
+async def aget_payment(payment_id) -> dict:
+    """ Async version of get_payment. """
+    return await _arequest('GET', f'/v1/payments/{int(payment_id)}', 'consultar el pago')
+
+
+# ======================================================================
+#            Background calls
+# ======================================================================
+_executor = None
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Runs fn in the gateway thread pool so the request that triggered it does not wait
+    on Mercado Pago. With settings.MP_BACKGROUND = False it runs inline (tests, scripts).
+
+    Returns:
+        Future: With the result or the exception of fn.
+    """
+    global _executor
+    if not settings.MP_BACKGROUND:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    if _executor is None:
+        with _sdk_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.MP_BACKGROUND_WORKERS, thread_name_prefix='mercadopago'
+                )
+    return _executor.submit(_close_connections_after, fn, *args, **kwargs)
+
+
+def _close_connections_after(fn, *args, **kwargs):
+    # cada thread abre su propia conexion a la DB, se cierra al terminar como al final de un request
+    from django.db import close_old_connections
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from orders.models import Invoice, InvoiceSequence, Order, StatusOrder
+from payments import utils
+
+# serie que usa confirm_order_payment
+FISCAL_TYPE = 'B'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide las confirmaciones de pago por segundo con varios threads a la vez, cada uno con su propia conexion "
+        "y una transaccion por pago (utils.confirm_order_payment + numeracion de facturas con InvoiceSequence), "
+        "y verifica que los numeros de factura queden unicos y sin huecos. Escribe en la base de datos real "
+        "(PostgreSQL, SQLite serializa las escrituras), usar una base de staging: las ordenes y facturas "
+        "del benchmark se borran al terminar y el contador vuelve a su valor. "
+        "Ej: python manage.py benchmark_invoices --payments 500 --threads 8"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=500, help="Cantidad de pagos a confirmar")
+        parser.add_argument('--threads', type=int, default=4, help="Threads concurrentes, una conexion cada uno")
+
+    def handle(self, *args, **options):
+        total, threads = options['payments'], options['threads']
+
+        user, orders, last_before = self.setup(total)
+        try:
+            elapsed, queries, numbers = self.run(orders, threads)
+            self.check_numbers(numbers, last_before)
+        finally:
+            self.cleanup(user, last_before)
+
+        self.stdout.write(
+            f"{total} pagos confirmados con {threads} threads en {elapsed:.2f}s | "
+            f"{total / elapsed:.1f} confirmaciones/s | "
+            f"{elapsed / total * 1000:.2f} ms/pago | "
+            f"{queries / total:.1f} queries/pago | "
+            f"facturas {numbers[0]} a {numbers[-1]} sin huecos"
+        )
+
+    def setup(self, total):
+        StatusOrder.objects.get_or_create(id=2, defaults={'name': 'Pendiente'})
+        StatusOrder.objects.get_or_create(id=4, defaults={'name': 'Pago Confirmado'})
+        user = get_user_model().objects.create_user(email='benchmark-invoices@example.com', password=None)
+        orders = Order.objects.bulk_create([Order(user=user, status_id=2, total=100) for _ in range(total)])
+        sequence = InvoiceSequence.objects.filter(fiscal_type=FISCAL_TYPE).first()
+        return user, orders, sequence.last_number if sequence else 0
+
+    def run(self, orders, threads):
+        def confirm(chunk):
+            # cada thread usa su propia conexion de Django, se cierra al terminar
+            try:
+                numbers = []
+                with CaptureQueriesContext(connection) as ctx:
+                    for order in chunk:
+                        _, invoice, message = utils.confirm_order_payment({
+                            'id': order.id, 'status': 'approved', 'external_reference': str(order.id),
+                            'transaction_amount': 100,
+                        })
+                        if invoice is None:
+                            raise RuntimeError(message)
+                        numbers.append(invoice.invoice_number)
+                return numbers, len(ctx.captured_queries)
+            finally:
+                connection.close()
+
+        chunks = [orders[i::threads] for i in range(threads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='benchmark-invoices') as executor:
+            results = list(executor.map(confirm, chunks))
+        elapsed = time.perf_counter() - start
+
+        numbers = sorted(number for chunk_numbers, _ in results for number in chunk_numbers)
+        return elapsed, sum(queries for _, queries in results), numbers
+
+    def check_numbers(self, numbers, last_before):
+        if len(set(numbers)) != len(numbers):
+            raise CommandError(f"Numeros de factura repetidos: {len(numbers) - len(set(numbers))}")
+
+        expected = [f"FAC-{FISCAL_TYPE}-{n:08d}" for n in range(last_before + 1, last_before + len(numbers) + 1)]
+        missing = sorted(set(expected) - set(numbers))
+        if missing:
+            raise CommandError(f"Huecos en la numeracion ({len(missing)}), el primero es {missing[0]}")
+
+    def cleanup(self, user, last_before):
+        with transaction.atomic():
+            invoices = Invoice.objects.filter(user=user)
+            created = invoices.count()
+            invoices.delete()
+            Order.objects.filter(user=user).delete()
+            user.delete()
+            # el contador vuelve atras solo si nadie mas facturo durante el benchmark
+            InvoiceSequence.objects.filter(
+                fiscal_type=FISCAL_TYPE, last_number=last_before + created
+            ).update(last_number=last_before)
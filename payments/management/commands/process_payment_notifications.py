@@ -0,0 +1,32 @@
+
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa la cola de notificaciones de Mercado Pago (webhooks) y confirma las ordenes. "
+        "Con --loop queda corriendo como worker (ver Procfile)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=notifications.NOTIFICATION_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="No terminar cuando la cola queda vacía")
+        parser.add_argument('--sleep', type=float, default=2, help="Segundos de espera con la cola vacía")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = notifications.process_notifications(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} notificaciones procesadas"))
@@ -1,3 +1,38 @@
 from django.db import models
 
 # Create your models here.
+
+
+class PaymentNotification(models.Model):
+    """
+    Durable queue of Mercado Pago webhooks. The endpoint only inserts a row and acks,
+    payments.notifications.process_notifications confirms the orders in batches.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('processing', 'Procesando'),
+        ('done', 'Procesada'),
+        ('failed', 'Fallida'),
+    ]
+    topic = models.CharField(max_length=30, default='payment')
+    resource_id = models.CharField(max_length=64)    # payment id de mercado pago
+    payload = models.JSONField(blank=True, null=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True, default='')
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # cuando un worker la tomo, si sigue en 'processing' despues de PROCESSING_LEASE el worker murio
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # el worker toma los pendientes en orden de llegada
+            models.Index(fields=['status', 'id'], name='payment_notif_status_idx'),
+            models.Index(fields=['resource_id'], name='payment_notif_resource_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.resource_id} - {self.status}"
@@ -0,0 +1,77 @@
+import requests
+from django.conf import settings
+from mercadopago.http import HttpClient
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from payments.gateway import MP_DEFAULT_API_URL, RETRY_STATUS, PaymentGatewayError
+
+# Imported by gateway.get_sdk() on the first sync call to Mercado Pago: the SDK and requests
+# are not loaded by django.setup() nor by the URLconf.
+
+
+def _build_session():
+    """
+    Single requests.Session per process, the HTTPAdapter keeps a pool of keep-alive
+    connections so each call skips the TCP + TLS handshake with Mercado Pago.
+    POST retries are safe because every call sends an X-Idempotency-Key.
+    """
+    retry = Retry(
+        total=settings.MP_MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({'GET', 'POST', 'PUT'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.MP_POOL_SIZE, pool_maxsize=settings.MP_POOL_SIZE, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class PooledHttpClient(HttpClient):
+    """
+    Drop-in replacement of mercadopago.http.HttpClient, the SDK default opens a new
+    session (and connection) per request and waits up to 60 seconds.
+
+    - Reuses a pooled session.
+    - Applies (connect, read) timeouts from settings instead of the SDK timeout.
+    - Rewrites the api url with settings.MERCADO_PAGO_API_URL (fake server in tests/dev).
+    """
+    def __init__(self):
+        self.session = _build_session()
+
+    def request(self, method, url, maxretries=None, timeout=None, **kwargs):
+        base_url = settings.MERCADO_PAGO_API_URL.rstrip('/')
+        if url.startswith(MP_DEFAULT_API_URL):
+            url = base_url + url[len(MP_DEFAULT_API_URL):]
+
+        try:
+            api_result = self.session.request(
+                method, url, timeout=(settings.MP_CONNECT_TIMEOUT, settings.MP_READ_TIMEOUT), **kwargs
+            )
+        except requests.RequestException as e:
+            raise PaymentGatewayError(f"Mercado Pago no respondió: {e}") from e
+
+        response = {"status": api_result.status_code, "response": None}
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError:
+                pass
+        return response
+
+    def get(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("GET", url, headers=headers, params=params)
+
+    def post(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("POST", url, headers=headers, data=data, params=params)
+
+    def put(self, url, headers, data=None, params=None, timeout=None, maxretries=None):
+        return self.request("PUT", url, headers=headers, data=data, params=params)
+
+    def delete(self, url, headers, params=None, timeout=None, maxretries=None):
+        return self.request("DELETE", url, headers=headers, params=params)
@@ -0,0 +1,161 @@
+
+
+import hashlib
+import hmac
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+
+from payments import gateway, utils
+from payments.models import PaymentNotification
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(minutes=1)    # espera antes de reintentar una notificacion fallida
+# una notificacion 'processing' mas vieja que esto quedo de un worker que murio (deploy, crash)
+PROCESSING_LEASE = timedelta(minutes=5)
+
+
+def notification_body(request) -> dict:
+    """ JSON body of the notification, {} for the IPN that only sends query params. """
+    try:
+        return request.data if isinstance(request.data, dict) else {}
+    except (ParseError, UnsupportedMediaType):
+        return {}
+
+
+def parse_notification(request):
+    """
+    Extracts (topic, resource_id) from a Mercado Pago notification. Webhooks send
+    {"type": "payment", "data": {"id": "123"}} and the old IPN sends ?topic=payment&id=123.
+
+    Returns:
+        tuple: (topic, resource_id) or (None, None) if it is not a payment notification.
+    """
+    body = notification_body(request)
+    topic = body.get('type') or body.get('topic') or request.GET.get('type') or request.GET.get('topic')
+    resource_id = (
+        (body.get('data') or {}).get('id') or request.GET.get('data.id') or request.GET.get('id')
+    )
+    if topic != 'payment' or not resource_id or not str(resource_id).isalnum():
+        return None, None
+    return topic, str(resource_id)
+
+
+def valid_signature(request, resource_id) -> bool:
+    """
+    Validates the x-signature header (ts=...,v1=...) with MERCADO_PAGO_WEBHOOK_SECRET.
+    Without a secret configured (local/dev) every notification is accepted.
+    """
+    secret = getattr(settings, 'MERCADO_PAGO_WEBHOOK_SECRET', None)
+    if not secret:
+        return True
+
+    parts = dict(
+        part.strip().split('=', 1) for part in request.headers.get('x-signature', '').split(',') if '=' in part
+    )
+    if 'ts' not in parts or 'v1' not in parts:
+        return False
+
+    manifest = f"id:{resource_id.lower()};request-id:{request.headers.get('x-request-id', '')};ts:{parts['ts']};"
+    expected = hmac.new(secret.encode(), manifest.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, parts['v1'])
+
+
+def enqueue_notification(topic, resource_id, payload=None):
+    """ O(1): a single INSERT, the payment is fetched later by the worker. """
+    return PaymentNotification.objects.create(topic=topic, resource_id=resource_id, payload=payload)
+
+
+def claim_batch(batch_size=NOTIFICATION_BATCH_SIZE) -> list:
+    """
+    Marks up to batch_size pending notifications as 'processing' and returns them, also the
+    'processing' ones whose claim is older than PROCESSING_LEASE (the worker died mid batch).
+    SKIP LOCKED lets several workers run at the same time without taking the same rows.
+    """
+    now = timezone.now()
+    pending = Q(status='pending') & (Q(processed_at__isnull=True) | Q(processed_at__lte=now - RETRY_DELAY))
+    abandoned = Q(status='processing') & (Q(claimed_at__isnull=True) | Q(claimed_at__lte=now - PROCESSING_LEASE))
+    with transaction.atomic():
+        ids = list(
+            PaymentNotification.objects.filter(pending | abandoned)
+            .order_by('id')
+            .select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        PaymentNotification.objects.filter(id__in=ids).update(status='processing', claimed_at=now)
+    return list(PaymentNotification.objects.filter(id__in=ids).order_by('id'))
+
+
+def _fetch_payment(payment_id):
+    try:
+        return gateway.get_payment(payment_id), None
+    except gateway.PaymentGatewayError as e:
+        return None, str(e)
+
+
+def process_notifications(batch_size=NOTIFICATION_BATCH_SIZE) -> int:
+    """
+    Processes one batch of the queue:
+        1. Claims the pending notifications.
+        2. Dedupes them by payment id (MP sends the same notification several times).
+        3. Fetches the distinct payments concurrently using the pooled gateway client.
+        4. Confirms the orders and invoices (utils.confirm_order_payment, idempotent). An error
+           confirming one payment counts as a failed attempt of that payment only.
+        5. Marks every pending notification of the processed payments as done in one UPDATE.
+
+    Returns:
+        int: Number of notifications claimed (0 when the queue is empty).
+    """
+    notifications = claim_batch(batch_size)
+    if not notifications:
+        return 0
+
+    payment_ids = list(dict.fromkeys(n.resource_id for n in notifications))
+    with ThreadPoolExecutor(max_workers=settings.MP_BACKGROUND_WORKERS) as executor:
+        results = dict(zip(payment_ids, executor.map(_fetch_payment, payment_ids)))
+
+    done_ids, failed = [], {}
+    for payment_id, (payment_mp, error) in results.items():
+        if payment_mp is None:
+            failed[payment_id] = error
+            continue
+        try:
+            # savepoint: un pago que falla no deja la orden a medio confirmar
+            with transaction.atomic():
+                utils.confirm_order_payment(payment_mp)
+        except Exception as e:
+            logger.exception("Error confirmando el pago %s", payment_id)
+            failed[payment_id] = f"Error al confirmar: {e!r}"
+            continue
+        done_ids.append(payment_id)
+
+    now = timezone.now()
+    if done_ids:
+        # tambien las duplicadas que llegaron mientras se procesaba el lote
+        PaymentNotification.objects.filter(
+            resource_id__in=done_ids, status__in=('pending', 'processing')
+        ).update(status='done', processed_at=now, error='')
+
+    for notification in notifications:
+        if notification.resource_id not in failed:
+            continue
+        notification.attempts += 1
+        notification.error = (failed[notification.resource_id] or '')[:255]
+        notification.status = 'failed' if notification.attempts >= MAX_ATTEMPTS else 'pending'
+        notification.processed_at = now
+    PaymentNotification.objects.bulk_update(
+        [n for n in notifications if n.resource_id in failed], ['attempts', 'error', 'status', 'processed_at']
+    )
+
+    return len(notifications)
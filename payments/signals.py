@@ -25,3 +25,17 @@ def send_invoice_email(sender, instance, created, **kwargs):
         msg.attach_alternative(html_content, "text/html")
         msg.send()
 """
+
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from orders.models import Order
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_preference(sender, instance, **kwargs):
+    # cualquier cambio de la orden (estado, total, envio) invalida la preferencia de MP cacheada
+    from payments.utils_for_mp import invalidate_preference
+    invalidate_preference(instance.id)
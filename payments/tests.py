@@ -1,3 +1,338 @@
 from django.test import TestCase
 
 # Create your tests here.
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from payments import gateway
+
+
+class FakeMercadoPagoHandler(BaseHTTPRequestHandler):
+    """ Minimal local Mercado Pago API: preferences and payments. """
+    protocol_version = 'HTTP/1.1'    # keep-alive, para poder verificar el pool de conexiones
+    log = []
+    fail_next = 0
+    delay = 0
+    payments = {}    # payment id -> campos extra del pago (external_reference, transaction_amount, ...)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # el cliente corto por timeout
+
+    def _handle(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'null')
+        type(self).log.append({
+            'method': method, 'path': self.path, 'port': self.client_address[1],
+            'idempotency_key': self.headers.get('x-idempotency-key'), 'body': body,
+        })
+        if type(self).delay:
+            time.sleep(type(self).delay)
+        if type(self).fail_next:
+            type(self).fail_next -= 1
+            return self._reply(503, {'message': 'unavailable'})
+
+        if method == 'POST' and self.path.startswith('/checkout/preferences'):
+            return self._reply(201, {'id': f"pref-{body['external_reference']}"})
+        if method == 'GET' and self.path.startswith('/v1/payments/'):
+            payment_id = int(self.path.rsplit('/', 1)[-1])
+            return self._reply(200, {'id': payment_id, 'status': 'approved', **type(self).payments.get(payment_id, {})})
+        return self._reply(404, {'message': 'not found'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeMercadoPagoTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeMercadoPagoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.mp_settings = override_settings(
+            MERCADO_PAGO_API_URL=f'http://127.0.0.1:{cls.server.server_port}',
+            MP_CONNECT_TIMEOUT=1, MP_READ_TIMEOUT=1, MP_MAX_RETRIES=2, MP_BACKGROUND=False,
+        )
+        cls.mp_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mp_settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        gateway.reset_client()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        gateway.reset_client()
+        FakeMercadoPagoHandler.log = []
+        FakeMercadoPagoHandler.fail_next = 0
+        FakeMercadoPagoHandler.delay = 0
+        FakeMercadoPagoHandler.payments = {}
+
+
+class GatewayClientTest(FakeMercadoPagoTestCase):
+    def test_calls_reuse_pooled_connection(self):
+        self.assertEqual(gateway.create_preference({'external_reference': '7'})['id'], 'pref-7')
+        self.assertEqual(gateway.get_payment(123)['status'], 'approved')
+
+        ports = {request['port'] for request in FakeMercadoPagoHandler.log}
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 2)
+        self.assertEqual(len(ports), 1)
+
+    def test_retries_with_same_idempotency_key(self):
+        FakeMercadoPagoHandler.fail_next = 2
+        gateway.create_preference({'external_reference': '8'}, idempotency_key='preference-8')
+
+        keys = [request['idempotency_key'] for request in FakeMercadoPagoHandler.log]
+        self.assertEqual(keys, ['preference-8'] * 3)
+
+    def test_errors_and_timeouts_raise_gateway_error(self):
+        FakeMercadoPagoHandler.fail_next = 5
+        with self.assertRaises(gateway.PaymentGatewayError) as error:
+            gateway.get_payment(1)
+        self.assertEqual(error.exception.status, 503)
+
+        FakeMercadoPagoHandler.fail_next = 0
+        with self.settings(MP_READ_TIMEOUT=0.1, MP_MAX_RETRIES=0):
+            gateway.reset_client()
+            FakeMercadoPagoHandler.delay = 0.5
+            start = time.perf_counter()
+            with self.assertRaises(gateway.PaymentGatewayError):
+                gateway.get_payment(1)
+            self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_async_calls_retry_with_same_idempotency_key(self):
+        from ecommerce.http import close_async_session
+
+        async def calls():
+            try:
+                FakeMercadoPagoHandler.fail_next = 2
+                preference = await gateway.acreate_preference({'external_reference': '9'}, 'preference-9')
+                payment = await gateway.aget_payment(10)
+                return preference, payment
+            finally:
+                await close_async_session()
+
+        preference, payment = asyncio.run(calls())
+        self.assertEqual(preference['id'], 'pref-9')
+        self.assertEqual(payment['id'], 10)
+        keys = [request['idempotency_key'] for request in FakeMercadoPagoHandler.log[:3]]
+        self.assertEqual(keys, ['preference-9'] * 3)
+
+    def test_background_submit_runs_inline_when_disabled(self):
+        future = gateway.submit(gateway.get_payment, 5)
+        self.assertTrue(future.done())
+        self.assertEqual(future.result()['id'], 5)
+
+
+class PreferenceFlowTest(FakeMercadoPagoTestCase):
+    def setUp(self):
+        super().setUp()
+        from django.contrib.auth import get_user_model
+        from orders.models import ItemOrder, Order, PaymentMethod, ShipmentMethod, ShipmentOrder, StatusOrder
+        from products.models import Product
+
+        StatusOrder.objects.create(id=2, name="Pendiente")
+        payment = PaymentMethod.objects.create(id=3, name="Mercado Pago", time=2)
+        method = ShipmentMethod.objects.create(id=2, name="Envío", price=500)
+        self.user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        product = Product.objects.create(name="Mouse", stock=10, price=100, available=True)
+        self.order = Order.objects.create(
+            user=self.user, status_id=2, payment=payment, name="Lucas Martinez", total=698,
+            shipment=ShipmentOrder.objects.create(method=method, address="Av. Colón 1234"),
+        )
+        ItemOrder.objects.create(order=self.order, product=product, quantity=2, final_price=100)
+
+    def test_prefetched_preference_is_used_by_payment_page(self):
+        from django.urls import reverse
+        from payments import utils_for_mp
+
+        utils_for_mp.prefetch_preference(self.order.id)
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 1)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('payment-order-create', args=[self.order.id]))
+
+        self.assertEqual(response.context['preference_id'], f'pref-{self.order.id}')
+        # la pagina no volvio a llamar a Mercado Pago
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 1)
+        body = FakeMercadoPagoHandler.log[0]['body']
+        self.assertEqual([item['unit_price'] for item in body['items']], [100.0, 500.0])
+        self.assertEqual(body['payer']['surname'], 'Martinez')
+
+    def test_payment_page_survives_gateway_errors(self):
+        from django.urls import reverse
+
+        FakeMercadoPagoHandler.fail_next = 10
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('payment-order-create', args=[self.order.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['preference_id'])
+        self.assertIn('error_mp', response.context)
+
+    def test_payment_page_reloads_reuse_cached_preference(self):
+        from django.urls import reverse
+
+        self.client.force_login(self.user)
+        url = reverse('payment-order-create', args=[self.order.id])
+        for _ in range(3):
+            response = self.client.get(url)
+            self.assertEqual(response.context['preference_id'], f'pref-{self.order.id}')
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 1)
+
+        # un cambio en la orden invalida la preferencia (y el snapshot del detalle)
+        self.order.total = 598
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.save()
+        self.client.get(url)
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 2)
+
+
+class PaymentNotificationTest(FakeMercadoPagoTestCase):
+    def setUp(self):
+        super().setUp()
+        from django.contrib.auth import get_user_model
+        from orders.models import Order, StatusOrder
+
+        StatusOrder.objects.get_or_create(id=2, name="Pendiente")
+        StatusOrder.objects.get_or_create(id=4, name="Pago Confirmado")
+        user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        self.order = Order.objects.create(user=user, status_id=2, total=698)
+        FakeMercadoPagoHandler.payments = {
+            555: {'external_reference': str(self.order.id), 'transaction_amount': 698},
+        }
+
+    def notify(self, payment_id):
+        from django.urls import reverse
+        return self.client.post(
+            reverse('mp_webhook'), {'type': 'payment', 'data': {'id': str(payment_id)}},
+            content_type='application/json'
+        )
+
+    def test_webhook_only_enqueues(self):
+        from payments.models import PaymentNotification
+
+        with self.assertNumQueries(1):
+            response = self.notify(555)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(FakeMercadoPagoHandler.log, [])
+        self.assertEqual(PaymentNotification.objects.get().status, 'pending')
+
+        # otros topics se aceptan sin guardarlos
+        from django.urls import reverse
+        response = self.client.post(reverse('mp_webhook') + '?topic=merchant_order&id=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PaymentNotification.objects.count(), 1)
+
+        # IPN: sin body, el pago viene en los query params
+        response = self.client.post(reverse('mp_webhook') + '?topic=payment&id=556')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(PaymentNotification.objects.last().resource_id, '556')
+
+    def test_invalid_signature_is_rejected(self):
+        from payments.models import PaymentNotification
+
+        with self.settings(MERCADO_PAGO_WEBHOOK_SECRET='secret'):
+            response = self.notify(555)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(PaymentNotification.objects.exists())
+
+    def test_worker_confirms_order_once_for_duplicates(self):
+        from orders.models import Invoice
+        from payments import notifications
+        from payments.models import PaymentNotification
+
+        for _ in range(3):
+            self.notify(555)
+
+        self.assertEqual(notifications.process_notifications(), 3)
+        self.assertEqual(len(FakeMercadoPagoHandler.log), 1)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status_id, 4)
+        self.assertEqual(Invoice.objects.filter(order=self.order).count(), 1)
+        self.assertEqual(set(PaymentNotification.objects.values_list('status', flat=True)), {'done'})
+
+        # una notificacion repetida despues no duplica la factura
+        self.notify(555)
+        notifications.process_notifications()
+        self.assertEqual(Invoice.objects.filter(order=self.order).count(), 1)
+        self.assertEqual(notifications.process_notifications(), 0)
+
+    def test_failed_fetch_is_retried_later(self):
+        from payments import notifications
+        from payments.models import PaymentNotification
+
+        self.notify(555)
+        FakeMercadoPagoHandler.fail_next = 10
+        notifications.process_notifications()
+
+        notification = PaymentNotification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+        # no se vuelve a tomar hasta que pase RETRY_DELAY
+        self.assertEqual(notifications.process_notifications(), 0)
+
+    def test_confirm_error_does_not_block_the_rest_of_the_batch(self):
+        from orders.models import Order
+        from payments import notifications, utils
+        from payments.models import PaymentNotification
+
+        other = Order.objects.create(user=self.order.user, status_id=2, total=100)
+        FakeMercadoPagoHandler.payments[557] = {'external_reference': str(other.id), 'transaction_amount': 100}
+        self.notify(555)
+        self.notify(557)
+
+        confirm = utils.confirm_order_payment
+
+        def confirm_or_fail(payment_mp):
+            if payment_mp['external_reference'] == str(self.order.id):
+                raise RuntimeError("boom")
+            return confirm(payment_mp)
+
+        with mock.patch.object(utils, 'confirm_order_payment', side_effect=confirm_or_fail), \
+                self.assertLogs('payments.notifications', 'ERROR'):
+            self.assertEqual(notifications.process_notifications(), 2)
+
+        failed = PaymentNotification.objects.get(resource_id='555')
+        self.assertEqual((failed.status, failed.attempts), ('pending', 1))
+        self.assertIn("boom", failed.error)
+        self.assertEqual(PaymentNotification.objects.get(resource_id='557').status, 'done')
+        other.refresh_from_db()
+        self.assertEqual(other.status_id, 4)
+
+    def test_abandoned_processing_rows_are_reclaimed_after_the_lease(self):
+        from payments import notifications
+        from payments.models import PaymentNotification
+
+        self.notify(555)
+        # un worker que murio despues de tomar el lote
+        self.assertEqual(len(notifications.claim_batch()), 1)
+        self.assertEqual(notifications.claim_batch(), [])
+
+        PaymentNotification.objects.update(claimed_at=timezone.now() - notifications.PROCESSING_LEASE)
+        self.assertEqual(notifications.process_notifications(), 1)
+        self.assertEqual(PaymentNotification.objects.get().status, 'done')
@@ -1,15 +1,23 @@
 
 
+from django.conf import settings
 from django.urls import path
-from payments import views
+from payments import views, views_async
+from payments.views_api import MercadoPagoWebhook
+
+# en el deploy ASGI las paginas que esperan a mercado pago usan las vistas async
+mp_views = views_async if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('orden-compra/<int:order_id>/', views.payment_order_create, name='payment-order-create'),
+    path('orden-compra/<int:order_id>/', mp_views.payment_order_create, name='payment-order-create'),
 
-    path('success/', views.success, name='payment_success'),
+    path('success/', mp_views.success, name='payment_success'),
     path('failure/', views.failure, name='payment_failure'),
     path('pending/', views.pending, name='payment_pending'),
     
+    # notificaciones de mercado pago (webhook/IPN), se procesan en payments/notifications.py
+    path('webhooks/mercadopago/', MercadoPagoWebhook.as_view(), name='mp_webhook'),
+    
 
     # revisar en algun momento por mas cuotas de mp
     #   path("crear-preferencia/", views.crear_preferencia, name="crear_preferencia"),
@@ -1,109 +1,84 @@
+from decimal import Decimal
 
+from django.db import transaction
+from django.utils import timezone
 
-from orders.models import StatusOrder, Invoice
+from orders.models import Order, Invoice
 
-from cart.carrito import Carrito
+# Mercado Pago payment status -> StatusOrder id
+# 3 Pago a Confirmar, 4 Pago Confirmado
+MP_STATUS_TO_ORDER = {
+    'approved': 4,
+    'authorized': 3,
+    'in_process': 3,
+    'pending': 3,
+}
+CONFIRMED_STATUSES = (4, 5, 6)    # Pago Confirmado, Enviado, Completado
 
-from django.db import transaction
 
+def confirm_order_payment(payment_mp):
+    """
+    Applies a Mercado Pago payment to its order (external_reference) and creates the invoice
+    when it is approved. It is idempotent: the webhook worker and the success view can
+    both call it for the same payment.
 
+    Args:
+        payment_mp (dict): Payment as returned by GET /v1/payments/<id>.
 
-def confirm_order(request, payment_mp, order):
+    Returns:
+        tuple:
+            - Order | None: The order of the payment.
+            - Invoice | None: The invoice if the payment is approved.
+            - str: Message with the result (for debug/logs).
     """
-    esta funcion nos sirve para almacenar y guardar todos los datos en la base de datos y asociarlo
-    segun corresponda con cada base de datos
-    
-    order_data = {
-        "first_name": "Lucas",
-        "last_name": "Martinez",
-        "email": "lucas.martinez@example.com",
-        "cellphone": "3515437688",
-        "dni": "41224335",
-        "detail_order": "Por favor, entregar antes de las 18:00.",
-        
-        # NOTE if id_envio_method == '1': # this is only for retire local
-        "name_retiro": "lucas",
-        "dni_retiro": "martinez",
-        
-        # NOTE if id_envio_method != '1': # Home delivery
-        "province": "Córdoba",
-        "city": "Córdoba Capital",
-        "address": "Av. Colón 1234",
-        "postal_code": "5000",
-        "detail": "Departamento 2B",
-        
-        # NOTE this is for use to complete de order
-        "envio_method_id": "2", 
-        "payment_method_id": "3"
-    }
-    """
-    # recuperamos el order data de la session en el paso anterior que se guardo
-    order_data = request.session.get("order_data")
-    if not order_data:    # stupid check
-        return None, "No hay datos de orden disponibles."
+    order_id = payment_mp.get("external_reference")
+    if not order_id or not str(order_id).isdigit():
+        return None, None, "El pago no tiene external_reference."
+
+    status_mp = payment_mp.get("status")
+    new_status = MP_STATUS_TO_ORDER.get(status_mp)
 
-    user = request.user    # get user
-    if not user.is_authenticated:    # stupid check
-        return None, "Usuario no autenticado."
-    
-    # Verifica si los ítems están dentro de "additional_info"
-    # items_mp = payment_mp.get("additional_info", {}).get("items", [])
-    
-    # obtenemos los datos reales de quien pago en mercado pago
-    payer = payment_mp.get("payer", {})
-    
-    # obtenemos el id unico de la preferencia de mp
-    payment_id_mp = payment_mp.get("id", {})
-    
-    transaction_details = payment_mp.get("transaction_details", {})
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(id=order_id).first()
+        if not order:
+            return None, None, f"La orden {order_id} no existe."
 
-    # 
-    try:
-        with transaction.atomic():
-            
-            # Extraer datos del payer(pagador) from MP API of the response success
-            mp_name = mp_last_name = mp_dni = mp_email = None
-            if payer:
-                mp_name = payer.get("first_name", None)
-                mp_last_name = payer.get("last_name", None)
-                mp_email = payer.get("email", None)
-                identification = payer.get("identification", None)
-                if identification:
-                    mp_dni = identification.get("number", None)
+        if order.status_id in CONFIRMED_STATUSES:
+            return order, Invoice.objects.filter(order=order).first(), "La orden ya estaba confirmada."
 
-            # Obtenemos el carrito de la session
-            carrito = Carrito(request)
-            total_cart = carrito.total_price
+        if new_status is None:
+            return order, None, f"Pago en estado {status_mp}, la orden no cambia."
 
-            # Crear factura
-            invoice = Invoice.objects.create(
-                f_type="B",
-                name= f"{order_data.get("first_name", "")} {order_data.get("last_name", "")}",
-                dni=order_data.get("dni", ""),
-                email=order_data.get("email", ""),
-                cellphone=order_data.get("cellphone", ""),
-                
-                total=total_cart,    
-                shipment_cost=order.shipment.method.price,    # get cost shipment
-                total_mp=transaction_details.get("net_received_amount", None),
-                
-                name_mp=f"{mp_name} {mp_last_name}",
-                dni_mp=mp_dni,
-                email_mp=mp_email,
-                invoice_number=None  # This generate after create Factura
-            )
+        if new_status == 4:
+            paid = Decimal(str(payment_mp.get("transaction_amount") or 0))
+            if paid < order.total:
+                return order, None, f"Monto pagado {paid} menor al total {order.total}."
 
-            # Crear orden
-            status = StatusOrder.objects.get(id=3)  # Orden en estado "Pendiente"
-            order.status = status  # Cambiar estado a "Pendiente"
-            order.invoice = invoice  # Asociar factura
-            order.save()  # Guardar cambios en la base de datos
-            
-            # Vaciar el carrito tras la compra
-            carrito.clear()
+        order.status_id = new_status
+        order.save(update_fields=['status', 'updated_at'])
+        if new_status != 4:
+            return order, None, "Pago pendiente de acreditación."
 
-            return invoice, "La nueva factura fue creada con exito!"
+        # obtenemos los datos reales de quien pago en mercado pago
+        transaction_details = payment_mp.get("transaction_details") or {}
+        # el numero de factura se asigna en Invoice.save (InvoiceSequence), sin un segundo UPDATE
+        invoice, _ = Invoice.objects.get_or_create(
+            order=order,
+            defaults={
+                'user_id': order.user_id,
+                'fiscal_total': order.total,
+                'fiscal_type': 'B',
+                'is_paid': True,
+                'paid_at': timezone.now(),
+                'total_mp': transaction_details.get("net_received_amount") or 0,
+                'payment_processor_data': {
+                    'processor': 'mercadopago',
+                    'payment_id': payment_mp.get("id"),
+                    'status': status_mp,
+                    'payer': payment_mp.get("payer"),
+                    'transaction_amount': payment_mp.get("transaction_amount"),
+                },
+            }
+        )
 
-    except Exception as e:
-        return None, f"Error al confirmar la orden: {e}"
-    
\ No newline at end of file
+    return order, invoice, "La nueva factura fue creada con exito!"
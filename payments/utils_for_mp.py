@@ -1,13 +1,192 @@
 
 
-import mercadopago
+import asyncio
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order, ItemOrder
+from payments import gateway
+
+# Preferences requested in background when the order is created {order_id: Future}
+_pending_preferences = {}
+MAX_PENDING_PREFERENCES = 1000
+
+# Created preferences are reused while the order total does not change and they are not about
+# to expire, reloading the payment page does not call Mercado Pago again (see payments.signals)
+PREFERENCE_CACHE_KEY = 'mp_preference_{}'
+PREFERENCE_EXPIRY_MARGIN = timedelta(minutes=10)    # tiempo minimo que le queda al cliente para pagar
+PREFERENCE_KEY_WINDOW = 60 * 10    # segundos, misma idempotency key para llamadas casi simultaneas
+
+
+def get_order_for_preference(order_id):
+    """ Order with everything create_preference_data needs in 2 queries. """
+    return (
+        Order.objects.select_related('payment', 'shipment__method')
+        .prefetch_related(Prefetch('items', queryset=ItemOrder.objects.select_related('product__category')))
+        .get(id=order_id)
+    )
+
+
+def prefetch_preference(order_id):
+    """
+    Starts the preference creation in background right after checkout, so it is usually
+    ready when the customer lands on the payment page (see get_preference).
+    """
+    if len(_pending_preferences) >= MAX_PENDING_PREFERENCES:
+        _pending_preferences.pop(next(iter(_pending_preferences)))    # descarta la mas vieja
+    _pending_preferences[order_id] = gateway.submit(create_preference_for_order, order_id)
+
+
+def create_preference_for_order(order_id, discount=0):
+    """
+    Creates the preference of the order and caches it until its expiration_date_to
+    (minus PREFERENCE_EXPIRY_MARGIN).
+
+    Returns:
+        tuple: (preference_id, total_cart)
+    """
+    order = get_order_for_preference(order_id)
+    expires_at = timezone.now() + timedelta(hours=order.payment.time)
+
+    preference_id, total_cart = create_preference_data(order, discount, idempotency_key=_idempotency_key(order))
+    _cache_preference(order, expires_at, preference_id, total_cart)
+    return preference_id, total_cart
 
-sdk = mercadopago.SDK(settings.MERCADO_PAGO_ACCESS_TOKEN)
 
+def _idempotency_key(order) -> str:
+    return f"preference-{order.id}-{order.total}-{int(time.time() // PREFERENCE_KEY_WINDOW)}"
+
+
+def _cache_preference(order, expires_at, preference_id, total_cart) -> None:
+    timeout = (expires_at - PREFERENCE_EXPIRY_MARGIN - timezone.now()).total_seconds()
+    if timeout > 0:
+        cache.set(PREFERENCE_CACHE_KEY.format(order.id), {
+            'id': preference_id,
+            'total': str(order.total),
+            'total_cart': total_cart,
+            'expires_at': expires_at,
+        }, int(timeout))
+
+
+def get_cached_preference(order_id, total):
+    """
+    Returns:
+        tuple | None: (preference_id, total_cart) if there is a preference for this
+        (order_id, total) that is still valid for PREFERENCE_EXPIRY_MARGIN.
+    """
+    cached = cache.get(PREFERENCE_CACHE_KEY.format(order_id))
+    if not cached or cached['total'] != str(total):
+        return None
+    if cached['expires_at'] - PREFERENCE_EXPIRY_MARGIN <= timezone.now():
+        return None
+    return cached['id'], cached['total_cart']
+
+
+def get_preference(order_id, total, discount=0):
+    """
+    Returns the preference of the order, in this order:
+        1. The cached one for (order_id, total) if it does not expire soon (no external call).
+        2. The one requested in background by this worker when the order was created.
+        3. A new one created now.
+
+    Args:
+        order_id (int): ID of the order.
+        total (Decimal): Current total of the order (from the order detail snapshot).
+
+    Returns:
+        tuple: (preference_id, total_cart)
+
+    Raises:
+        PaymentGatewayError: Mercado Pago is not available.
+    """
+    cached = get_cached_preference(order_id, total)
+    if cached:
+        _pending_preferences.pop(order_id, None)
+        return cached
+
+    future = _pending_preferences.pop(order_id, None)
+    if future is not None:
+        try:
+            future.result(timeout=settings.MP_CONNECT_TIMEOUT + settings.MP_READ_TIMEOUT)
+            cached = get_cached_preference(order_id, total)
+            if cached:
+                return cached
+        except Exception:
+            pass    # se reintenta inline, la idempotency key evita duplicar la preferencia
+    return create_preference_for_order(order_id, discount)
 
-def create_preference_data(order, discount):
+
+async def aget_preference(order_id, total, discount=0):
+    """
+    Async version of get_preference (payments/views_async.py), the worker keeps serving
+    other requests while Mercado Pago answers.
+
+    Returns:
+        tuple: (preference_id, total_cart)
+
+    Raises:
+        PaymentGatewayError: Mercado Pago is not available.
+    """
+    cached = await sync_to_async(get_cached_preference)(order_id, total)
+    if cached:
+        _pending_preferences.pop(order_id, None)
+        return cached
+
+    future = _pending_preferences.pop(order_id, None)
+    if future is not None:
+        try:
+            timeout = settings.MP_CONNECT_TIMEOUT + settings.MP_READ_TIMEOUT
+            await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            cached = await sync_to_async(get_cached_preference)(order_id, total)
+            if cached:
+                return cached
+        except Exception:
+            pass    # se reintenta, la idempotency key evita duplicar la preferencia
+
+    order = await sync_to_async(get_order_for_preference)(order_id)
+    expires_at = timezone.now() + timedelta(hours=order.payment.time)
+    preference_data, total_cart = await sync_to_async(build_preference_data)(order, discount)
+    preference = await gateway.acreate_preference(preference_data, idempotency_key=_idempotency_key(order))
+    await sync_to_async(_cache_preference)(order, expires_at, preference['id'], total_cart)
+    return preference['id'], total_cart
+
+
+def invalidate_preference(order_id) -> None:
+    cache.delete(PREFERENCE_CACHE_KEY.format(order_id))
+
+
+def create_preference_data(order, discount=0, idempotency_key=None):
+    """
+    Creates the preference of the order in Mercado Pago.
+
+    Returns:
+        tuple: (preference_id, total_cart)
+    """
+    preference_data, total_cart = build_preference_data(order, discount)
+
+    # Crea la preferencia en Mercado Pago (timeouts, retries y pool en payments/gateway.py)
+    preference = gateway.create_preference(preference_data, idempotency_key=idempotency_key)
     
+    # Obtiene el ID de la preferencia que se pasa como contexto
+    preference_id = preference["id"]
+    
+    return preference_id, total_cart
+
+
+def build_preference_data(order, discount=0):
+    """
+    Body of the preference of the order, without calling Mercado Pago.
+
+    Returns:
+        tuple: (preference_data, total_cart)
+    """
     # Generar las fechas
     expiration_date_from = generate_datetime(flag='start')
     expiration_date_to = generate_datetime(flag='end', hours_window=order.payment.time)
@@ -42,7 +221,7 @@ def create_preference_data(order, discount):
             "excluded_payment_types" : [],
             "installments" : 1
         },
-        "notification_url": "https://www.your-site.com/ipn",
+        "notification_url": settings.BASE_URL_PAGE.rstrip('/') + reverse('mp_webhook'),
         "statement_descriptor": settings.PYME_NAME,
         # fechas calculadas con la fucnion en payments/utils.py
         "expires": True, 
@@ -55,15 +234,7 @@ def create_preference_data(order, discount):
         # Referencia externa asociada con la orden
         "external_reference": str(order.id),  
     }
-
-    # Crea la preferencia en Mercado Pago
-    preference_response = sdk.preference().create(preference_data)
-    preference = preference_response["response"]
-    
-    # Obtiene el ID de la preferencia que se pasa como contexto
-    preference_id = preference["id"]
-    
-    return preference_id, total_cart
+    return preference_data, total_cart
 
 
 def get_items_from_order(order):
@@ -87,14 +258,10 @@ def get_items_from_order(order):
     items = []
     total_cart = 0
 
-    # Precargar relaciones necesarias si no están ya precargadas    # items_order = order.items.all()
-    if not hasattr(order, '_prefetched_objects_cache') or 'items' not in order._prefetched_objects_cache:
-        order.items.all().select_related('product')
-
-    # Procesar items
+    # items y productos vienen precargados desde get_order_for_preference (sin N+1)
     for item in order.items.all():
         product = item.product
-        price = float(item.price)
+        price = float(item.final_price)
         quantity = item.quantity
         category_name = (product.category.name or "No Category")[:50]
         
@@ -104,7 +271,7 @@ def get_items_from_order(order):
             "quantity": quantity,
             "unit_price": price,
             "currency_id": "ARS",  # Moneda (ajustar según sea necesario)
-            "picture_url": product.main_image[:500],  # Límite de URL
+            "picture_url": (product.main_image or '')[:500],  # Límite de URL
             "description": (product.description or '')[:255],
             "category_id": category_name,
         })
@@ -196,9 +363,10 @@ def get_payer_info_from_form(order):
     }
     """
     
+    first_name, _, last_name = (order.name or "").partition(' ')
     payer = {
-        "name": (order.first_name or "")[:25],    # Limit MP
-        "surname": (order.last_name or "")[:25],
+        "name": first_name[:25],    # Limit MP
+        "surname": last_name[:25],
         "email": (order.email or "")[:50],
         "phone": {
             "area_code": "351",
@@ -226,7 +394,7 @@ def get_payer_info_from_form(order):
     return payer
 
     
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone as dt_timezone
 def generate_datetime(flag: str='start', hours_window: int=4, utc_offset: int=-3) -> str:
     """
     Genera una fecha y hora formateada en el estándar ISO 8601.
@@ -240,7 +408,7 @@ def generate_datetime(flag: str='start', hours_window: int=4, utc_offset: int=-3
         str: Fecha y hora formateada en ISO 8601 con el offset de zona horaria.
     """
     # Obtener la fecha y hora actuales
-    now = datetime.now(timezone.utc)  # Hora actual en UTC
+    now = datetime.now(dt_timezone.utc)  # Hora actual en UTC
 
     # Ajustar la hora a la zona horaria local
     start_time = now + timedelta(hours=utc_offset)
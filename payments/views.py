@@ -1,11 +1,10 @@
 
 
 # Create your views here.
-import mercadopago
 from django.conf import settings
 from django.shortcuts import render
 
-from payments import utils
+from payments import gateway, utils
 from payments import utils_for_mp
 
 
@@ -16,8 +15,6 @@ from datetime import timedelta
 from django.utils import timezone
 from django.template.defaultfilters import date
 
-sdk = mercadopago.SDK(settings.MERCADO_PAGO_ACCESS_TOKEN)
-
 def payment_order_create(request, order_id):
     """
         Esta función es principalmente para permitir el pago mediante tarjetas o transferencia de forma 
@@ -29,18 +26,20 @@ def payment_order_create(request, order_id):
 
     context = get_order_detail_context(order_id, user)
     if context is None:
-        render(request, "payments/fail_payments.html", {"error": "Order Not Found."})
+        return render(request, "payments/fail_payments.html", {"error": "Order Not Found."})
     
     payment = context['payment']
     
     # id = 3 --> mercado pago API
-    print(f'El id es {payment['id']}')
+    preference_id = None
     if payment['id'] == 3:
-        order = context['order']  
-        discount = context['discount']   # future discount logic
-        preference_id, total_cart = utils_for_mp.create_preference_data(order, discount)  
-    else:
-        preference_id = None
+        try:
+            # normalmente ya fue creada en background al confirmar el pedido (ver OrderAPI)
+            # y se reutiliza mientras no cambie el total ni este por expirar (sin llamadas externas)
+            order = context['order']
+            preference_id, total_cart = utils_for_mp.get_preference(order['id'], order['total'])
+        except gateway.PaymentGatewayError:
+            context['error_mp'] = 'Mercado Pago no está disponible en este momento, recargue en unos minutos.'
         
     # More context stuff
     context['preference_id'] = preference_id    # esto es para crear el brick en el front asociado al monto
@@ -63,25 +62,22 @@ def success(request):
     payment_id = int(request.GET.get('payment_id'))
 
     # Recuperamos los datos del payment despues del success por mercado pago para almacenar informacion
-    payment_response = sdk.payment().get(payment_id)
-    payment_mp = payment_response["response"]
-    
-    # Obtén el `external_reference` (que es el ID de la orden)
-    external_reference = payment_mp.get("external_reference")
+    try:
+        payment_mp = gateway.get_payment(payment_id)
+    except gateway.PaymentGatewayError:
+        # MP lento o caido: no bloqueamos el worker, el pago se confirma luego
+        return render(request, 'payments/pending.html')
     
-    # Si `external_reference` existe, puedes asociarlo con la orden de tu sistema
-    order = Order.objects.get(id=external_reference)  # Aquí asocias el pago con tu orden
+    return render_payment_result(request, payment_mp)
+
+
+def render_payment_result(request, payment_mp):
+    """ Confirms the order of the payment and renders the success page (shared with views_async.success). """
+    # Confirma la orden (external_reference) y crea la factura, si el webhook ya lo hizo no repite nada
+    order, invoice, message = utils.confirm_order_payment(payment_mp)
     message_error = "Salio todo bien"    # for debug
     if not order:    # stupid check
-        message_error = "No hubo external reference o no se asocio bien el id"
-
-    # get the order and factura created
-    invoice, message = utils.confirm_order(request, payment_mp, order)
-    
-    # Asignar el número de factura basado en el ID generado
-    if invoice:    # stupid check
-        invoice.invoice_number = f"FAC-{invoice.id:06d}"
-        invoice.save()
+        return render(request, "payments/fail_payments.html", {"error": message})
     
     
     items = order.items.all()      # get Orderitems associeted with the order    
@@ -133,8 +129,7 @@ def crear_preferencia(request):
         "auto_return": "approved"
     }
 
-    preference_response = sdk.preference().create(preference_data)
-    preference_id = preference_response["response"]["id"]
+    preference_id = gateway.create_preference(preference_data)["id"]
 
     return JsonResponse({"preference_id": preference_id})
 
@@ -0,0 +1,28 @@
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from payments import notifications
+
+
+class MercadoPagoWebhook(APIView):
+    """
+    Receives Mercado Pago webhooks/IPN. Only validates, stores the notification and acks,
+    the payment is fetched and applied by the process_payment_notifications worker.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []    # llamada server to server, sin sesion ni CSRF
+
+    def post(self, request):
+        topic, resource_id = notifications.parse_notification(request)
+        if not topic:
+            # otros topics (merchant_order, etc) se aceptan para que MP no reintente
+            return Response({'detail': 'ignored'}, status=status.HTTP_200_OK)
+
+        if not notifications.valid_signature(request, resource_id):
+            return Response({'detail': 'Firma inválida.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        payload = notifications.notification_body(request) or request.query_params.dict()
+        notifications.enqueue_notification(topic, resource_id, payload=payload)
+        return Response({'detail': 'queued'}, status=status.HTTP_200_OK)
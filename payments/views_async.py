@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render
+
+from orders.utils import get_order_detail_context
+from payments import gateway, utils_for_mp
+from payments.views import render_payment_result
+
+# ======================================================================
+#   Async versions of payment_order_create and success (settings.ASYNC_VIEWS, ASGI deploy)
+#   The call to Mercado Pago is awaited, the DB work and the template run in a thread.
+# ======================================================================
+arender = sync_to_async(render)
+
+
+async def payment_order_create(request, order_id):
+    """ Same as views.payment_order_create, the preference is created without blocking the worker. """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return await arender(request, "payments/fail_payments.html", {"error": "Debes iniciar sesión para pagar."})
+
+    context = await sync_to_async(get_order_detail_context)(order_id, user)
+    if context is None:
+        return await arender(request, "payments/fail_payments.html", {"error": "Order Not Found."})
+
+    # id = 3 --> mercado pago API
+    preference_id = None
+    if context['payment']['id'] == 3:
+        try:
+            order = context['order']
+            preference_id, total_cart = await utils_for_mp.aget_preference(order['id'], order['total'])
+        except gateway.PaymentGatewayError:
+            context['error_mp'] = 'Mercado Pago no está disponible en este momento, recargue en unos minutos.'
+
+    context['preference_id'] = preference_id
+    context['public_key'] = settings.MERCADO_PAGO_PUBLIC_KEY
+    return await arender(request, "orders/order_detail.html", context)
+
+
+async def success(request):
+    """ Same as views.success, the payment is fetched without blocking the worker. """
+    payment_id = int(request.GET.get('payment_id'))
+    try:
+        payment_mp = await gateway.aget_payment(payment_id)
+    except gateway.PaymentGatewayError:
+        # MP lento o caido, el pago se confirma luego con el webhook
+        return await arender(request, 'payments/pending.html')
+
+    return await sync_to_async(render_payment_result)(request, payment_mp)
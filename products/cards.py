@@ -0,0 +1,63 @@
+
+
+from django.core.cache import cache
+
+from products.models import Product
+
+# Datos minimos de un producto para las tarjetas del carrito, compartidos entre sesiones y workers.
+# La sesion solo guarda {product_id: quantity}, el resto se completa desde aca.
+PRODUCT_CARD_CACHE_KEY = 'product_card:{}'
+# TTL corto por si algun .update()/bulk_update masivo no pasa por invalidate_product_cards
+PRODUCT_CARD_CACHE_TIMEOUT = 60 * 5
+PRODUCT_CARD_FIELDS = ('id', 'name', 'slug', 'price', 'main_image', 'stock', 'available')
+
+
+def product_card(product: Product) -> dict:
+    """ Card of a product instance loaded with (at least) PRODUCT_CARD_FIELDS. """
+    return {
+        'id': product.id,
+        'name': product.name,
+        'slug': product.slug,
+        'price': float(product.price),
+        'image': product.main_image,
+        # mismo criterio que Product.stock_or_available
+        'stock': product.stock if product.available else 0,
+    }
+
+
+def cache_product_cards(products) -> None:
+    """ Stores the cards of already loaded products (avoids the query on the next read). """
+    cache.set_many(
+        {PRODUCT_CARD_CACHE_KEY.format(p.id): product_card(p) for p in products},
+        PRODUCT_CARD_CACHE_TIMEOUT
+    )
+
+
+def get_product_cards(product_ids) -> dict:
+    """
+    Returns the cards of the products with one get_many to the shared cache,
+    the misses are loaded with a single query and cached.
+
+    Args:
+        product_ids (iterable): Product ids (int or str).
+
+    Returns:
+        dict: {product_id (int): card}. Products that no longer exist are not included.
+    """
+    ids = {int(product_id) for product_id in product_ids}
+    if not ids:
+        return {}
+
+    keys = {PRODUCT_CARD_CACHE_KEY.format(product_id): product_id for product_id in ids}
+    cards = {keys[key]: card for key, card in cache.get_many(keys).items()}
+
+    missing = ids - cards.keys()
+    if missing:
+        products = list(Product.objects.filter(id__in=missing).only(*PRODUCT_CARD_FIELDS))
+        cache_product_cards(products)
+        cards.update((p.id, product_card(p)) for p in products)
+    return cards
+
+
+def invalidate_product_cards(product_ids) -> None:
+    cache.delete_many([PRODUCT_CARD_CACHE_KEY.format(product_id) for product_id in product_ids])
@@ -0,0 +1,104 @@
+
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from ecommerce.cache import tiered_cache
+from favorites.utils import get_favs_products
+from home.context_processors import STORE_CACHE_NAMESPACE
+from products.filters import CATALOG_CACHE_NAMESPACE
+
+# ======================================================================
+#   Conditional GET (ETag) for the catalog pages and APIs
+#   The validators are the versions of the tiered cache namespaces, bumped on every change
+#   of the data shown, so a revalidation costs a few cache reads and no query:
+#       - 'products': products, stock and images (products.signals, checkout, commands)
+#       - 'catalog': categories, subcategories and brands
+#       - 'popularity': order of ?sort=popular (products.popularity.flush)
+#       - 'store': header/footer of the html pages
+# ======================================================================
+PRODUCTS_CACHE_NAMESPACE = 'products'
+POPULARITY_CACHE_NAMESPACE = 'popularity'
+
+
+def bump_products() -> None:
+    """ Changes the ETag of every page/API that shows products (after writes that skip the signals). """
+    tiered_cache.bump(PRODUCTS_CACHE_NAMESPACE)
+
+
+def catalog_etag(*parts, namespaces=(PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE)) -> str:
+    """
+    Args:
+        parts: extra values the response depends on (user, cart, ...), must have a stable repr.
+        namespaces (tuple): tiered cache namespaces whose data is in the response.
+
+    Returns:
+        str: hash of the namespace versions, the parts and settings.RELEASE_VERSION (templates).
+    """
+    versions = [tiered_cache.get_namespace_version(namespace) for namespace in namespaces]
+    key = repr((settings.RELEASE_VERSION, versions, parts))
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def _popularity(request):
+    return (POPULARITY_CACHE_NAMESPACE,) if request.GET.get('sort') == 'popular' else ()
+
+
+def user_parts(request) -> tuple:
+    """ Per user data of the responses: user, favorites and the session cart (navbar of every page). """
+    user = request.user
+    favorites = sorted(get_favs_products(user) or ())    # cacheado por usuario
+    cart = sorted((request.session.get('carrito') or {}).items())
+    return (user.pk, favorites, cart)
+
+
+def page_etag(request, *args, **kwargs) -> str:
+    """ ETag of the html pages of the catalog (product_list, product_detail). """
+    namespaces = (PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE, STORE_CACHE_NAMESPACE) + _popularity(request)
+    return catalog_etag(*user_parts(request), namespaces=namespaces)
+
+
+def products_api_etag(request, *args, **kwargs) -> str:
+    """ ETag of the product list API (has the favorites of the user). """
+    user = request.user
+    favorites = sorted(get_favs_products(user) or ())
+    namespaces = (PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE) + _popularity(request)
+    return catalog_etag(user.pk, favorites, namespaces=namespaces)
+
+
+def images_api_etag(request, *args, **kwargs) -> str:
+    """ ETag of the images API, the same for every user. """
+    return catalog_etag(namespaces=(PRODUCTS_CACHE_NAMESPACE,))
+
+
+def conditional_get(etag_func, private=True, on_response=None):
+    """
+    Decorator for function views and (with method_decorator) APIView.get: answers 304 Not Modified
+    without running the view when If-None-Match matches etag_func(request, *args, **kwargs).
+
+    Args:
+        etag_func (callable): one of the *_etag functions of this module.
+        private (bool): per user responses are cached only by the browser, the rest also by proxies.
+        on_response (callable, optional): on_response(request, response, *args, **kwargs) after every
+            200 or 304, for the side effects of the view that must also run on a revalidation (e.g. counters).
+
+    Notes:
+        - 'no-cache' makes the browser revalidate every time, so a change is seen on the next request.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                patch_cache_control(response, no_cache=True, **({'private': True} if private else {'public': True}))
+                if on_response is not None:
+                    on_response(request, response, *args, **kwargs)
+            return response
+        return wrapper
+    return decorator
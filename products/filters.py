@@ -49,6 +49,12 @@ VALUES_CARDS_LIST = (
     # 'brand__id', 'brand__slug', 'brand__name', 'brand__is_default'
 )
 
+# sorting options accepted in ?sort=, every option ends with 'id' to keep pagination stable
+SORT_OPTIONS = {
+    'price': ('price', 'id'),
+    'popular': (models.F('stats__score').desc(nulls_last=True), 'price', 'id'),
+}
+
 def get_context_filtered_products(request) -> dict:
     """
     Extracts and validates filter parameters from the GET request, retrieves the filtered 
@@ -68,6 +74,7 @@ def get_context_filtered_products(request) -> dict:
                 - '1' = only available products
                 - '2' = all products (available and unavailable)
             - "query" (str or None): The search query string, if any, used to filter products by name or other fields.
+            - "sort" (str): The applied sorting option, one of SORT_OPTIONS keys ('price' by default).
     """
     def _get_filtered_entity(model, id_value, is_default=False):
         """Función helper interna para obtener entidades filtradas por id."""
@@ -94,6 +101,7 @@ def get_context_filtered_products(request) -> dict:
     available = request.GET.get('available', '1')
     query = request.GET.get('query', '')
     top_query = request.GET.get('topQuery', '')
+    sort = request.GET.get('sort', 'price')
 
     # Obtener filtros usando la función helper interna
     category = _get_filtered_entity(PCategory, cat_id, is_default=False)
@@ -109,6 +117,7 @@ def get_context_filtered_products(request) -> dict:
         'top_query': top_query,
         'available': True if available == '1' else False, 
         'get_all': True if available == '2' else False,
+        'sort': sort,
     }
     products = get_products_filters(filter_args)
 
@@ -120,6 +129,7 @@ def get_context_filtered_products(request) -> dict:
         "brand": brand,
         "available": available,
         "query": query,
+        "sort": sort if sort in SORT_OPTIONS else 'price',
     }
 
 
@@ -138,6 +148,8 @@ def get_products_filters(filters: dict) -> QuerySet:
             - 'top_query' (str)
             - 'available' (bool)
             - 'get_all' (bool): If True, returns all products regardless of 'available'.
+            - 'sort' (str): One of SORT_OPTIONS keys, 'popular' sorts by ProductStats.score.
+                Defaults to 'price'.
         
     Returns:
         QuerySet[Product]: Filtered queryset (may be empty if no matches).
@@ -150,6 +162,7 @@ def get_products_filters(filters: dict) -> QuerySet:
     query = filters.get('query', '')               
     top_query = filters.get('top_query', '')            # query STR || ''
     stock = filters.get('stock', False)  
+    sort = filters.get('sort') or 'price'
 
     # Si all está activo, no se filtra por disponibilidad
     products = Product.objects.all() if get_all else Product.objects.filter(available=available)
@@ -190,10 +203,18 @@ def get_products_filters(filters: dict) -> QuerySet:
         #    - Ejemplo: WHERE normalized_name LIKE '%zapatilla%' AND normalized_name LIKE '%nike%'
         products = products.filter(query_filter)
 
-    return products
+    # unknown values fall back to the default price order
+    return products.order_by(*SORT_OPTIONS.get(sort, SORT_OPTIONS['price']))
+
+
+from ecommerce.cache import tiered_cache
+
+# categorias del menu: L1 en cada worker + cache compartido, se invalida con bump del namespace
+CATALOG_CACHE_NAMESPACE = 'catalog'
+CATEGORIES_CACHE_KEY = 'categories_dropmenu'
+CATEGORIES_CACHE_TIMEOUT = 60 * 60
 
 
-from django.core.cache import cache
 def get_categories_n_subcategories(
     from_cache=True, 
     from_dashboard=False,
@@ -241,12 +262,12 @@ def get_categories_n_subcategories(
                     {{ item.category.name }} - {{ subcat.slug }}
     """
     if from_cache and not from_dashboard:
-        categories_dropmenu = cache.get('categories_dropmenu')
+        categories_dropmenu = tiered_cache.get_versioned(CATALOG_CACHE_NAMESPACE, CATEGORIES_CACHE_KEY)
         
         # if categories_dropmenu and from_dashboard:
         #    categories_list = list(categories_dropmenu.values())
         #    return categories_list
-        if categories_dropmenu:
+        if categories_dropmenu is not None:
             return categories_dropmenu
         
     # initial lazy queries to database depend on from_dashboard bool
@@ -284,10 +305,13 @@ def get_categories_n_subcategories(
         categories_list = list(categories_dropmenu.values())
         return categories_list
 
+    if from_cache and not from_dashboard:
+        tiered_cache.set_versioned(
+            CATALOG_CACHE_NAMESPACE, CATEGORIES_CACHE_KEY, categories_dropmenu, CATEGORIES_CACHE_TIMEOUT
+        )
     return categories_dropmenu
 
 
-from products.serializers import BrandListSerializer
 def get_serializer_brands(
     brands_ids=None,
     values: tuple = ('id', 'name', 'slug', 'image_url'), 
@@ -333,6 +357,10 @@ def get_serializer_brands(
     if brands_ids:
         brands = brands.filter(id__in=brands_ids)
     
+    # import local: filters lo carga django.setup() (signals -> context_processors) y
+    # rest_framework.serializers es el import mas pesado del proyecto
+    from products.serializers import BrandListSerializer
+
     brands = brands.values(*values).order_by('name')
     serializer = BrandListSerializer(brands, many=True)
     return serializer.data
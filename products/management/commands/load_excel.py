@@ -1,9 +1,9 @@
 
 
 from django.core.management.base import BaseCommand
-from openpyxl import load_workbook
 
 from products import utils
+from products.conditional import bump_products
 from products.models import Product, PCategory, PSubcategory, PBrand, ProductImage
 from users.models import CustomUser
 
@@ -15,6 +15,7 @@ from products.data.load_store import load_store_init
 # command python manage.py load_data_project
 from django.utils.text import slugify
 from django.utils.crypto import get_random_string
+from django.utils import timezone
 
 def unique_slug(base_slug, model):
     slug = base_slug
@@ -43,30 +44,34 @@ def clean_value(value, zero=False):
     return result
         
 def update_main_imagess():
-    products = Product.objects.all()
+    # imagenes precargadas y guardado en batch, antes eran 2-3 saves por producto
+    products = Product.objects.only('id', 'name', 'main_image', 'updated_at').prefetch_related('images')
+    now = timezone.now()
+    images_to_update = []
+    products_to_update = []
 
     for product in products:
-        images = product.images.all()
+        images = list(product.images.all())
         
         if not images:
             print(f'⚠️ Product "{product.name}" has no images.')
             continue
 
-        # Set the first image as main
-        first_image = images[0]
-        first_image.main_image = True
-        first_image.save()
-
-        # Optionally, set all others to False (cleanup)
-        for img in images[1:]:
-            if img.main_image:
-                img.main_image = False
-                img.save()
+        # Set the first image as main, and all others to False (cleanup)
+        for i, img in enumerate(images):
+            if img.main_image != (i == 0):
+                img.main_image = i == 0
+                images_to_update.append(img)
 
         # Update product's main_image field
-        product.main_image = first_image.image_url
-        product.save()
-        print(f'✔ Main image updated for product "{product.name}"')
+        product.main_image = images[0].image_url
+        product.updated_at = now    # bulk_update no aplica auto_now
+        products_to_update.append(product)
+
+    ProductImage.objects.bulk_update(images_to_update, ['main_image'], batch_size=500)
+    Product.objects.bulk_update(products_to_update, ['main_image', 'updated_at'], batch_size=500)
+    bump_products()    # bulk_update no dispara las signals, nuevo ETag del catalogo
+    print(f'✔ Main image updated for {len(products_to_update)} products')
 
 from django.contrib.auth.hashers import make_password
 from users.models import CustomUser
@@ -113,6 +118,7 @@ class Command(BaseCommand):
         ]
 
         # Abrimos el archivo Excel
+        from openpyxl import load_workbook    # heavy import, only when this command runs
         wb = load_workbook(file)
         ws = wb.active
 
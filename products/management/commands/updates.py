@@ -11,6 +11,7 @@ from products.data.load_store import load_store_init
 from products.models import Product
 from home.models import Store, StoreImage
 from products import filters
+from products.conditional import bump_products
 
 
 class Command(BaseCommand):
@@ -20,32 +21,67 @@ class Command(BaseCommand):
         # update_fix_main_image()
         # load_store_init()
         # update_new_store_image_model()
-        update_some_orders()
+        updated = update_some_orders()
+        self.stdout.write(self.style.SUCCESS(f"{updated} ordenes actualizadas"))
         
         
-def update_some_orders():
-    from orders.models import Order, ItemOrder
+def update_some_orders() -> int:
+    """
+    Fills shipment_cost, discount_coupon and total of the orders without total with a single
+    UPDATE, the subtotal and the shipment price come from subqueries.
+
+    Notes:
+        - update() does not send the Order signals, the caches they clear (order snapshot,
+          Mercado Pago preference) are cleared here and the sales rollup of the days with
+          sale orders is rebuilt.
+
+    Returns:
+        int: Number of orders updated.
+    """
     from decimal import Decimal
-    
-    orders = Order.objects.all()
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Coalesce
+    from django.utils import timezone
+    from dashboard import analytics
+    from orders.models import ItemOrder, Order, ShipmentOrder
+    from orders.utils import ORDER_DETAIL_CACHE_KEY
+    from payments.utils_for_mp import PREFERENCE_CACHE_KEY
+
+    money = DecimalField(max_digits=10, decimal_places=2)
     discount_coupon = Decimal("2.00")
-    
-    for order in orders:
-        
-        if order.total == 0:
-            # Actualizar la orden con estos campos
-            price_shipment = order.shipment.method.price
-            order.shipment_cost = price_shipment
-            order.discount_coupon = discount_coupon
-            
-            subtotal = 0
-            items = ItemOrder.objects.filter(order=order)
-            for item in items:
-                subtotal += (item.quantity * item.final_price)
-                
-            order.total = subtotal + price_shipment - discount_coupon
-            order.save(update_fields=["shipment_cost", "discount_coupon", "total"])
-            print(f'actualizado: {order.id}')
+    subtotal = Subquery(
+        ItemOrder.objects.filter(order=OuterRef('pk')).values('order')
+        .annotate(subtotal=Sum(F('quantity') * F('final_price'))).values('subtotal'),
+        output_field=money,
+    )
+    price_shipment = Subquery(
+        ShipmentOrder.objects.filter(id=OuterRef('shipment_id')).values('method__price'), output_field=money
+    )
+    price_shipment = Coalesce(price_shipment, Value(0), output_field=money)
+
+    with transaction.atomic():
+        orders = Order.objects.select_for_update().filter(total=0)
+        affected = list(orders.values_list('id', 'status_id', 'created_at'))
+        updated = orders.update(
+            shipment_cost=price_shipment,
+            discount_coupon=discount_coupon,
+            total=Coalesce(subtotal, Value(0), output_field=money) + price_shipment - discount_coupon,
+        )
+
+    cache.delete_many(
+        [ORDER_DETAIL_CACHE_KEY.format(order_id) for order_id, _, _ in affected]
+        + [PREFERENCE_CACHE_KEY.format(order_id) for order_id, _, _ in affected]
+    )
+    # mismo dia que analytics.order_day (fecha local de creacion)
+    sale_days = {
+        timezone.localdate(created_at)
+        for _, status_id, created_at in affected if status_id in analytics.SALE_STATUSES
+    }
+    for day in sorted(sale_days):
+        analytics.rebuild_sales_day(day)
+    return updated
         
         
 def update_new_store_image_model():
@@ -112,4 +148,5 @@ def updates_normalized_names():
         print(f"name: {product.name} | normalized_name: {product.normalized_name}")
         
     # Usar bulk_update para actualizar todos los productos en una sola consulta
-    Product.objects.bulk_update(products, ['normalized_name'])
\ No newline at end of file
+    Product.objects.bulk_update(products, ['normalized_name'])
+    bump_products()    # cambia el resultado de las busquedas
\ No newline at end of file
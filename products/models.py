@@ -319,11 +319,9 @@ class Product(models.Model):
         
     def make_stock_reserved(self, quantity):
         """ Method for products to reserve stock for different payment orders """
-        print(f'Available {self.available} - Stock: {self.stock} - Cantidad: {quantity}')
         if not self.available or self.stock < quantity:
             return False
         
-        print('reservo el stock')
         self.stock -= quantity
         self.stock_reserved += quantity
         return True
@@ -347,3 +345,29 @@ class Product(models.Model):
     
     
     
+
+
+class ProductStats(models.Model):
+    """
+    Popularity counters of a product (detail views, favorites and cart adds).
+
+    These rows are never written on the request path, the increments are buffered in memory
+    by products.popularity and flushed periodically in a single batched UPDATE with F().
+    'score' is a weighted sum kept up to date on each flush to sort by "most popular".
+    """
+    product = models.OneToOneField(
+        'Product', on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    views = models.PositiveIntegerField(default=0)
+    favorites = models.IntegerField(default=0)    # can go down when a product is unliked
+    cart_adds = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='productstats_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"Product ID: {self.product_id} | score: {self.score}"
@@ -0,0 +1,124 @@
+from django.db.models import F
+
+from ecommerce.cache import tiered_cache
+from products import filters
+from products.conditional import POPULARITY_CACHE_NAMESPACE, PRODUCTS_CACHE_NAMESPACE, catalog_etag
+from products.filters import CATALOG_CACHE_NAMESPACE
+from products.models import Product
+
+# ======================================================================
+#   Shared data of the catalog pages (home, product_list, product_detail), the same for
+#   every user: the views add the favorites after reading it.
+#   The key has the versions of the namespaces the data depends on (the same validators as
+#   the ETags of products/conditional.py), so a bump makes every worker rebuild it.
+#   The warmup command fills them after each deploy (home/warmup.py).
+# ======================================================================
+PAYLOAD_CACHE_TIMEOUT = 60 * 10
+HOME_PRODUCTS_LIMIT = 100
+LISTING_PAGE_SIZE = 100
+# paginas de cada listado que se cachean, las siguientes y las busquedas van directo a la DB
+LISTING_CACHED_PAGES = 3
+BRANDS_VALUES = ('id', 'name', 'slug', 'image_url')
+
+
+def cached_payload(name, build, *parts, namespaces, refresh=False):
+    """
+    Args:
+        name (str): kind of payload, prefix of the key.
+        build (callable): builds the value on a miss, a None result is not cached.
+        parts: values the payload depends on besides the namespaces (filters, page, ids).
+        namespaces (tuple): tiered cache namespaces of the data.
+        refresh (bool): builds and stores it even if it is cached (warmup).
+
+    Returns:
+        The cached or built value.
+    """
+    key = f'payload:{name}:{catalog_etag(*parts, namespaces=namespaces)}'
+    value = None if refresh else tiered_cache.get(key)
+    if value is None:
+        value = build()
+        if value is not None:
+            tiered_cache.set(key, value, PAYLOAD_CACHE_TIMEOUT)
+    return value
+
+
+def _card_rows(products):
+    """ Values of the product cards (ProductListSerializer) of a products queryset. """
+    return products.values(*filters.VALUES_CARDS_LIST).annotate(
+        category_id=F("category__id"),
+        subcategory_id=F("subcategory__id"),
+        brand_id=F("brand__id"),
+    )
+
+
+def get_brands(refresh=False) -> list:
+    """ Brands of the filters of home and product_list. """
+    return cached_payload(
+        'brands', lambda: list(filters.get_serializer_brands(values=BRANDS_VALUES)),
+        namespaces=(CATALOG_CACHE_NAMESPACE,), refresh=refresh,
+    )
+
+
+def get_home_products(refresh=False) -> list:
+    """ Card rows of the most popular products with stock, for the home page. """
+    def build():
+        products = Product.objects.filter(category__is_default=False, available=True, stock__gt=0)
+        return list(_card_rows(products).order_by(*filters.SORT_OPTIONS['popular'])[:HOME_PRODUCTS_LIMIT])
+
+    namespaces = (PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE, POPULARITY_CACHE_NAMESPACE)
+    return cached_payload('home_products', build, namespaces=namespaces, refresh=refresh)
+
+
+def get_listing_page(filter_args, page_num=None, refresh=False) -> tuple:
+    """
+    One page of product_list.
+
+    Args:
+        filter_args (dict): arguments of filters.get_products_filters.
+        page_num (str|int, optional): page requested, as filters.get_paginator.
+        refresh (bool): see cached_payload.
+
+    Returns:
+        tuple: (card rows, pagination dict).
+    """
+    def build():
+        products = _card_rows(filters.get_products_filters(filter_args))
+        products_page, pagination = filters.get_paginator(
+            products=products, page_num=page_num, quantity=LISTING_PAGE_SIZE
+        )
+        return list(products_page), pagination
+
+    page = str(page_num or 1)
+    if filter_args.get('query') or not page.isdigit() or int(page) > LISTING_CACHED_PAGES:
+        return build()
+
+    # los sort desconocidos ordenan por precio, misma clave
+    sort = filter_args.get('sort') if filter_args.get('sort') in filters.SORT_OPTIONS else 'price'
+    namespaces = (PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE)
+    if sort == 'popular':
+        namespaces += (POPULARITY_CACHE_NAMESPACE,)
+    parts = (
+        filter_args.get('category'), filter_args.get('subcategory'), filter_args.get('brand'),
+        filter_args.get('stock'), sort, int(page),
+    )
+    return cached_payload('listing', build, *parts, namespaces=namespaces, refresh=refresh)
+
+
+def get_product_detail(product_id, slug, refresh=False):
+    """
+    Returns:
+        tuple: (product with its category, subcategory and brand, image urls),
+        None if there is no product with that id and slug.
+    """
+    def build():
+        product = (
+            Product.objects
+            .select_related('category', 'subcategory', 'brand')
+            .only(*filters.PRODUCT_FIELDS_DETAIL_VIEW)
+            .filter(id=product_id, slug=slug)
+            .first()
+        )
+        return (product, product.get_all_images_url()) if product else None
+
+    namespaces = (PRODUCTS_CACHE_NAMESPACE, CATALOG_CACHE_NAMESPACE)
+    return cached_payload('product_detail', build, int(product_id), slug, namespaces=namespaces, refresh=refresh)
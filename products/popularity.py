@@ -0,0 +1,163 @@
+
+
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+# Counters that can be incremented and the weight they add to ProductStats.score
+POPULARITY_WEIGHTS = {
+    'views': 1,
+    'cart_adds': 3,
+    'favorites': 5,
+}
+
+logger = logging.getLogger(__name__)
+
+# The flusher thread of each process flushes the buffer every FLUSH_INTERVAL seconds, or before
+# if FLUSH_THRESHOLD increments are buffered. Also flushed at exit (atexit, gunicorn worker_exit).
+FLUSH_INTERVAL = getattr(settings, 'POPULARITY_FLUSH_INTERVAL', 60)
+FLUSH_THRESHOLD = getattr(settings, 'POPULARITY_FLUSH_THRESHOLD', 500)
+# en los tests se llama a flush() a mano, un thread con otra conexion no ve la transaccion del test
+FLUSH_IN_BACKGROUND = getattr(settings, 'POPULARITY_FLUSH_IN_BACKGROUND', not settings.TESTING)
+
+# In-process buffer: {product_id: {'views': 3, 'favorites': 1, ...}}
+_buffer = defaultdict(lambda: defaultdict(int))
+_pending = 0
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_flusher_pid = None    # pid del proceso que arranco el thread, despues de un fork hay que arrancarlo de nuevo
+
+
+def incr(product_id, counter='views', amount=1):
+    """
+    Buffers an increment for a product counter, no query is executed here.
+
+    Args:
+        product_id (int): ID of the product.
+        counter (str): One of POPULARITY_WEIGHTS keys ('views', 'cart_adds', 'favorites').
+        amount (int, optional): Value to add, negative values are allowed (e.g. unliked). Defaults to 1.
+
+    Notes:
+        - Only appends to the buffer, the flush runs in the flusher thread (start_flusher),
+          no request pays the batched UPDATE.
+    """
+    global _pending
+    if counter not in POPULARITY_WEIGHTS:
+        raise ValueError(f"Contador '{counter}' no reconocido.")
+
+    with _lock:
+        _buffer[int(product_id)][counter] += amount
+        _pending += 1
+        full = _pending >= FLUSH_THRESHOLD
+
+    if FLUSH_IN_BACKGROUND and _flusher_pid != os.getpid():
+        start_flusher()
+    if full:
+        _wakeup.set()
+
+
+def _flush_loop() -> None:
+    while True:
+        _wakeup.wait(FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            flush()
+        except Exception:
+            # los incrementos de ese flush se pierden, son contadores de popularidad
+            logger.exception("flush de popularidad fallo")
+        finally:
+            close_old_connections()
+
+
+def start_flusher() -> None:
+    """ Starts the flusher thread of this process (once per pid) and the flush at exit. """
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        if _flusher_pid is None:
+            atexit.register(flush)
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name='popularity-flusher', daemon=True).start()
+
+
+def _drain() -> dict:
+    """ Swaps the buffer for an empty one and returns the pending increments. """
+    global _buffer, _pending
+    with _lock:
+        pending, _buffer = _buffer, defaultdict(lambda: defaultdict(int))
+        _pending = 0
+    return pending
+
+
+def flush() -> int:
+    """
+    Persists the buffered increments into ProductStats.
+
+    Uses a fixed number of statements regardless of how many products changed:
+        - 1 INSERT ... ON CONFLICT DO NOTHING to create the missing rows.
+        - 1 UPDATE with CASE/WHEN + F() expressions for every counter and the score.
+
+    Returns:
+        int: Number of products updated.
+    """
+    from products.models import Product, ProductStats
+
+    pending = _drain()
+    if not pending:
+        return 0
+
+    # ignore products deleted meanwhile
+    product_ids = set(Product.objects.filter(id__in=pending.keys()).values_list('id', flat=True))
+    if not product_ids:
+        return 0
+
+    def _delta_case(counter):
+        whens = [
+            When(product_id=product_id, then=Value(pending[product_id][counter]))
+            for product_id in product_ids if pending[product_id].get(counter)
+        ]
+        return Case(*whens, default=Value(0), output_field=IntegerField()) if whens else None
+
+    def _score_case():
+        whens = []
+        for product_id in product_ids:
+            delta = sum(POPULARITY_WEIGHTS[c] * v for c, v in pending[product_id].items())
+            if delta:
+                whens.append(When(product_id=product_id, then=Value(delta)))
+        return Case(*whens, default=Value(0), output_field=IntegerField()) if whens else None
+
+    updates = {'updated_at': timezone.now()}
+    for counter in POPULARITY_WEIGHTS:
+        case = _delta_case(counter)
+        if case is not None:
+            updates[counter] = F(counter) + case
+
+    score = _score_case()
+    if score is not None:
+        updates['score'] = F('score') + score
+
+    with transaction.atomic():
+        ProductStats.objects.bulk_create(
+            [ProductStats(product_id=product_id) for product_id in product_ids],
+            ignore_conflicts=True
+        )
+        updated = ProductStats.objects.filter(product_id__in=product_ids).update(**updates)
+
+    # cambia el orden de ?sort=popular, nuevo ETag para esos listados
+    from ecommerce.cache import tiered_cache
+    from products.conditional import POPULARITY_CACHE_NAMESPACE
+    tiered_cache.bump(POPULARITY_CACHE_NAMESPACE)
+    return updated
+
+
+def reset_buffer() -> None:
+    """ Drops the pending increments without persisting them (useful for tests). """
+    _drain()
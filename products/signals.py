@@ -1,9 +1,13 @@
 
 
-from django.db.models.signals import pre_save, pre_delete
+from django.db.models.signals import pre_save, pre_delete, post_save, post_delete
 from django.dispatch import receiver
 
-from products.models import PCategory
+from ecommerce.cache import tiered_cache
+from products.cards import invalidate_product_cards
+from products.conditional import bump_products
+from products.filters import CATALOG_CACHE_NAMESPACE
+from products.models import PBrand, PCategory, Product, ProductImage, PSubcategory
 
 
 @receiver(pre_save, sender=PCategory)  # This decorator registers the function as a pre_save signal for the PCategory model
@@ -35,6 +39,31 @@ def protect_default_deletion(sender, instance, **kwargs):
     if instance.is_default:
         # If it's the default category, raise an error to prevent deletion
         raise ValueError("No se puede eliminar la categoría default")
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_card(sender, instance, **kwargs):
+    # los carritos en sesion leen nombre/precio/stock de la tarjeta cacheada
+    invalidate_product_cards([instance.id])
+    bump_products()    # nuevo ETag de las paginas y APIs del catalogo
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_images_changed(sender, instance, **kwargs):
+    bump_products()
+
+
+@receiver(post_save, sender=PCategory)
+@receiver(post_delete, sender=PCategory)
+@receiver(post_save, sender=PSubcategory)
+@receiver(post_delete, sender=PSubcategory)
+@receiver(post_save, sender=PBrand)
+@receiver(post_delete, sender=PBrand)
+def taxonomy_changed(sender, instance, **kwargs):
+    # tambien cubre los cambios desde el admin, no solo BaseProductAPIView
+    tiered_cache.bump(CATALOG_CACHE_NAMESPACE)
     
 
 
@@ -1,3 +1,253 @@
-from django.test import TestCase
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 
 # Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.urls import reverse
+
+from benchmarks.external import PNG
+from benchmarks.fakes import start_fake_server
+from cart.models import CartItem
+from ecommerce.http import close_async_session
+from ecommerce.db_router import STICKY_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware, replica_reads
+from ecommerce.testing import QueryBudgetMixin
+from products import filters, popularity, views_async
+from products.models import PCategory, Product, ProductImage, ProductStats
+
+
+class PopularityCountersTest(TestCase):
+    def setUp(self):
+        popularity.reset_buffer()
+        self.product1 = Product.objects.create(name="Product 1", stock=10, price=100, available=True)
+        self.product2 = Product.objects.create(name="Product 2", stock=10, price=200, available=True)
+
+    def test_increments_are_buffered_until_flush(self):
+        with self.assertNumQueries(0):
+            popularity.incr(self.product1.id, 'views')
+            popularity.incr(self.product1.id, 'views')
+            popularity.incr(self.product2.id, 'cart_adds')
+
+        self.assertFalse(ProductStats.objects.exists())
+
+        # productos existentes + INSERT de filas faltantes + UPDATE en batch
+        self.assertEqual(popularity.flush(), 2)
+
+        stats1 = ProductStats.objects.get(product=self.product1)
+        stats2 = ProductStats.objects.get(product=self.product2)
+        self.assertEqual((stats1.views, stats1.score), (2, 2))
+        self.assertEqual((stats2.cart_adds, stats2.score), (1, 3))
+
+        # un segundo flush suma sobre los valores existentes
+        popularity.incr(self.product1.id, 'favorites')
+        popularity.incr(self.product1.id, 'favorites', amount=-1)
+        popularity.incr(self.product1.id, 'views')
+        popularity.flush()
+        stats1.refresh_from_db()
+        self.assertEqual((stats1.views, stats1.favorites, stats1.score), (3, 0, 3))
+
+    def test_incr_never_flushes_on_the_request(self):
+        old_threshold, popularity.FLUSH_THRESHOLD = popularity.FLUSH_THRESHOLD, 2
+        popularity._wakeup.clear()
+        try:
+            # al llegar al umbral solo despierta al thread que hace el flush
+            with self.assertNumQueries(0):
+                for _ in range(3):
+                    popularity.incr(self.product1.id, 'views')
+        finally:
+            popularity.FLUSH_THRESHOLD = old_threshold
+        self.assertTrue(popularity._wakeup.is_set())
+        popularity._wakeup.clear()
+
+        self.assertFalse(ProductStats.objects.exists())
+        self.assertEqual(popularity.flush(), 1)
+
+    def test_sort_by_popular(self):
+        popularity.incr(self.product2.id, 'favorites')
+        popularity.flush()
+
+        products = filters.get_products_filters({'sort': 'popular'})
+        self.assertEqual(list(products.values_list('id', flat=True)), [self.product2.id, self.product1.id])
+
+        products = filters.get_products_filters({'sort': 'price'})
+        self.assertEqual(list(products.values_list('id', flat=True)), [self.product1.id, self.product2.id])
+
+
+class CatalogBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        popularity.reset_buffer()
+        category = PCategory.objects.create(name="Perifericos", slug="perifericos")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", stock=10, price=100 + i, available=True, category=category)
+            for i in range(10)
+        ]
+        for product in self.products:
+            ProductImage.objects.create(product=product, image_url="https://i.ibb.co/x.jpg", main_image=True)
+
+    def test_product_list_query_budget(self):
+        self.client.get(reverse('product_list'))
+        # count del paginador + productos + marcas quedan en el cache compartido (products/payloads.py),
+        # solo el store (no hay Store en el test y un store None no se cachea)
+        self.assertViewBudget('get', reverse('product_list'), max_queries=1, max_cache_misses=0)
+
+    def test_product_detail_query_budget(self):
+        product = self.products[0]
+        url = reverse('product_detail', args=[product.id, product.slug])
+        self.assertViewBudget('get', url, max_queries=2)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def read_db(self, request):
+        seen = {}
+
+        def view(request):
+            seen['product'] = self.router.db_for_read(Product)
+            seen['cart'] = self.router.db_for_read(CartItem)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_catalog_reads_go_to_replica_only_inside_read_requests(self):
+        self.assertEqual(self.router.db_for_read(Product), 'default')    # commands / workers
+
+        seen, response = self.read_db(RequestFactory().get('/'))
+        self.assertEqual(seen, {'product': 'replica_0', 'cart': 'default'})
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+        with replica_reads():
+            self.router.db_for_write(CartItem)
+            # read-your-writes en el mismo request
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_write_request_sticks_client_to_primary(self):
+        seen, response = self.read_db(RequestFactory().post('/'))
+        self.assertEqual(seen['product'], 'default')
+
+        request = RequestFactory().get('/')
+        request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        seen, _ = self.read_db(request)
+        self.assertEqual(seen['product'], 'default')
+
+
+class AsyncImageUploadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server, base_url = start_fake_server()
+        cls.imgbb_settings = override_settings(IMGBB_API_URL=f'{base_url}/upload')
+        cls.imgbb_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.imgbb_settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(email="admin@test.com", password="x", role="admin")
+        self.product = Product.objects.create(name="Mouse", stock=10, price=100, available=True)
+
+    def post_images(self, user, count):
+        images = [SimpleUploadedFile(f'img-{i}.png', PNG, content_type='image/png') for i in range(count)]
+        request = RequestFactory().post('/', {'images': images})
+
+        async def auser():
+            return user
+        request.auser = auser
+
+        async def call():
+            try:
+                return await views_async.product_images(request, self.product.id)
+            finally:
+                await close_async_session()
+        return async_to_sync(call)()
+
+    def test_images_are_uploaded_and_first_becomes_main(self):
+        response = self.post_images(self.admin, 3)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['total_uploaded'], 3)
+
+        images = ProductImage.objects.filter(product=self.product)
+        self.assertEqual(images.count(), 3)
+        main = images.get(main_image=True)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.main_image, main.image_url)
+
+        # con principal existente las nuevas no la reemplazan
+        self.post_images(self.admin, 1)
+        self.assertEqual(ProductImage.objects.filter(product=self.product, main_image=True).count(), 1)
+
+    def test_non_admin_is_rejected(self):
+        buyer = get_user_model().objects.create_user(email="buyer@test.com", password="x")
+        uploads = self.server.RequestHandlerClass.requests
+        response = self.post_images(buyer, 1)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.server.RequestHandlerClass.requests, uploads)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = PCategory.objects.create(name="Perifericos", slug="perifericos")
+        self.product = Product.objects.create(
+            name="Mouse", slug="mouse", stock=10, price=100, available=True, category=self.category
+        )
+
+    def revalidate(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_list_returns_304_without_queries(self):
+        url = reverse('product_list')
+        response, _ = self.revalidate(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.product.price = 90
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_detail_and_images_api_change_with_catalog_data(self):
+        detail_url = reverse('product_detail', args=[self.product.id, self.product.slug])
+        detail, not_modified = self.revalidate(detail_url)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.category.name = "Accesorios"
+        self.category.save()
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail['ETag']).status_code, 200)
+
+        images_url = reverse('prod-images', args=[self.product.id])
+        images, not_modified = self.revalidate(images_url)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn('public', images['Cache-Control'])
+
+        ProductImage.objects.create(product=self.product, image_url="https://i.ibb.co/y.jpg")
+        self.assertEqual(self.client.get(images_url, HTTP_IF_NONE_MATCH=images['ETag']).status_code, 200)
+
+    def test_detail_view_is_counted_on_304(self):
+        popularity.reset_buffer()
+        detail_url = reverse('product_detail', args=[self.product.id, self.product.slug])
+        detail, not_modified = self.revalidate(detail_url)
+        self.assertEqual(not_modified.status_code, 304)
+
+        # el 200 y el 304 cuentan una vista cada uno
+        self.assertEqual(popularity._buffer[self.product.id]['views'], 2)
+        popularity.flush()
+        self.assertEqual(ProductStats.objects.get(product=self.product).views, 2)
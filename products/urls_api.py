@@ -1,8 +1,16 @@
 
 
+from django.conf import settings
 from django.urls import path
+from products import views_async
 from products.views_api import *
 
+# en el deploy ASGI las subidas a ImgBB usan las vistas async (GET/DELETE siguen en ProductImagesView)
+if settings.ASYNC_VIEWS:
+    product_images_view, upload_image_view = views_async.product_images, views_async.upload_image
+else:
+    product_images_view, upload_image_view = ProductImagesView.as_view(), GenericUploadImageAPIView.as_view()
+
 
 # ==============================================================================
 #                        DRF API ENDPOINTS
@@ -12,17 +20,17 @@ from products.views_api import *
 urlpatterns = [
     
     # endpoints images 
-    path('products-images/<int:product_id>/', ProductImagesView.as_view(), name='prod-images'),
+    path('products-images/<int:product_id>/', product_images_view, name='prod-images'),
 
     # url para actualizar productos
     path('api/product/', ProductAPIView.as_view(), name='product-create-api'), # POST for create
     path('api/product/<int:product_id>/', ProductAPIView.as_view(), name='product-update-api'), # GET, PUT, PATCH, DELETE
     
     # url para actualizar imgenes
-    path('api/product/<int:product_id>/images/', ProductImagesView.as_view(), name='product-images-api'),
+    path('api/product/<int:product_id>/images/', product_images_view, name='product-images-api'),
     
     # generic endpoint to upload images for any model except Product
-    path('api/upload/image', GenericUploadImageAPIView.as_view(), name='upload-images-api'),
+    path('api/upload/image', upload_image_view, name='upload-images-api'),
     
     # urls endpoints para manejar category, subcategory, brand
     path('api/category/', PCategoryAPIView.as_view(), name='pcategory-create-api'),  # POST for create
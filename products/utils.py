@@ -23,11 +23,11 @@ def valid_id_or_None(id_value, allow_zero=False):
 
 
 import json
-import requests
 from django.conf import settings
-from requests.exceptions import RequestException
 def get_url_from_imgbb(image_file):
     """Sube imagen a ImgBB con manejo robusto de errores"""
+    import requests    # heavy import, only when uploading (products.utils is loaded by django.setup())
+
     api_key = settings.IMGBB_KEY
     
     # 1. Validar y preparar la imagen (retorna objeto archivo y content_type)
@@ -39,10 +39,10 @@ def get_url_from_imgbb(image_file):
     try:
         # 2. Subida a ImgBB y manejo de errores
         response = requests.post(
-            "https://api.imgbb.com/1/upload",    # endpoint de guardado siempre es el mismo
+            settings.IMGBB_API_URL,    # endpoint de guardado siempre es el mismo
             params={"key": api_key},    # apikey sacada de imgBB
             files={"image": (unique_name, validated_file)},    # pasameos el nuevo nombre y el archivo
-            timeout=10  # Timeout en segundos para reintentar
+            timeout=settings.IMGBB_TIMEOUT  # Timeout en segundos para reintentar
         )
         response.raise_for_status()  # Lanza error para códigos HTTP 4XX/5XX
 
@@ -57,16 +57,56 @@ def get_url_from_imgbb(image_file):
         return data["data"]["url"]
 
     # 4. Respuesta distintos errores
-    except RequestException as e:
+    except requests.RequestException as e:
         raise ValueError("Error de conexión con el servicio de imágenes")
     except json.JSONDecodeError:
         raise ValueError("Respuesta inválida del servicio")
     except Exception as e:
         raise ValueError("Error al procesar la imagen")
-    
+
+
+import asyncio
+from asgiref.sync import sync_to_async
+from ecommerce.http import get_async_session
+async def aget_url_from_imgbb(image_file):
+    """
+    Async version of get_url_from_imgbb for the async views, the upload does not block
+    the worker so many uploads (of the same or different requests) overlap.
+    Same errors: ValueError with the message for the user.
+    """
+    import aiohttp    # heavy import, only when uploading
+
+    def read_validated():
+        validated_file, content_type = validate_and_prepare_image(image_file)
+        return validated_file.read(), content_type
+
+    # Pillow y la lectura del archivo pueden tardar con archivos grandes, se hacen fuera del event loop
+    content, content_type = await sync_to_async(read_validated, thread_sensitive=False)()
+    unique_name = generate_image_name(content_type)
+
+    form = aiohttp.FormData()
+    form.add_field("image", content, filename=unique_name, content_type=content_type)
+    try:
+        async with get_async_session().post(
+            settings.IMGBB_API_URL,
+            params={"key": settings.IMGBB_KEY},
+            data=form,
+            timeout=aiohttp.ClientTimeout(total=settings.IMGBB_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        raise ValueError("Error de conexión con el servicio de imágenes")
+    except json.JSONDecodeError:
+        raise ValueError("Respuesta inválida del servicio")
+
+    if not data.get("success"):
+        error_msg = data.get("error", {}).get("message", "Error desconocido en ImgBB")
+        raise ValueError(f"Error en ImgBB: {error_msg}")
+    return data["data"]["url"]
+
 
 import os
-from PIL import Image
 from io import BytesIO
 def validate_and_prepare_image(file):
     """Valida la imagen y la prepara para subida. Retorna (file_obj, content_type)."""
@@ -91,6 +131,7 @@ def validate_and_prepare_image(file):
 
     # Si el tipo MIME es sospechoso (ej: application/octet-stream), validar con Pillow
     if not content_type.startswith('image/'):
+        from PIL import Image    # heavy import, only for files without an image content type
         try:
             # Abrir y verificar integridad de la imagen
             img = Image.open(file)
@@ -121,7 +162,7 @@ def generate_image_name(content_type):
     return f"{uuid.uuid4().hex[:13]}.{ext}"
 
 
-from rest_framework import serializers
+from rest_framework.exceptions import ValidationError    # rest_framework.serializers tarda ~150 ms en importar
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 def parse_number(value, field_name, allow_zero=True):
     """
@@ -148,18 +189,18 @@ def parse_number(value, field_name, allow_zero=True):
         try:
             value = Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         except (InvalidOperation, ValueError):
-            raise serializers.ValidationError(f"El {field_name} debe ser un número válido con hasta 2 decimales.")
+            raise ValidationError(f"El {field_name} debe ser un número válido con hasta 2 decimales.")
     elif field_name.lower() in ('stock', 'descuento'):
         try:
             value = int(value)
         except (TypeError, ValueError):
-            raise serializers.ValidationError(f"El {field_name} debe ser un número entero válido.")
+            raise ValidationError(f"El {field_name} debe ser un número entero válido.")
     else:
-        raise serializers.ValidationError(f"Campo '{field_name}' no reconocido para validación.")
+        raise ValidationError(f"Campo '{field_name}' no reconocido para validación.")
 
     if (allow_zero and value < 0) or (not allow_zero and value <= 0):
         condicion = "mayor o igual a 0" if allow_zero else "mayor que 0"
-        raise serializers.ValidationError(f"El {field_name} debe ser {condicion}.")
+        raise ValidationError(f"El {field_name} debe ser {condicion}.")
 
     return value
 
@@ -212,7 +253,7 @@ def get_valid_bool(value, field='some field'):
         bool: The validated boolean value (True or False).
 
     Raises:
-        serializers.ValidationError: If the value is not a valid boolean or
+        ValidationError: If the value is not a valid boolean or
         not a recognizable string representation of a boolean.
     """
     if isinstance(value, str):
@@ -222,11 +263,11 @@ def get_valid_bool(value, field='some field'):
         elif value in ("false", "0", "no"):
             return False
         else:
-            raise serializers.ValidationError(f"El valor de {field} debe ser 'true' o 'false'.")
+            raise ValidationError(f"El valor de {field} debe ser 'true' o 'false'.")
     
     elif isinstance(value, bool):
         return value
     
     else:
-        raise serializers.ValidationError(f"El campo {field} debe ser booleano.")
+        raise ValidationError(f"El campo {field} debe ser booleano.")
 
@@ -6,13 +6,15 @@ from django.db.models import F
 
 from products.models import Product, PCategory, PSubcategory, PBrand
 from products.serializers import ProductListSerializer
-from products import filters, utils
+from products import filters, payloads, utils, popularity
+from products.conditional import bump_products, conditional_get, page_etag
 
 from favorites.utils import get_favs_products
 from users.permissions import admin_or_superuser_required
 import json
 
 
+@conditional_get(page_etag)
 def product_list(request, cat_slug=None, subcat_slug=None, brand_slug=None):
     """Vista para listar productos con filtros opcionales."""
     
@@ -41,30 +43,17 @@ def product_list(request, cat_slug=None, subcat_slug=None, brand_slug=None):
         'brand': brand.get('id') if brand else None,
         'stock': True,
         'query': top_query,
+        'sort': request.GET.get('sort'),
     }
-    products = filters.get_products_filters(filter_args)
-    products = (
-        products.values(*filters.VALUES_CARDS_LIST)
-        .order_by('price', 'id').annotate(
-            category_id=F("category__id"),
-            subcategory_id=F("subcategory__id"),
-            brand_id=F("brand__id"),
-        )
-    )
-    # products = products.values(*filters.VALUES_CARDS_LIST).order_by('price', 'id')
-    
-    # Paginación
+    # el orden lo aplica get_products_filters segun 'sort' (por defecto precio)
+    # Paginación: las primeras paginas de cada listado salen del cache compartido (products/payloads.py)
     page_num = request.GET.get('page')
-    products_page, pagination = filters.get_paginator(
-        products=products, 
-        page_num=page_num, 
-        quantity=100
-    )
+    products_page, pagination = payloads.get_listing_page(filter_args, page_num)
     
     # get unique brands on page for some utils select forms 
     # maybe in the future apply this for performance
     # brand_ids_in_page = {p['brand_id'] for p in products_page}
-    brands = filters.get_serializer_brands(values=('id', 'name', 'slug', 'image_url'))
+    brands = payloads.get_brands()
     
     # get categories from cache 
     categories = filters.get_categories_n_subcategories(from_cache=True)
@@ -91,6 +80,16 @@ def product_list(request, cat_slug=None, subcat_slug=None, brand_slug=None):
 
 
 from django.shortcuts import redirect
+def count_product_view(request, response, product_id, slug):
+    """ Counts the view on the 200 and on the 304 (the view does not run on a revalidation). """
+    value_id = utils.valid_id_or_None(product_id)
+    if value_id:
+        # buffered in memory, flushed in batch to ProductStats (no write on this request),
+        # ids of deleted products are ignored by the flush
+        popularity.incr(value_id, 'views')
+
+
+@conditional_get(page_etag, on_response=count_product_view)
 def product_detail(request, product_id, slug):
     """
     Args:
@@ -101,21 +100,15 @@ def product_detail(request, product_id, slug):
     if not value_id:
         return redirect('Home')
     
-    try:
-        product = (
-            Product.objects
-            .select_related('category', 'subcategory', 'brand')
-            .only(*filters.PRODUCT_FIELDS_DETAIL_VIEW)
-            .get(id=product_id, slug=slug)
-        )
-    except Product.DoesNotExist:
+    detail = payloads.get_product_detail(value_id, slug)
+    if detail is None:
         return redirect('Home')
+    product, images_urls = detail
     
     # We get all the necessary data from the product
     category = product.category
     subcategory = product.subcategory
     brand = product.brand
-    images_urls = product.get_all_images_url()
     context = {
         'product': product,
         'images_urls': images_urls,
@@ -143,6 +136,7 @@ def reset_stocks(request):
         stock=F('stock') + F('stock_reserved'),
         stock_reserved=0  # Opcional: reinicia el stock reservado si es necesario
     )
+    bump_products()    # .update() no dispara las signals
 
     # Mensaje de confirmación para el usuario (si es necesario)
     return render(request, 'home/home.html')
@@ -6,11 +6,13 @@ from rest_framework.response import Response
 
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
-from django.core.cache import cache
+from ecommerce.cache import tiered_cache
 from django.db.models import F
+from django.utils.decorators import method_decorator
 
 # views.py
 from products import filters, utils
+from products.conditional import conditional_get, images_api_etag, products_api_etag
 from products.models import Product, PCategory, PSubcategory, PBrand, ProductImage
 from products.serializers import (
     ProductSerializer, PCategorySerializer, PSubcategorySerializer, PBrandSerializer,
@@ -30,6 +32,7 @@ class ProductAPIView(APIView):
         # 1. Verificar si es role == 'admin' o user.id == 1
         return [IsAdminOrSuperUser()]    # Permissions custom en user.permissions
         
+    @method_decorator(conditional_get(products_api_etag))
     def get(self, request, product_id=None):
         
         if product_id:
@@ -41,7 +44,7 @@ class ProductAPIView(APIView):
             context = filters.get_context_filtered_products(request)
             products = (
                 context['products'].values(*filters.VALUES_CARDS_LIST)
-                .order_by('price', 'id').annotate(
+                .annotate(
                     category_id=F("category__id"),
                     subcategory_id=F("subcategory__id"),
                     brand_id=F("brand__id"),
@@ -218,6 +221,7 @@ class ProductImagesView(APIView):
         }
         return Response(response_data, status=status.HTTP_200_OK)
     
+    @method_decorator(conditional_get(images_api_etag, private=False))
     def get(self, request, product_id):
         # some endpoints need all info from images
         extra_data = request.query_params.get('all') == 'true'
@@ -267,7 +271,7 @@ class BaseProductAPIView(APIView):
     # Estos atributos DEBEN ser definidos en las clases hijas
     serializer_class = None
     model = None
-    cache_key = None  # Clave para el caché (opcional)
+    cache_namespace = None  # Namespace del tiered cache a invalidar (opcional)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -313,29 +317,29 @@ class BaseProductAPIView(APIView):
         return instance, None
         
     def _invalidate_cache(self):
-        if self.cache_key:
-            cache.delete(self.cache_key)
+        if self.cache_namespace:
+            tiered_cache.bump(self.cache_namespace)    # invalida en todos los workers
             
 
 class PCategoryAPIView(BaseProductAPIView):
     permission_classes = [IsAdminOrSuperUser]
     serializer_class = PCategorySerializer
     model = PCategory
-    cache_key = 'categories_dropmenu'
+    cache_namespace = filters.CATALOG_CACHE_NAMESPACE
     
 
 class PSubcategoryAPIView(BaseProductAPIView):
     permission_classes = [IsAdminOrSuperUser]
     serializer_class = PSubcategorySerializer
     model = PSubcategory
-    cache_key = 'categories_dropmenu'
+    cache_namespace = filters.CATALOG_CACHE_NAMESPACE
     
 
 class PBrandAPIView(BaseProductAPIView):
     permission_classes = [IsAdminOrSuperUser]
     serializer_class = PBrandSerializer
     model = PBrand
-    # cache_key = 'brands_cache'
+    # cache_namespace = 'brands'
 
 
 class GenericUploadImageAPIView(APIView):
@@ -0,0 +1,114 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse
+from rest_framework import status
+
+from products import utils
+from products.conditional import bump_products
+from products.models import Product, ProductImage
+from products.views_api import ProductImagesView
+from users.permissions import IsAdminOrSuperUser
+
+# ======================================================================
+#   Async versions of the ImgBB uploads (settings.ASYNC_VIEWS, ASGI deploy)
+#   Every image of the request is uploaded at the same time and the worker keeps serving
+#   other requests meanwhile. Same urls, payloads and status codes as the DRF views.
+# ======================================================================
+_product_images_view = sync_to_async(ProductImagesView.as_view())
+
+
+async def _admin_or_error(request):
+    """ Same rule as users.permissions.IsAdminOrSuperUser. """
+    user = await request.auser()
+    if user.is_authenticated and (user.id == 1 or user.role == 'admin'):
+        return None
+    return JsonResponse({'detail': IsAdminOrSuperUser.message}, status=status.HTTP_403_FORBIDDEN)
+
+
+async def _upload_all(images) -> tuple:
+    """
+    Uploads the images concurrently.
+
+    Returns:
+        tuple: (urls in the order of the images, errors per file name)
+    """
+    results = await asyncio.gather(*(utils.aget_url_from_imgbb(img) for img in images), return_exceptions=True)
+    urls, errors = [], []
+    for img, result in zip(images, results):
+        if isinstance(result, ValueError):
+            errors.append(f"{img.name}: {str(result)}")
+        elif isinstance(result, Exception):
+            errors.append(f"{img.name}: Error inesperado - {str(result)}")
+        else:
+            urls.append(result)
+    return urls, errors
+
+
+def _save_product_images(product, urls) -> None:
+    # la primera imagen subida queda como principal si el producto no tenia una
+    with transaction.atomic():
+        has_main = ProductImage.objects.filter(product=product, main_image=True).exists()
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image_url=url, main_image=not has_main and i == 0)
+            for i, url in enumerate(urls)
+        ])
+        if not has_main:
+            product.update_main_image(url=urls[0])
+        transaction.on_commit(bump_products)    # bulk_create no dispara las signals
+
+
+async def product_images(request, product_id):
+    """ POST uploads the images in parallel, GET/DELETE are served by ProductImagesView. """
+    if request.method != 'POST':
+        return await _product_images_view(request, product_id=product_id)
+
+    error = await _admin_or_error(request)
+    if error:
+        return error
+
+    product_id = utils.valid_id_or_None(product_id)
+    if not product_id:
+        return JsonResponse({"detail": "Se requiere el ID del producto"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        product = await Product.objects.only('id', 'main_image').aget(id=product_id)
+    except Product.DoesNotExist:
+        return JsonResponse({"success": False, "detail": "No existe el producto."}, status=status.HTTP_404_NOT_FOUND)
+
+    uploaded_urls, errors = await _upload_all(request.FILES.getlist('images'))
+    if uploaded_urls:
+        await sync_to_async(_save_product_images)(product, uploaded_urls)
+
+    response_data = {
+        "success": True if uploaded_urls else False,
+        "uploaded_images": uploaded_urls,
+        "errors": errors if errors else None,
+        "total_uploaded": len(uploaded_urls)
+    }
+    return JsonResponse(response_data, status=status.HTTP_201_CREATED if uploaded_urls else status.HTTP_207_MULTI_STATUS)
+
+
+async def upload_image(request):
+    """ Async GenericUploadImageAPIView: uploads the first image and returns its url. """
+    if request.method != 'POST':
+        return JsonResponse({'detail': f'Método "{request.method}" no permitido.'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    error = await _admin_or_error(request)
+    if error:
+        return error
+
+    images = request.FILES.getlist('images')
+    if not images:
+        return JsonResponse({"detail": "No se enviaron archivos."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        url = await utils.aget_url_from_imgbb(images[0])
+        return JsonResponse({"success": True, "image_url": url}, status=status.HTTP_201_CREATED)
+    except ValueError as e:
+        return JsonResponse({"success": False, "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception:
+        return JsonResponse(
+            {"success": False, "detail": "Error interno al procesar la imagen."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -158,6 +158,15 @@ function usersTabEvents(container, tabId) {
         }
     });
 
+    /**
+     * Load the next page of the users search keeping the current filters.
+     */
+    container.addEventListener('click', async (e) => {
+        const btn = e.target.closest('.btn-users-next');
+        if (!btn) return;
+        await getTabContentAJAX({ container, tabId, params: btn.dataset.params });
+    });
+
     /**
      * Automatically submit the main filter form when the role select changes.
      */
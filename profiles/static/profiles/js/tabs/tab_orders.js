@@ -134,14 +134,14 @@ function renderOrderTable(container, orders) {
  * 3. Assigning the final HTML string to `container.innerHTML` in one go, avoiding manual concatenation.
  *
  * @param {HTMLElement} container - The <select> element where options will be rendered.
- * @param {Array<Object>} ordersStatus - List of status objects, each with `id` and `name` properties.
+ * @param {Array<Object>} ordersStatus - List of status objects, each with `id`, `name` and optional `count` properties.
  * @param {number|string} statusId - The ID of the currently selected status.
  */
 function renderOrderSelect(container, ordersStatus, statusId) {
     // Generate all option tags in one line using map + join
     const newOptions = ordersStatus.map(oStatus => /*html*/`
         <option value="${oStatus.id}" ${oStatus.id == statusId ? 'selected' : ''}>
-            ${oStatus.name}
+            ${oStatus.name}${oStatus.count !== undefined ? ` (${oStatus.count})` : ''}
         </option>
     `).join('');
 
@@ -150,6 +150,29 @@ function renderOrderSelect(container, ordersStatus, statusId) {
 }
 
 
+/**
+ * Renders the "next page" button of the keyset pagination below the orders table.
+ *
+ * @param {HTMLElement} container - The DOM element of the orders table.
+ * @param {Object} pagination - from data.pagination, with `next_cursor` and `has_next`.
+ * @param {number|string} statusId - The ID of the currently selected status (admin filter).
+ */
+function renderOrderPagination(container, pagination, statusId) {
+    if (!pagination || !pagination.has_next) return;
+
+    const params = new URLSearchParams({ cursor: pagination.next_cursor });
+    if (statusId) params.set('status', statusId);
+
+    container.insertAdjacentHTML('beforeend', /*html*/`
+        <div class="grid-col-all justify-self-center mt-2">
+            <button class="btn btn-main px-2 py-1 bolder font-md btn-orders-next" data-params="${params.toString()}">
+                Ver más pedidos
+            </button>
+        </div>
+    `.trim());
+}
+
+
 /**
  * Creates and renders the orders table inside a given container element.
  * 
@@ -163,6 +186,7 @@ function renderOrderSelect(container, ordersStatus, statusId) {
  *     - is_admin: Boolean indicating if the current user is an admin (to show filters).
  *     - status_orders: Array of status objects used to populate the status filter select.
  *     - status_id: The currently selected status id (optional).
+ *     - pagination: Keyset pagination data with the cursor of the next page (optional).
  */
 function createTabOrders(container, data) {
     // container.innerHTML = ''; // Clear the container before rendering
@@ -171,7 +195,10 @@ function createTabOrders(container, data) {
         const { htmlToAppend, containerTable, containerSelect } = renderOrderTabInit(data.is_admin || false);
         
         // Render the orders inside the table container
-        if (containerTable) renderOrderTable(containerTable, data.orders || []);
+        if (containerTable) {
+            renderOrderTable(containerTable, data.orders || []);
+            renderOrderPagination(containerTable, data.pagination, data.status_id);
+        }
         if (containerSelect) {
             // if is null get 2, default
             renderOrderSelect(containerSelect, data.status_orders || [], data.status_id || 2); 
@@ -179,13 +206,23 @@ function createTabOrders(container, data) {
 
         container.appendChild(htmlToAppend); // Append the fragment to the container
         container._hasInit = true;
+
+        // next page of orders, getTabContentAJAX is defined on both profile pages
+        container.addEventListener('click', async (e) => {
+            const btn = e.target.closest('.btn-orders-next');
+            if (!btn) return;
+            await getTabContentAJAX({ container, tabId: 'orders-tab', params: btn.dataset.params });
+        });
         return;
     }
 
     // after the first render only refill this containers
     const containerTable = container.querySelector('.cont-table-orders');
     const containerSelect = container.querySelector('.select-orders');
-    if (containerTable) renderOrderTable(containerTable, data.orders || []);
+    if (containerTable) {
+        renderOrderTable(containerTable, data.orders || []);
+        renderOrderPagination(containerTable, data.pagination, data.status_id);
+    }
     if (containerSelect) {
         // if is null get 2, default
         renderOrderSelect(containerSelect, data.status_orders || [], data.status_id || 2); 
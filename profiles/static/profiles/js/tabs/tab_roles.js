@@ -26,6 +26,8 @@ function renderTabRolesInit() {
         </div>
 
         <div class="cont-forms-users"> </div>
+
+        <div class="d-flex justify-center align-center gap-2 mt-2 cont-users-pagination"> </div>
     `.trim();
 
     // Create a temporary container element and insert the HTML string
@@ -143,6 +145,7 @@ function createTabRoles(container, data) {
 
         // Append the generated fragment to the container
         container.appendChild(htmlToAppend);
+        renderUsersPagination(container.querySelector('.cont-users-pagination'), data);
         container._hasInit = true;
         return;
     }
@@ -152,4 +155,34 @@ function createTabRoles(container, data) {
     const contFormsRole = container.querySelector('.cont-forms-users');
     renderRolesSelect(selectUsers, data.choices, data.choice);
     renderRolesUsersTable(contFormsRole, data.users, data.choices);
+    renderUsersPagination(container.querySelector('.cont-users-pagination'), data);
+}
+
+
+/**
+ * Renders the results count and the "next page" button of the users search.
+ *
+ * @param {HTMLElement} container - The DOM element where the pagination will be rendered.
+ * @param {Object} data - The tab data with `pagination`, `search` and `choice` (role).
+ */
+function renderUsersPagination(container, data) {
+    const pagination = data.pagination;
+    if (!container || !pagination) return;
+
+    const total = `${pagination.count}${pagination.count_is_estimate ? '+' : ''}`;
+    let html = /*html*/`<span class="bolder font-md">${total} usuarios</span>`;
+
+    if (pagination.has_next) {
+        const params = new URLSearchParams({
+            search: data.search || '',
+            role: data.choice || '',
+            cursor: pagination.next_cursor
+        });
+        html += /*html*/`
+            <button class="btn btn-main px-2 py-1 bolder font-md btn-users-next" data-params="${deepEscape(params.toString())}">
+                Siguiente página
+            </button>
+        `;
+    }
+    container.innerHTML = html;
 }
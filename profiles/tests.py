@@ -1,3 +1,55 @@
 from django.test import TestCase
 
 # Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from orders.models import Order, StatusOrder
+from orders.utils import STATUS_COUNTS_CACHE_KEY, get_orders_page
+
+
+class OrdersTabPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        StatusOrder.objects.create(id=2, name="Pendiente")
+        StatusOrder.objects.create(id=3, name="Pago a Confirmar")
+        self.user = get_user_model().objects.create_user(email="buyer@gmail.com", password="1234")
+        self.admin = get_user_model().objects.create_user(email="admin@gmail.com", password="1234", role='admin')
+        self.orders = [Order.objects.create(user=self.user, status_id=2) for _ in range(5)]
+        self.url = reverse('profile_tabs', args=['orders-tab'])
+
+    def test_orders_keyset_pages(self):
+        seen = []
+        cursor = None
+        while True:
+            page, pagination = get_orders_page(Order.objects.filter(user=self.user), cursor=cursor, limit=2)
+            seen.extend(order['id'] for order in page)
+            if not pagination['has_next']:
+                break
+            cursor = pagination['next_cursor']
+
+        self.assertEqual(seen, [order.id for order in reversed(self.orders)])
+
+    def test_user_orders_tab(self):
+        self.client.force_login(self.user)
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['orders']), 5)
+        self.assertFalse(data['pagination']['has_next'])
+
+    def test_admin_status_counts_are_cached_and_invalidated(self):
+        self.client.force_login(self.admin)
+        data = self.client.get(self.url).json()
+        counts = {status['id']: status['count'] for status in data['status_orders']}
+        self.assertEqual(counts, {2: 5, 3: 0})
+        self.assertIsNotNone(cache.get(STATUS_COUNTS_CACHE_KEY))
+
+        order = self.orders[0]
+        order.status_id = 3
+        order.save()
+        self.assertIsNone(cache.get(STATUS_COUNTS_CACHE_KEY))
+
+        data = self.client.get(self.url, {'status': 3}).json()
+        self.assertEqual([o['id'] for o in data['orders']], [order.id])
+        counts = {status['id']: status['count'] for status in data['status_orders']}
+        self.assertEqual(counts, {2: 4, 3: 1})
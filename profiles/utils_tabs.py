@@ -10,21 +10,23 @@ from products.utils import valid_id_or_None
 from home.models import Store
 from orders.models import Order, ItemOrder
 from orders.models import ShipmentMethod, PaymentMethod, StatusOrder
+from orders.utils import get_orders_page, get_status_counts
 from users.models import CustomUser
+from users.utils import search_users
 
 
 from products.serializers import ProductListSerializer
 
 
-def profile_tabs_user(user, tab_name):
+def profile_tabs_user(request, tab_name):
+    user = request.user
     if tab_name == 'orders-tab':
-        orders = (
-            Order.objects.filter(user=user)
-            .values('id', 'created_at', 'total', 'status__name')
-            .order_by('-updated_at')
+        orders, pagination = get_orders_page(
+            Order.objects.filter(user=user), cursor=request.GET.get('cursor')
         )
         return { 
-            'orders': list(orders),
+            'orders': orders,
+            'pagination': pagination,
             'is_admin': False
         }
     
@@ -62,9 +64,11 @@ def profile_tabs_admin(request, tab_name):
 
         1. 'orders-tab':
             - Optionally filters orders by order ID or status ID from GET parameters.
+            - Orders are keyset paginated, send the previous 'next_cursor' as ?cursor= to get the next page.
             - Returns:
                 - 'orders': list of orders (each order is a dict with id, created_at, total, status name).
-                - 'status_orders': list of possible order statuses (id and name).
+                - 'pagination': dict with 'next_cursor', 'has_next' and 'limit'.
+                - 'status_orders': list of possible order statuses (id, name and cached orders count).
                 - 'status_id': currently selected status ID (or None).
                 - 'is_admin': always True, indicating admin privileges.
 
@@ -76,9 +80,11 @@ def profile_tabs_admin(request, tab_name):
                 - 'payments': list of payment methods.
 
         3. 'users-tab':
-            - Supports filtering users by search term (email) and role (defaulting to 'buyer').
+            - Supports filtering users by search term (email or name) and role (defaulting to 'buyer').
+            - Results are paginated by email and the total is capped (see users.utils.search_users).
             - Returns:
                 - 'users': list of user dictionaries with selected fields.
+                - 'pagination': dict with 'next_cursor', 'has_next', 'count' and 'count_is_estimate'.
                 - 'choices': dictionary mapping role keys to role names (for select inputs).
                 - 'choice': the currently selected role filter (for UI state).
 
@@ -96,15 +102,19 @@ def profile_tabs_admin(request, tab_name):
         if status_id and not order_id:
             orders = orders.filter(status_id=status_id)
             
-        # get a dict values for orders
-        orders = orders.values('id', 'created_at', 'total', 'status__name').order_by('-updated_at')
-
-        # get a dict values for status_orders
-        status_orders = StatusOrder.objects.values('id', 'name').order_by('id')
+        # get a page of dict values for orders
+        orders, pagination = get_orders_page(orders, cursor=request.GET.get('cursor'))
+
+        # get a dict values for status_orders with the cached count of each one
+        status_counts = get_status_counts()
+        status_orders = list(StatusOrder.objects.values('id', 'name').order_by('id'))
+        for status in status_orders:
+            status['count'] = status_counts.get(status['id'], 0)
         
         return { 
-            'orders': list(orders),    # convert a list to responseJson
-            'status_orders': list(status_orders),
+            'orders': orders,
+            'pagination': pagination,
+            'status_orders': status_orders,
             'status_id': status_id,
             'is_admin': True 
         }
@@ -134,17 +144,15 @@ def profile_tabs_admin(request, tab_name):
         search = request.GET.get('search', '')   # Si no hay, devuelve ''
         role = request.GET.get('role', 'buyer')  # Por defecto 'buyer'
 
-        users = CustomUser.objects.all()
-        if search:
-            users = users.filter(email__icontains=search)
-        if role:
-            users = users.filter(role=role)
-            
-        # Solo obtener los campos necesarios
-        users = users.values('id', 'first_name', 'last_name', 'email', 'role')
+        # Busqueda paginada y limitada, solo obtiene los campos necesarios
+        users, pagination = search_users(
+            search=search, role=role, cursor=request.GET.get('cursor')
+        )
 
         return {
-            'users': list(users),
+            'users': users,
+            'pagination': pagination,
+            'search': search,
             'choices': dict(CustomUser.ROLE_CHOICES),
             'choice': role,   # Para que tu <select> quede marcado
         }
\ No newline at end of file
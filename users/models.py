@@ -74,6 +74,14 @@ class CustomUser(AbstractUser):
     # Assign the CustomUserManager to handle user creation
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # admin users tab: filter by role and keyset pagination ordered by email
+            models.Index(fields=['role', 'email'], name='user_role_email_idx'),
+        ]
+        # NOTE the indexes for the email/name search (trigram and prefix, on UPPER(col) like the
+        # icontains/istartswith SQL) are PostgreSQL only, they are created after migrate in users.signals
+
     # Method to represent the user as a string (using email)
     def __str__(self):
         return self.email  # Returns the email address as the user's string representation
@@ -0,0 +1,12 @@
+
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+from users.utils import create_trigram_indexes
+
+
+@receiver(post_migrate)
+def ensure_search_indexes(sender, using, **kwargs):
+    # Las migraciones no se versionan, por eso el indice trigram se asegura despues de cada migrate
+    if sender.name == 'users':
+        create_trigram_indexes(using=using)
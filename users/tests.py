@@ -94,3 +94,80 @@ class CustomUserManagerTests(TestCase):
             **self.extra_fields
         )
         self.assertEqual(str(user), self.email)
+
+
+from users import utils
+
+
+class SearchUsersTests(TestCase):
+    def setUp(self):
+        """
+        Crea usuarios compradores y un vendedor para probar la busqueda del tab de usuarios.
+        """
+        for i in range(5):
+            get_user_model().objects.create_user(
+                email=f"buyer{i}@example.com", password="1234", first_name=f"Juan{i}"
+            )
+        get_user_model().objects.create_user(
+            email="seller@example.com", password="1234", first_name="Pedro", role='seller'
+        )
+
+    def test_search_paginates_by_email(self):
+        """
+        Verifica que la busqueda recorra todas las paginas sin repetir usuarios.
+        """
+        emails = []
+        cursor = None
+        while True:
+            users, pagination = utils.search_users(role='buyer', cursor=cursor, limit=2)
+            emails.extend(user['email'] for user in users)
+            if not pagination['has_next']:
+                break
+            cursor = pagination['next_cursor']
+
+        self.assertEqual(emails, [f"buyer{i}@example.com" for i in range(5)])
+        self.assertEqual(pagination['count'], 5)
+        self.assertFalse(pagination['count_is_estimate'])
+
+    def test_search_by_name_and_short_prefix(self):
+        """
+        Verifica la busqueda por nombre (3+ caracteres) y por prefijo de email (terminos cortos).
+        """
+        users, _ = utils.search_users(search='pedro')
+        self.assertEqual([user['email'] for user in users], ["seller@example.com"])
+
+        users, _ = utils.search_users(search='se')
+        self.assertEqual([user['email'] for user in users], ["seller@example.com"])
+
+    def test_count_is_capped(self):
+        """
+        Verifica que el conteo se corte en USERS_COUNT_CAP y se marque como estimado.
+        """
+        old_cap, utils.USERS_COUNT_CAP = utils.USERS_COUNT_CAP, 3
+        try:
+            _, pagination = utils.search_users(role='buyer')
+        finally:
+            utils.USERS_COUNT_CAP = old_cap
+
+        self.assertEqual(pagination['count'], 3)
+        self.assertTrue(pagination['count_is_estimate'])
+
+    def test_search_indexes_match_the_lookup_sql(self):
+        """
+        Verifica que los indices se creen sobre UPPER(col::text), la expresion de icontains/istartswith en PostgreSQL.
+        """
+        statements = utils.search_index_statements('users_user')
+
+        self.assertIn(
+            'CREATE INDEX IF NOT EXISTS user_email_upper_trgm_idx ON users_user '
+            'USING gin ((UPPER(email::text)) gin_trgm_ops)', statements
+        )
+        self.assertIn(
+            'CREATE INDEX IF NOT EXISTS user_email_upper_prefix_idx ON users_user '
+            '((UPPER(email::text)) text_pattern_ops)', statements
+        )
+
+        # sin pg_trgm (sin permisos para crear la extension) queda solo el indice de prefijo
+        statements = utils.search_index_statements('users_user', trigram=False)
+        self.assertEqual(len(statements), len(utils.PREFIX_INDEXES))
+        self.assertNotIn('gin_trgm_ops', ' '.join(statements))
@@ -0,0 +1,157 @@
+import logging
+
+from django.db.models import Q
+
+from users.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+USERS_PAGE_SIZE = 25
+USERS_COUNT_CAP = 1000     # above this value the count is reported as an estimate ("1000+")
+MIN_CONTAINS_LENGTH = 3    # pg_trgm indexes only help with 3 or more characters
+
+# En PostgreSQL Django compila icontains/istartswith a UPPER("col"::text) LIKE UPPER(%s), el planner
+# solo usa un indice construido sobre esa misma expresion (un gin sobre la columna cruda no sirve).
+# (index name, column) GIN gin_trgm_ops sobre UPPER(col::text), para icontains ('%...%')
+TRIGRAM_INDEXES = (
+    ('user_email_upper_trgm_idx', 'email'),
+    ('user_first_name_upper_trgm_idx', 'first_name'),
+    ('user_last_name_upper_trgm_idx', 'last_name'),
+)
+# btree text_pattern_ops sobre UPPER(email::text), para email__istartswith ('se%') con cualquier collation
+PREFIX_INDEXES = (
+    ('user_email_upper_prefix_idx', 'email'),
+)
+
+
+def search_index_statements(table, trigram=True) -> list:
+    """
+    SQL of the users search indexes, expressions equal to the ones of the icontains/istartswith lookups.
+
+    Args:
+        table (str): Table of CustomUser.
+        trigram (bool): Includes the GIN trigram indexes, they need the pg_trgm extension.
+    """
+    statements = []
+    if trigram:
+        statements += [
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+            for name, column in TRIGRAM_INDEXES
+        ]
+    statements += [
+        f'CREATE INDEX IF NOT EXISTS {name} ON {table} ((UPPER({column}::text)) text_pattern_ops)'
+        for name, column in PREFIX_INDEXES
+    ]
+    return statements
+
+
+def ensure_trigram_extension(using='default') -> bool:
+    """
+    Creates the pg_trgm extension if it is missing.
+
+    Notes:
+        - CREATE EXTENSION needs superuser or the CREATE privilege on the database, most managed
+          PostgreSQL providers do not give it to the app user: run it once as admin
+          (CREATE EXTENSION pg_trgm;), meanwhile the failure is logged and migrate goes on.
+
+    Returns:
+        bool: True if the extension is installed.
+    """
+    from django.db import DatabaseError, connections, transaction
+    conn = connections[using]
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return True
+        try:
+            # savepoint: si migrate corre dentro de una transaccion el error no la deja abortada
+            with transaction.atomic(using=using):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            logger.warning(
+                "No se pudo crear la extension pg_trgm, la busqueda de usuarios queda sin indices trigram. "
+                "Crearla una vez como admin: CREATE EXTENSION pg_trgm;", exc_info=True
+            )
+            return False
+    return True
+
+
+def create_trigram_indexes(using='default') -> bool:
+    """
+    Creates the expression indexes for the users search (search_index_statements), the
+    trigram ones only if pg_trgm is installed (ensure_trigram_extension).
+    Does nothing on databases other than PostgreSQL.
+
+    Returns:
+        bool: True if the statements were executed.
+    """
+    from django.db import connections
+    conn = connections[using]
+    if conn.vendor != 'postgresql':
+        return False
+
+    table = CustomUser._meta.db_table
+    trigram = ensure_trigram_extension(using=using)
+    with conn.cursor() as cursor:
+        for statement in search_index_statements(table, trigram=trigram):
+            cursor.execute(statement)
+    return True
+
+
+def search_users(search='', role=None, cursor=None, limit=USERS_PAGE_SIZE) -> tuple:
+    """
+    Index backed and paginated search of users for the admin users tab.
+
+    - Terms with MIN_CONTAINS_LENGTH or more characters are searched with icontains over
+      email, first_name and last_name (served by the GIN trigram indexes on UPPER(col) on PostgreSQL).
+    - Shorter terms only match the start of the email (istartswith, UPPER(email) text_pattern_ops index).
+    - Results are keyset paginated by email (unique), send 'next_cursor' as ?cursor=.
+
+    Args:
+        search (str): Text to search.
+        role (str, optional): Role key to filter ('admin', 'seller', 'buyer').
+        cursor (str, optional): Last email of the previous page.
+        limit (int, optional): Max users per page. Defaults to USERS_PAGE_SIZE.
+
+    Returns:
+        tuple:
+            - list[dict]: Users of the page (id, first_name, last_name, email, role).
+            - dict: {'next_cursor', 'has_next', 'limit', 'count', 'count_is_estimate'}
+    """
+    users = CustomUser.objects.all()
+    search = (search or '').strip()
+
+    if search:
+        if len(search) >= MIN_CONTAINS_LENGTH:
+            users = users.filter(
+                Q(email__icontains=search)
+                | Q(first_name__icontains=search)
+                | Q(last_name__icontains=search)
+            )
+        else:
+            users = users.filter(email__istartswith=search)
+    if role:
+        users = users.filter(role=role)
+
+    # contamos como maximo USERS_COUNT_CAP + 1 filas en vez de un COUNT(*) completo
+    count = users.order_by()[:USERS_COUNT_CAP + 1].count()
+    count_is_estimate = count > USERS_COUNT_CAP
+
+    if cursor:
+        users = users.filter(email__gt=cursor)
+
+    rows = list(
+        users.order_by('email')
+        .values('id', 'first_name', 'last_name', 'email', 'role')[:limit + 1]
+    )
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    pagination = {
+        'next_cursor': rows[-1]['email'] if has_next else None,
+        'has_next': has_next,
+        'limit': limit,
+        'count': min(count, USERS_COUNT_CAP),
+        'count_is_estimate': count_is_estimate,
+    }
+    return rows, pagination